@@ -0,0 +1,84 @@
+import numpy as np
+from sqlalchemy import func
+from cache import TTLCache
+from ledger import latest_fill_id
+from market_data import get_quotes
+from replay import replay_id
+from model import User, Portfolio, DailyValuation
+from money import (
+    CASH_SCALE, PRICE_SCALE, QTY_SCALE,
+    cash, quantity, to_units, float_to_units, position_value_cents, from_units
+)
+
+# /account is polled every 30s by several pages. Entries are keyed on the
+# user's latest fill id, so a trade is seen by every worker at once and the
+# TTL only has to absorb quote moves between polls. Replays have their own
+# accounts database, so the replay is part of the key too.
+ACCOUNT_TTL = 15
+
+_account_cache = TTLCache(ttl=ACCOUNT_TTL, max_entries=10000)
+
+def load_account_rows(db, user_id):
+    """Cash, the last stored close equity and per-symbol quantity and cost basis, in one indexed query"""
+    last_equity = db.query(DailyValuation.equity).filter(
+        DailyValuation.user_id == User.id
+    ).order_by(DailyValuation.as_of.desc()).limit(1).correlate(User).scalar_subquery()
+    return db.query(
+        User.balance,
+        Portfolio.symbol,
+        func.sum(Portfolio.quantity),
+        func.sum(Portfolio.quantity * Portfolio.avg_price),
+        last_equity
+    ).outerjoin(
+        Portfolio, (Portfolio.user_id == User.id) & (Portfolio.quantity > 0)
+    ).filter(
+        User.id == user_id
+    ).group_by(User.id, User.balance, Portfolio.symbol).all()
+
+def compute_account_summary(db, user_id):
+    rows = load_account_rows(db, user_id)
+    if not rows:
+        return None
+    balance = rows[0][0] or 0
+    # Equity at the last close the nightly mark-to-market job valued
+    last_equity = rows[0][4]
+    positions = [row for row in rows if row[1] is not None]
+    symbols = [row[1] for row in positions]
+    quotes = get_quotes(symbols) if symbols else {}
+
+    qty = to_units([row[2] for row in positions], QTY_SCALE)
+    cost_cents = to_units([row[3] for row in positions], CASH_SCALE)
+    # Positions without a live quote are valued at their average cost
+    avg_units = to_units([cash(row[3]) / quantity(row[2]) for row in positions], PRICE_SCALE)
+    quote = np.array([quotes.get(s, np.nan) for s in symbols], dtype=np.float64)
+    price_units = np.where(np.isnan(quote), avg_units, float_to_units(np.nan_to_num(quote), PRICE_SCALE))
+
+    cash_cents = int(to_units([balance], CASH_SCALE)[0])
+    market_value = int(position_value_cents(qty, price_units).sum())
+    cost_basis = int(cost_cents.sum())
+    equity = cash_cents + market_value
+
+    def dollars(cents):
+        return float(from_units(cents, CASH_SCALE))
+
+    return {
+        'cash': dollars(cash_cents),
+        'buying_power': dollars(max(cash_cents, 0)),
+        'long_market_value': dollars(market_value),
+        'cost_basis': dollars(cost_basis),
+        'unrealized_pl': dollars(market_value - cost_basis),
+        'portfolio_value': dollars(equity),
+        'equity': dollars(equity),
+        'last_equity': float(last_equity) if last_equity is not None else None,
+        'exposure': round(market_value / equity, 4) if equity else 0.0,
+        'positions_count': len(positions)
+    }
+
+def get_account_summary(db, user_id):
+    key = (replay_id(), int(user_id), latest_fill_id(db, int(user_id)))
+    summary = _account_cache.get(key)
+    if summary is None:
+        summary = compute_account_summary(db, key[1])
+        if summary is not None:
+            _account_cache.set(key, summary)
+    return summary
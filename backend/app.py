@@ -1,9 +1,30 @@
 from flask import Flask, request, jsonify, send_from_directory
 import os
+import time
+import hashlib
 import requests
 import yfinance as yf
+import numpy as np
 from datetime import datetime, timedelta
-from model import load_and_train, get_prediction, get_recommendation, Base, User, Order, Profile, Portfolio
+from model import load_and_train, load_training_data, get_prediction, get_recommendation, model_version, latest_feature_row, scaled_feature_row, predict_latest, Base, User, Order, Profile, Portfolio
+from money import cash, price as to_price, to_float
+from ledger import record_fill
+from pooled_model import load_and_train_pooled
+from retraining import refresh_model
+from artifacts import artifact_dir, publish_model, load_model, is_available
+from symbol_cache import SymbolCache, SymbolState
+from symbols import get_symbol_index, is_listed, MAX_RESULTS
+from screener import screen, MAX_SCREEN_SYMBOLS
+from portfolio_history import get_portfolio_history, HISTORY_WINDOWS
+from portfolio_risk import portfolio_risk, TRADING_DAYS, MIN_WINDOW, MAX_WINDOW
+from account import get_account_summary
+from downsample import downsample_indices, DOWNSAMPLE_METHODS, MIN_POINTS
+import wire
+from timeframes import get_chart_frame, peek_chart_frame, resolve_timeframe, TIMEFRAMES
+from replay import (
+    active_replay, replay_id, start_replay, stop_replay, adjust_replay,
+    load_replay_bars, load_replay_minutes, market_now, REPLAY_INTERVALS
+)
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
@@ -13,7 +34,7 @@ from flask_jwt_extended.exceptions import JWTExtendedException
 from werkzeug.exceptions import Unauthorized
 from flask_cors import CORS
 import alpaca_trade_api as tradeapi
-from config import DATABASE_URL, JWT_SECRET_KEY, ALPACA_API_KEY, ALPACA_SECRET_KEY, ALPACA_BASE_URL
+from config import DATABASE_URL, JWT_SECRET_KEY, ALPACA_API_KEY, ALPACA_SECRET_KEY, ALPACA_BASE_URL, REPLAY_ENABLED, REPLAY_DATABASE_URL, STOCKS, MODEL_MODE, SYMBOL_CACHE_SIZE, SYMBOL_CACHE_MB, RISK_BENCHMARK
 
 # Load environment variables
 load_dotenv()
@@ -40,47 +61,147 @@ else:
 
 global data, scaler, model, features
 
-# Stock configuration
-STOCKS = {
-    'NVDA': {'name': 'NVIDIA', 'symbol': 'NVDA'},
-    'AMD': {'name': 'Advanced Micro Devices', 'symbol': 'AMD'},
-    'AAPL': {'name': 'Apple Inc.', 'symbol': 'AAPL'},
-    'GOOGL': {'name': 'Alphabet Inc.', 'symbol': 'GOOGL'},
-    'MSFT': {'name': 'Microsoft Corporation', 'symbol': 'MSFT'},
-    'TSLA': {'name': 'Tesla Inc.', 'symbol': 'TSLA'},
-    'META': {'name': 'Meta Platforms', 'symbol': 'META'},
-    'AMZN': {'name': 'Amazon.com Inc.', 'symbol': 'AMZN'}
-}
-
-# Global variables for each stock
-stock_data = {}
-stock_models = {}
-stock_scalers = {}
-stock_features = {}
-
-def get_stock_data(symbol):
-    """Get or initialize stock data"""
-    if symbol not in stock_data:
-        stock_data[symbol] = {}
-    return stock_data[symbol]
-
-def get_stock_model(symbol):
-    """Get or initialize stock model"""
-    if symbol not in stock_models:
-        stock_models[symbol] = {}
-    return stock_models[symbol]
-
-def get_stock_scaler(symbol):
-    """Get or initialize stock scaler"""
-    if symbol not in stock_scalers:
-        stock_scalers[symbol] = {}
-    return stock_scalers[symbol]
-
-def get_stock_features(symbol):
-    """Get or initialize stock features"""
-    if symbol not in stock_features:
-        stock_features[symbol] = {}
-    return stock_features[symbol]
+# Per-symbol models and the payloads computed from them, least recently used evicted first
+symbol_states = SymbolCache(SYMBOL_CACHE_SIZE, SYMBOL_CACHE_MB * 2 ** 20 if SYMBOL_CACHE_MB else None)
+
+# Models are retrained at most this often; daily bars only change once a session
+MODEL_MAX_AGE = 60 * 60
+# Browser/CDN cache lifetime for prediction and recommendation payloads
+SIGNAL_MAX_AGE = 5 * 60
+
+def is_current(symbol, state):
+    """Whether a cached SymbolState can be served without retraining"""
+    if state is None or time.time() - state.meta['trained_at'] > MODEL_MAX_AGE:
+        return False
+    # Models trained on another market timeline (live or an earlier replay) never carry over
+    replay = active_replay()
+    if state.meta['replay'] != replay_id():
+        return False
+    # During a replay a newly revealed session makes the model stale
+    return replay is None or state.meta['bars'] == replay.cursor(symbol, '1d')
+
+def current_model_version(symbol):
+    """Version of the cached model for a symbol, or None if it needs (re)training"""
+    state = symbol_states.get(symbol)
+    return state.meta['version'] if is_current(symbol, state) else None
+
+def store_model(symbol, data, scaler, model, features, version, retrain=None):
+    """Cache a freshly trained model; payloads computed by the old one go with it"""
+    replay = active_replay()
+    state = SymbolState(
+        # Only the newest row is read after training; the history stays in the
+        # shared feature store rather than in every worker
+        data.iloc[-1:].copy(), model, scaler, features,
+        {
+            'version': version,
+            'trained_at': time.time(),
+            'replay': replay.id if replay is not None else None,
+            'bars': replay.cursor(symbol, '1d') if replay is not None else None,
+            # Model input for the newest bar, pre-scaled for per-symbol models
+            'latest': scaled_feature_row(data, features, scaler) if scaler is not None else latest_feature_row(data, features),
+            'retrain': retrain,
+        }
+    )
+    symbol_states.set(symbol, state)
+    return state
+
+def ensure_model(symbol):
+    """The symbol's SymbolState, training its model first if it is missing or stale"""
+    cached = symbol_states.get(symbol)
+    if is_current(symbol, cached):
+        return cached
+    if MODEL_MODE == 'pooled' and symbol in STOCKS:
+        # One fit refreshes every symbol in STOCKS; other listed symbols get their own model
+        data_by_symbol, model = load_and_train_pooled(list(STOCKS))
+        if symbol not in data_by_symbol:
+            raise ValueError(f"No data available for {symbol}")
+        for member, data in data_by_symbol.items():
+            if member != symbol:
+                store_model(member, data, None, model, model.input_features, 'pooled-' + model_version(data))
+        data = data_by_symbol[symbol]
+        return store_model(symbol, data, None, model, model.input_features, 'pooled-' + model_version(data))
+    
+    # Warm-start from the previous booster unless drift calls for a full refit
+    data, features = load_training_data(symbol)
+    previous = (None, None, None)
+    # A mapped version pruned by another worker can no longer warm-start
+    if cached is not None and cached.features == features and is_available(cached.model):
+        previous = (cached.scaler, cached.model, cached.meta['retrain'])
+    # Models trained on replayed bars must never reach the shared artifacts
+    shared = artifact_dir() is not None and active_replay() is None
+    # A model published by any worker is as good as our own
+    published = load_model(symbol) if shared else None
+    if published is not None and published[2] == features and published[3]['last_bar'] <= data['Date'].iloc[-1]:
+        previous = (published[0], published[1], published[3])
+    scaler, model, retrain = refresh_model(data, features, *previous)
+    version = model_version(data)
+    if retrain['incremental_updates']:
+        version += f"+{retrain['incremental_updates']}"
+    if shared and retrain['mode'] != 'unchanged':
+        # Publish, then serve from the mapped copy like every other worker
+        publish_model(symbol, version, scaler, model, features, retrain)
+        mapped = load_model(symbol, version)
+        if mapped is not None:
+            scaler, model = mapped[0], mapped[1]
+    return store_model(symbol, data, scaler, model, features, version, retrain)
+
+# Upper bound on symbols accepted by one /predict?symbols= request
+MAX_BATCH_SYMBOLS = 50
+
+def predict_prices(symbols):
+    """Predicted next close for each symbol as (predictions, errors).
+
+    Prices already computed for the current model version are a dict
+    lookup; the rest are stacked and predicted in one batch per model.
+    """
+    predictions, errors, batch, states = {}, {}, {}, {}
+    for symbol in symbols:
+        if not is_listed(symbol):
+            errors[symbol] = 'Stock not found'
+            continue
+        try:
+            state = ensure_model(symbol)
+        except Exception as e:
+            errors[symbol] = str(e)
+            continue
+        cached = state.payloads.get('price')
+        if cached is not None:
+            predictions[symbol] = cached
+        elif state.meta['latest'] is None:
+            errors[symbol] = 'Not enough data'
+        else:
+            # 'latest' is already scaled, so predict_latest gets no scaler
+            batch[symbol] = (state.model, None, state.meta['latest'])
+            states[symbol] = state
+    for symbol, price in predict_latest(batch).items():
+        states[symbol].payloads['price'] = price
+        predictions[symbol] = price
+    return predictions, errors
+
+def make_etag(*parts):
+    return hashlib.sha1('|'.join(str(p) for p in parts).encode('utf-8')).hexdigest()
+
+def cacheable(response, etag, max_age):
+    """Attach a strong ETag and Cache-Control max-age to a response"""
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    return response
+
+def coded_etag(etag, encoding):
+    """The ETag of `etag`'s body as sent with a Content-Encoding"""
+    return f"{etag}-{encoding}" if encoding else etag
+
+def not_modified(etag, max_age):
+    """A 304 response if the client already holds `etag` in any encoding, otherwise None"""
+    if not etag:
+        return None
+    for encoding in (None, 'br', 'gzip'):
+        if coded_etag(etag, encoding) in request.if_none_match:
+            response = cacheable(app.response_class(status=304), coded_etag(etag, encoding), max_age)
+            response.vary.add('Accept-Encoding')
+            return response
+    return None
 
 # Database connection
 engine = create_engine(DATABASE_URL)
@@ -90,8 +211,27 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base.metadata.create_all(bind=engine)
 
 # Helper function to get database session
+_replay_sessions = None
+
+def replay_sessions():
+    """Session factory for REPLAY_DATABASE_URL, creating its tables on first use"""
+    global _replay_sessions
+    if _replay_sessions is None:
+        replay_engine = create_engine(REPLAY_DATABASE_URL)
+        Base.metadata.create_all(bind=replay_engine)
+        _replay_sessions = sessionmaker(autocommit=False, autoflush=False, bind=replay_engine)
+    return _replay_sessions
+
+def reset_replay_accounts():
+    """Drop every simulated account so a new replay starts from empty books"""
+    replay_engine = replay_sessions().kw['bind']
+    Base.metadata.drop_all(bind=replay_engine)
+    Base.metadata.create_all(bind=replay_engine)
+
 def get_db():
-    db = SessionLocal()
+    # Users, orders and fills made during a replay live in their own database,
+    # so simulated trades never touch real balances or the real ledger
+    db = (replay_sessions() if active_replay() is not None else SessionLocal)()
     try:
         yield db
     finally:
@@ -100,7 +240,8 @@ def get_db():
 def execute_paper_trade(symbol, side, qty, price):
     """Execute a paper trade using Alpaca API"""
     try:
-        if alpaca:
+        # Replayed (simulated) markets never reach the broker
+        if alpaca and active_replay() is None:
             # Get current market price if not provided
             if not price:
                 ticker = alpaca.get_latest_trade(symbol)
@@ -124,12 +265,13 @@ def execute_paper_trade(symbol, side, qty, price):
             }
         else:
             # Simulate paper trading if Alpaca is not configured
+            filled_at = market_now()
             return {
                 'success': True,
-                'order_id': f'sim_{datetime.utcnow().timestamp()}',
+                'order_id': f'sim_{filled_at.timestamp()}',
                 'status': 'filled',
                 'filled_price': price,
-                'filled_at': datetime.utcnow().isoformat(),
+                'filled_at': filled_at.isoformat(),
                 'simulated': True
             }
     except Exception as e:
@@ -138,26 +280,14 @@ def execute_paper_trade(symbol, side, qty, price):
             'error': str(e)
         }
 
-def get_account_info():
-    """Get account information from Alpaca"""
+def get_account_info(user_id):
+    """Get cash, equity and buying power for a user from their paper trading account"""
     try:
-        if alpaca:
-            account = alpaca.get_account()
-            return {
-                'cash': float(account.cash),
-                'buying_power': float(account.buying_power),
-                'portfolio_value': float(account.portfolio_value),
-                'equity': float(account.equity)
-            }
-        else:
-            # Return simulated account info
-            return {
-                'cash': 100000.0,
-                'buying_power': 100000.0,
-                'portfolio_value': 100000.0,
-                'equity': 100000.0,
-                'simulated': True
-            }
+        db = next(get_db())
+        account = get_account_summary(db, user_id)
+        if account is None:
+            return {'error': 'User not found'}
+        return account
     except Exception as e:
         return {
             'error': str(e)
@@ -206,16 +336,17 @@ def get_portfolio_from_table(user_id):
                     print(f"Error getting current price for {portfolio.symbol}: {e}")
                     current_price = portfolio.avg_price
                 
-                market_value = portfolio.quantity * current_price
-                unrealized_pl = market_value - (portfolio.quantity * portfolio.avg_price)
+                current_price = to_price(current_price)
+                market_value = cash(portfolio.quantity * current_price)
+                unrealized_pl = market_value - cash(portfolio.quantity * portfolio.avg_price)
                 
                 position_data = {
                     'symbol': portfolio.symbol,
-                    'qty': portfolio.quantity,
-                    'avg_entry_price': portfolio.avg_price,
-                    'current_price': current_price,
-                    'market_value': market_value,
-                    'unrealized_pl': unrealized_pl
+                    'qty': to_float(portfolio.quantity),
+                    'avg_entry_price': to_float(portfolio.avg_price),
+                    'current_price': to_float(current_price),
+                    'market_value': to_float(market_value),
+                    'unrealized_pl': to_float(unrealized_pl)
                 }
                 print(f"Adding position: {position_data}")
                 result.append(position_data)
@@ -266,6 +397,9 @@ def index():
 
 @app.route('/predict', methods=['GET'])
 def predict():
+    if request.args.get('symbols'):
+        return predict_batch()
+    
     global data, scaler, model, features
     data, scaler, model, features = load_and_train()
     predicted_price = get_prediction(data, scaler, model, features)
@@ -275,6 +409,28 @@ def predict():
         'news': [str(n) for n in news_items]
     })
 
+def predict_batch():
+    """/predict?symbols=NVDA,AMD,...: predicted prices for a whole watchlist"""
+    symbols = list(dict.fromkeys(s.strip().upper() for s in request.args['symbols'].split(',') if s.strip()))
+    if len(symbols) > MAX_BATCH_SYMBOLS:
+        return jsonify({'error': f'At most {MAX_BATCH_SYMBOLS} symbols per request'}), 400
+    
+    versions = [current_model_version(symbol) for symbol in symbols]
+    etag = make_etag('predict-batch', *symbols, *versions) if all(versions) else None
+    response = not_modified(etag, SIGNAL_MAX_AGE)
+    if response is not None:
+        return response
+    
+    predictions, errors = predict_prices(symbols)
+    response = jsonify({
+        'predictions': {symbol: {'predicted_price': price} for symbol, price in predictions.items()},
+        'errors': errors
+    })
+    if errors:
+        return response
+    versions = [current_model_version(symbol) for symbol in symbols]
+    return cacheable(response, make_etag('predict-batch', *symbols, *versions), SIGNAL_MAX_AGE)
+
 @app.route('/recommend', methods=['GET'])
 def recommend():
     global data, features
@@ -293,59 +449,69 @@ def recommend():
         'indicators': indicators
     })
 
-@app.route('/historical_data', methods=['GET'])
-def historical_data():
-    tf = request.args.get('tf', '1Y').upper()
-    ticker = yf.Ticker('NVDA')
-    if tf == '1D':
-        hist = ticker.history(period='1d', interval='1m')
-        dates = [d.strftime('%Y-%m-%d %H:%M') for d in hist.index]
-    elif tf == '1W':
-        hist = ticker.history(period='5d', interval='5m')
-        dates = [d.strftime('%Y-%m-%d %H:%M') for d in hist.index]
-    elif tf == '1M':
-        hist = ticker.history(period='1mo', interval='30m')
-        dates = [d.strftime('%Y-%m-%d %H:%M') for d in hist.index]
-    elif tf == '3M':
-        hist = ticker.history(period='3mo', interval='1d')
-        dates = [d.strftime('%Y-%m-%d') for d in hist.index]
-    elif tf == 'YTD':
-        hist = ticker.history(period='ytd', interval='1d')
-        dates = [d.strftime('%Y-%m-%d') for d in hist.index]
-    elif tf == 'ALL':
-        hist = ticker.history(period='max', interval='1d')
-        dates = [d.strftime('%Y-%m-%d') for d in hist.index]
-    else:  # Default to 1Y
-        hist = ticker.history(period='1y', interval='1d')
-        dates = [d.strftime('%Y-%m-%d') for d in hist.index]
-
-    # Compute indicators if data is available
-    if not hist.empty:
-        prices = hist['Close'].fillna(method='ffill').tolist()
-        # RSI
-        import ta
-        rsi = ta.momentum.RSIIndicator(hist['Close']).rsi().fillna(0).tolist()
-        # MACD
-        macd_obj = ta.trend.MACD(hist['Close'])
-        macd = macd_obj.macd().fillna(0).tolist()
-        macd_signal = macd_obj.macd_signal().fillna(0).tolist()
-    else:
-        prices = []
-        rsi = []
-        macd = []
-        macd_signal = []
-
-    chart_data = {
-        'dates': dates,
-        'prices': prices,
-        'rsi': rsi,
-        'macd': macd,
-        'macd_signal': macd_signal,
+def build_chart_response(frame, date_format, max_points=None, method='lttb'):
+    """Price/RSI/MACD chart payload for a chart frame in the client's preferred format"""
+    columns = {
+        'prices': frame['Close'].to_numpy(dtype=float),
+        'rsi': frame['rsi'].to_numpy(dtype=float),
+        'macd': frame['macd'].to_numpy(dtype=float),
+        'macd_signal': frame['macd_signal'].to_numpy(dtype=float),
     }
+    index = frame.index
+
+    keep = downsample_indices(columns['prices'], max_points, method)
+    if keep is not None:
+        columns = {name: values[keep] for name, values in columns.items()}
+        index = index[keep]
+
+    fmt = wire.negotiate(request.headers.get('Accept'))
+    if fmt != 'json':
+        epochs = index.asi8 // 10 ** 9 if len(index) else np.array([], dtype=np.int64)
+        body, mimetype = wire.serialize(epochs, columns, fmt, date_format=date_format)
+        return app.response_class(body, mimetype=mimetype)
+
+    chart_data = {'dates': index.strftime(date_format).tolist()}
+    chart_data.update({name: values.tolist() for name, values in columns.items()})
     return jsonify(chart_data)
 
+def chart_response(symbol):
+    """Serve /historical_data for a symbol using the shared timeframe catalog"""
+    tf = resolve_timeframe(request.args.get('tf'))
+    max_points = request.args.get('max_points', type=int)
+    if max_points is not None and max_points < MIN_POINTS:
+        return jsonify({'error': f'max_points must be at least {MIN_POINTS}'}), 400
+    method = request.args.get('downsample', 'lttb').lower()
+    if method not in DOWNSAMPLE_METHODS:
+        return jsonify({'error': f'Unsupported downsample method: {method}'}), 400
+    spec = TIMEFRAMES[tf]
+    fmt = wire.negotiate(request.headers.get('Accept'))
+    
+    def chart_etag(frame):
+        last_bar = frame.index[-1].value if len(frame) else 0
+        return make_etag('chart', symbol, tf, last_bar, max_points, method, fmt)
+    
+    # Answer revalidations from the cached frame without touching yfinance
+    cached_frame = peek_chart_frame(symbol, tf)
+    if cached_frame is not None:
+        response = not_modified(chart_etag(cached_frame), spec.ttl)
+        if response is not None:
+            return response
+    
+    frame = get_chart_frame(symbol, tf)
+    response = build_chart_response(frame, spec.date_format, max_points, method)
+    response.vary.add('Accept')
+    return cacheable(response, chart_etag(frame), spec.ttl)
+
+@app.route('/historical_data', methods=['GET'])
+def historical_data():
+    return chart_response('NVDA')
+
 @app.route('/live_data', methods=['GET'])
 def live_data():
+    replay = active_replay()
+    if replay is not None:
+        return jsonify(replay.quote('NVDA'))
+    
     ticker = yf.Ticker('NVDA')
     info = ticker.info
 
@@ -408,126 +574,132 @@ def get_stocks():
     """Get list of available stocks"""
     return jsonify(STOCKS)
 
+@app.route('/symbols/search')
+def search_symbols():
+    """Tickers and companies from the symbol master matching ?q="""
+    query = request.args.get('q', '')
+    try:
+        limit = int(request.args.get('limit', 10))
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    limit = max(1, min(limit, MAX_RESULTS))
+    return jsonify({'query': query, 'results': get_symbol_index().search(query, limit)})
+
+@app.route('/screener')
+def screener():
+    """/screener?where=RSI < 30 and MACD > MACD_Signal&sort=Volume: screen the latest daily features"""
+    if 'symbols' in request.args:
+        symbols = list(dict.fromkeys(s.strip().upper() for s in request.args['symbols'].split(',') if s.strip()))
+    else:
+        symbols = list(STOCKS)
+    if len(symbols) > MAX_SCREEN_SYMBOLS:
+        return jsonify({'error': f'At most {MAX_SCREEN_SYMBOLS} symbols per request'}), 400
+    unlisted = [symbol for symbol in symbols if not is_listed(symbol)]
+    if unlisted:
+        return jsonify({'error': f"Unknown symbols: {', '.join(unlisted)}"}), 400
+    
+    order = request.args.get('order', 'desc')
+    if order not in ('asc', 'desc'):
+        return jsonify({'error': 'order must be "asc" or "desc"'}), 400
+    try:
+        limit = max(1, min(int(request.args.get('limit', 50)), MAX_SCREEN_SYMBOLS))
+        results, errors = screen(
+            symbols,
+            where=request.args.get('where'),
+            sort=request.args.get('sort', 'Volume'),
+            descending=order == 'desc',
+            limit=limit
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'count': len(results), 'results': results, 'errors': errors})
+
 @app.route('/predict/<symbol>', methods=['GET'])
 def predict_stock(symbol):
     symbol = symbol.upper()
-    if symbol not in STOCKS:
+    if not is_listed(symbol):
         return jsonify({'error': 'Stock not found'}), 404
     
     try:
-        data = get_stock_data(symbol)
-        scaler = get_stock_scaler(symbol)
-        model = get_stock_model(symbol)
-        features = get_stock_features(symbol)
-        
-        # Retrain if needed
-        data, scaler, model, features = load_and_train(symbol)
-        stock_data[symbol] = data
-        stock_models[symbol] = model
-        stock_scalers[symbol] = scaler
-        stock_features[symbol] = features
-        
-        predicted_price = get_prediction(data, scaler, model, features)
-        news_items = scrape_market_sentiment(symbol)
-        return jsonify({
-            'predicted_price': predicted_price,
-            'news': [str(n) for n in news_items]
-        })
+        state = ensure_model(symbol)
+        cached = state.payloads.get('predict')
+        if cached is None:
+            predictions, errors = predict_prices([symbol])
+            predicted_price = predictions.get(symbol)
+            news_items = scrape_market_sentiment(symbol)
+            body = jsonify({
+                'predicted_price': predicted_price,
+                'news': [str(n) for n in news_items]
+            }).get_data()
+            if predicted_price is None:
+                # Failed predictions are retried on the next request, never cached
+                return app.response_class(body, mimetype='application/json')
+            # News is fetched per worker and per retrain, so the ETag hashes the body itself
+            cached = state.payloads['predict'] = (body, hashlib.sha1(body).hexdigest())
+        body, etag = cached
+        response = not_modified(etag, SIGNAL_MAX_AGE)
+        if response is not None:
+            return response
+        return cacheable(app.response_class(body, mimetype='application/json'), etag, SIGNAL_MAX_AGE)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/recommend/<symbol>', methods=['GET'])
 def recommend_stock(symbol):
     symbol = symbol.upper()
-    if symbol not in STOCKS:
+    if not is_listed(symbol):
         return jsonify({'error': 'Stock not found'}), 404
     
+    version = current_model_version(symbol)
+    response = not_modified(make_etag('recommend', symbol, version) if version else None, SIGNAL_MAX_AGE)
+    if response is not None:
+        return response
+    
     try:
-        data = get_stock_data(symbol)
-        features = get_stock_features(symbol)
-        
-        # Retrain if needed
-        data, _, _, features = load_and_train(symbol)
-        stock_data[symbol] = data
-        stock_features[symbol] = features
-        
-        recommendation, confidence, indicators = get_recommendation(data, features)
-        if recommendation is None:
-            return jsonify({
-                'recommendation': "Not enough data",
-                'confidence': "Not enough data",
-                'indicators': {},
-                'error': 'No valid data for recommendation'
-            })
-        return jsonify({
-            'recommendation': str(recommendation),
-            'confidence': str(confidence),
-            'indicators': indicators
-        })
+        state = ensure_model(symbol)
+        version = state.meta['version']
+        payload = state.payloads.get('recommend')
+        if payload is None:
+            recommendation, confidence, indicators = get_recommendation(state.data, state.features)
+            if recommendation is None:
+                payload = {
+                    'recommendation': "Not enough data",
+                    'confidence': "Not enough data",
+                    'indicators': {},
+                    'error': 'No valid data for recommendation'
+                }
+            else:
+                payload = {
+                    'recommendation': str(recommendation),
+                    'confidence': str(confidence),
+                    'indicators': indicators
+                }
+            state.payloads['recommend'] = payload
+        return cacheable(jsonify(payload), make_etag('recommend', symbol, version), SIGNAL_MAX_AGE)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/historical_data/<symbol>', methods=['GET'])
 def historical_data_stock(symbol):
     symbol = symbol.upper()
-    if symbol not in STOCKS:
+    if not is_listed(symbol):
         return jsonify({'error': 'Stock not found'}), 404
     
-    tf = request.args.get('tf', '1Y').upper()
-    ticker = yf.Ticker(symbol)
-    if tf == '1D':
-        hist = ticker.history(period='1d', interval='1m')
-        dates = [d.strftime('%Y-%m-%d %H:%M') for d in hist.index]
-    elif tf == '1W':
-        hist = ticker.history(period='5d', interval='5m')
-        dates = [d.strftime('%Y-%m-%d %H:%M') for d in hist.index]
-    elif tf == '1M':
-        hist = ticker.history(period='1mo', interval='30m')
-        dates = [d.strftime('%Y-%m-%d %H:%M') for d in hist.index]
-    elif tf == '3M':
-        hist = ticker.history(period='3mo', interval='1d')
-        dates = [d.strftime('%Y-%m-%d') for d in hist.index]
-    elif tf == 'YTD':
-        hist = ticker.history(period='ytd', interval='1d')
-        dates = [d.strftime('%Y-%m-%d') for d in hist.index]
-    elif tf == 'ALL':
-        hist = ticker.history(period='max', interval='1d')
-        dates = [d.strftime('%Y-%m-%d') for d in hist.index]
-    else:  # Default to 1Y
-        hist = ticker.history(period='1y', interval='1d')
-        dates = [d.strftime('%Y-%m-%d') for d in hist.index]
-
-    # Compute indicators if data is available
-    if not hist.empty:
-        prices = hist['Close'].fillna(method='ffill').tolist()
-        # RSI
-        import ta
-        rsi = ta.momentum.RSIIndicator(hist['Close']).rsi().fillna(0).tolist()
-        # MACD
-        macd_obj = ta.trend.MACD(hist['Close'])
-        macd = macd_obj.macd().fillna(0).tolist()
-        macd_signal = macd_obj.macd_signal().fillna(0).tolist()
-    else:
-        prices = []
-        rsi = []
-        macd = []
-        macd_signal = []
-
-    chart_data = {
-        'dates': dates,
-        'prices': prices,
-        'rsi': rsi,
-        'macd': macd,
-        'macd_signal': macd_signal,
-    }
-    return jsonify(chart_data)
+    return chart_response(symbol)
 
 @app.route('/live_data/<symbol>', methods=['GET'])
 def live_data_stock(symbol):
     symbol = symbol.upper()
-    if symbol not in STOCKS:
+    if not is_listed(symbol):
         return jsonify({'error': 'Stock not found'}), 404
     
+    replay = active_replay()
+    if replay is not None:
+        quote = replay.quote(symbol)
+        if quote is None:
+            return jsonify({'error': 'No replay bars yet for this symbol'}), 409
+        return jsonify(quote)
+    
     ticker = yf.Ticker(symbol)
     info = ticker.info
 
@@ -672,9 +844,13 @@ def create_order():
         side = data.get('side')  # 'buy' or 'sell'
         qty = int(data.get('qty'))
         price_raw = data.get('price')
-        price = float(price_raw) if price_raw is not None else 0  # Handle None values properly
+        price = to_price(price_raw) if price_raw is not None else 0  # Handle None values properly
         order_type = data.get('order_type', 'market')
         
+        # Validate symbol against the symbol master
+        if not is_listed(symbol):
+            return jsonify({'error': 'Unknown symbol'}), 400
+        
         # Validate side
         if side not in ['buy', 'sell']:
             return jsonify({'error': 'Side must be either "buy" or "sell"'}), 400
@@ -689,6 +865,12 @@ def create_order():
             return jsonify({'error': 'User not found'}), 404
         
         # Get current market price if not provided
+        replay = active_replay()
+        if price == 0 and replay is not None:
+            current_price = replay.last_price(symbol)
+            if current_price is None:
+                return jsonify({'error': 'Unable to get current price for symbol'}), 400
+            price = to_price(current_price)
         if price == 0:
             try:
                 ticker = yf.Ticker(symbol)
@@ -699,12 +881,12 @@ def create_order():
                         current_price = float(hist['Close'][-1])
                     else:
                         return jsonify({'error': 'Unable to get current price for symbol'}), 400
-                price = current_price
+                price = to_price(current_price)
             except Exception as e:
                 return jsonify({'error': f'Error getting current price: {str(e)}'}), 400
         
-        # Calculate order value
-        order_value = qty * price
+        # Calculate order value (exact, rounded to cents)
+        order_value = cash(qty * price)
         
         # Check if user has enough balance for buy orders
         if side == 'buy':
@@ -723,7 +905,7 @@ def create_order():
             symbol=symbol,
             side=side,
             qty=qty,
-            price=price
+            price=float(price)
         )
         
         if not trade_result['success']:
@@ -755,9 +937,9 @@ def create_order():
         if side == 'buy':
             if portfolio:
                 # Update existing position
-                total_cost = portfolio.quantity * portfolio.avg_price + order_value
+                total_cost = portfolio.quantity * portfolio.avg_price + qty * price
                 portfolio.quantity += qty
-                portfolio.avg_price = total_cost / portfolio.quantity
+                portfolio.avg_price = to_price(total_cost / portfolio.quantity)
                 portfolio.updated_at = datetime.utcnow()
             else:
                 # Create new position
@@ -776,6 +958,10 @@ def create_order():
                 else:
                     portfolio.updated_at = datetime.utcnow()
         
+        # Append the fill to the position ledger
+        db.flush()
+        record_fill(db, new_order, filled_at=market_now())
+        
         # Commit all changes
         db.commit()
         
@@ -785,11 +971,11 @@ def create_order():
             'symbol': symbol,
             'side': side,
             'quantity': qty,
-            'price': price,
-            'total_value': order_value,
+            'price': to_float(price),
+            'total_value': to_float(order_value),
             'status': 'filled',
-            'executed_at': datetime.utcnow().isoformat(),
-            'new_balance': user.balance
+            'executed_at': market_now().isoformat(),
+            'new_balance': to_float(user.balance)
         }), 201
         
     except Exception as e:
@@ -817,8 +1003,8 @@ def get_user_orders():
             'id': order.id,
             'symbol': order.symbol,
             'side': order.side,
-            'qty': order.qty,
-            'price': order.price,
+            'qty': to_float(order.qty),
+            'price': to_float(order.price),
             'status': order.status,
             'timestamp': order.timestamp.isoformat()
         } for order in orders]
@@ -830,16 +1016,16 @@ def get_user_orders():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/account', methods=['GET'])
+@jwt_required()
 def get_account():
     """Get account information including cash, buying power, and portfolio value"""
-    print("=== ACCOUNT ENDPOINT CALLED ===")
     try:
-        account_info = get_account_info()
-        print("Account info:", account_info)
+        account_info = get_account_info(get_jwt_identity())
         
         if 'error' in account_info:
             print("Account error:", account_info['error'])
-            return jsonify({'error': account_info['error']}), 500
+            status = 404 if account_info['error'] == 'User not found' else 500
+            return jsonify({'error': account_info['error']}), status
         
         return jsonify(account_info)
     except Exception as e:
@@ -867,6 +1053,52 @@ def get_portfolio():
         print(f"Portfolio endpoint error: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/portfolio/history', methods=['GET'])
+@jwt_required()
+def portfolio_history():
+    """Get the equity curve of the authenticated user's account"""
+    timeframe = request.args.get('timeframe', '1M').upper()
+    if timeframe not in HISTORY_WINDOWS:
+        return jsonify({'error': f'Unsupported timeframe: {timeframe}'}), 400
+    
+    try:
+        db = next(get_db())
+        return jsonify(get_portfolio_history(db, get_jwt_identity(), timeframe))
+    except Exception as e:
+        print(f"Portfolio history error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/portfolio/risk', methods=['GET'])
+@jwt_required()
+def portfolio_risk_metrics():
+    """Volatility, beta, VaR and covariance of the authenticated user's holdings"""
+    try:
+        window = int(request.args.get('window', TRADING_DAYS))
+        confidence = float(request.args.get('confidence', 0.95))
+    except ValueError:
+        return jsonify({'error': 'window must be an integer and confidence a number'}), 400
+    if not MIN_WINDOW <= window <= MAX_WINDOW:
+        return jsonify({'error': f'window must be between {MIN_WINDOW} and {MAX_WINDOW} trading days'}), 400
+    if not 0.5 <= confidence < 1:
+        return jsonify({'error': 'confidence must be at least 0.5 and below 1'}), 400
+    benchmark = request.args.get('benchmark', RISK_BENCHMARK).upper()
+    # The configured benchmark is trusted like STOCKS; any other must be listed
+    if benchmark != RISK_BENCHMARK and not is_listed(benchmark):
+        return jsonify({'error': f'Unknown benchmark symbol: {benchmark}'}), 400
+    
+    try:
+        db = next(get_db())
+        holdings = db.query(Portfolio).filter(Portfolio.user_id == int(get_jwt_identity()), Portfolio.quantity > 0).all()
+        if not holdings:
+            return jsonify({'error': 'No open positions'}), 404
+        quantities = {holding.symbol: holding.quantity for holding in holdings}
+        return jsonify(portfolio_risk(quantities, window, benchmark, confidence))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Portfolio risk error: {e}")
+        return jsonify({'error': str(e)}), 500
+
 # Protected profile endpoints
 @app.route('/profiles', methods=['GET'])
 @jwt_required()
@@ -953,6 +1185,83 @@ def update_profile():
         'updated_at': profile.updated_at.isoformat()
     })
 
+def replay_status():
+    replay = active_replay()
+    if replay is None:
+        return {'active': False}
+    return {
+        'active': True,
+        'simulated_time': replay.now().isoformat(),
+        'speed': replay.clock.speed,
+        'interval': replay.interval,
+        'symbols': replay.symbols
+    }
+
+@app.route('/replay', methods=['GET', 'POST', 'PUT', 'DELETE'])
+def replay_control():
+    """Start (POST), adjust (PUT), inspect (GET) or stop (DELETE) a market replay"""
+    if not REPLAY_ENABLED:
+        return jsonify({'error': 'Replay is disabled'}), 404
+    
+    data = request.get_json(silent=True) or {}
+    if request.method == 'POST':
+        symbols = [s.upper() for s in data.get('symbols', STOCKS)]
+        interval = data.get('interval', '1d')
+        if interval not in REPLAY_INTERVALS:
+            return jsonify({'error': f'interval must be one of {", ".join(REPLAY_INTERVALS)}'}), 400
+        stop_replay()
+        bars = load_replay_bars(symbols)
+        minutes = load_replay_minutes(symbols) if interval == '1m' else None
+        if not bars:
+            return jsonify({'error': 'No bars available for the requested symbols'}), 400
+        if interval == '1m' and not minutes:
+            return jsonify({'error': 'No minute bars available for the requested symbols'}), 400
+        # Default to the close of the first bar so quotes are available at once
+        first_bars = (minutes or bars).values()
+        first_close = min(frame.index[0] for frame in first_bars) + (timedelta(minutes=1) if minutes else timedelta(days=1))
+        start = data.get('start') or first_close.isoformat()
+        try:
+            speed = float(data.get('speed', 1.0))
+            reset_replay_accounts()
+            start_replay(bars, start, speed=speed, minutes_by_symbol=minutes)
+        except (ValueError, TypeError) as e:
+            return jsonify({'error': str(e)}), 400
+    elif request.method == 'PUT':
+        try:
+            replay = adjust_replay(
+                speed=float(data['speed']) if 'speed' in data else None,
+                advance=float(data['advance']) if 'advance' in data else None
+            )
+        except (ValueError, TypeError) as e:
+            return jsonify({'error': str(e)}), 400
+        if replay is None:
+            return jsonify({'error': 'No replay running'}), 409
+    elif request.method == 'DELETE':
+        stop_replay()
+    
+    if request.method in ('POST', 'DELETE'):
+        # Models and signals were trained on a different market timeline
+        symbol_states.clear()
+    return jsonify(replay_status())
+
+@app.after_request
+def compress_response(response):
+    """gzip/brotli-compress API payloads when the client accepts it"""
+    if (response.direct_passthrough or response.status_code < 200 or response.status_code >= 300
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in ('application/json', wire.COLUMNAR_JSON, wire.MSGPACK)):
+        return response
+    body, encoding = wire.compress(response.get_data(), request.headers.get('Accept-Encoding'))
+    if encoding:
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+        # Each coding of a resource is its own representation and needs its own strong validator
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(coded_etag(etag, encoding), weak)
+    response.vary.add('Accept-Encoding')
+    return response
+
 # Add JWT error handler
 @app.errorhandler(422)
 def handle_422_error(error):
@@ -979,7 +1288,7 @@ def debug_users():
             'id': user.id,
             'username': user.username,
             'email': user.email,
-            'balance': user.balance
+            'balance': to_float(user.balance)
         } for user in users]
         
         print("Users in database:", users_data)
@@ -998,8 +1307,8 @@ def debug_portfolio():
             'id': portfolio.id,
             'user_id': portfolio.user_id,
             'symbol': portfolio.symbol,
-            'quantity': portfolio.quantity,
-            'avg_price': portfolio.avg_price
+            'quantity': to_float(portfolio.quantity),
+            'avg_price': to_float(portfolio.avg_price)
         } for portfolio in portfolios]
         
         print("Portfolio entries:", portfolios_data)
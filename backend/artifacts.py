@@ -0,0 +1,101 @@
+import json
+import os
+import pickle
+import shutil
+import uuid
+import pandas as pd
+import xgboost as xgb
+import config
+from fast_inference import TreeEnsemble
+
+LATEST_FILE = 'LATEST'
+BOOSTER_FILE = 'booster.ubj'
+# Versions kept per symbol; older ones are pruned after each publish
+KEEP_VERSIONS = 2
+
+class ModelArtifact(TreeEnsemble):
+    """A published per-symbol model, mapped read-only from disk.
+
+    Predictions run on the memory-mapped tree arrays, so every worker
+    process serving the symbol shares one copy of the model in the page
+    cache. get_booster() loads the full XGBoost booster only when a warm
+    start needs it (see retraining.refresh_model).
+    """
+
+    def get_booster(self):
+        return xgb.Booster(model_file=os.path.join(self.directory, BOOSTER_FILE))
+
+def is_available(model):
+    """False for a ModelArtifact whose version directory has been pruned"""
+    return not isinstance(model, ModelArtifact) or os.path.isfile(os.path.join(model.directory, BOOSTER_FILE))
+
+def artifact_dir():
+    return config.MODEL_ARTIFACT_DIR or None
+
+def _symbol_dir(symbol):
+    return os.path.join(artifact_dir(), symbol.upper())
+
+def publish_model(symbol, version, scaler, model, features, state):
+    """Write a trained model as a versioned artifact and point LATEST at it.
+
+    The version directory is filled under a temporary name and renamed into
+    place, so readers never see a partial artifact; if another worker
+    published the same version first, its copy wins.
+    """
+    directory = os.path.join(_symbol_dir(symbol), version)
+    if not os.path.isdir(directory):
+        tmp_directory = f"{directory}.tmp-{uuid.uuid4().hex}"
+        TreeEnsemble(model.get_booster()).save(tmp_directory)
+        model.get_booster().save_model(os.path.join(tmp_directory, BOOSTER_FILE))
+        with open(os.path.join(tmp_directory, 'scaler.pkl'), 'wb') as f:
+            pickle.dump(scaler, f)
+        with open(os.path.join(tmp_directory, 'meta.json'), 'w') as f:
+            json.dump({
+                'version': version,
+                'features': list(features),
+                'state': {**state, 'last_bar': pd.Timestamp(state['last_bar']).isoformat()},
+            }, f)
+        try:
+            os.rename(tmp_directory, directory)
+        except OSError:
+            shutil.rmtree(tmp_directory, ignore_errors=True)
+
+    latest = os.path.join(_symbol_dir(symbol), LATEST_FILE)
+    with open(latest + '.tmp', 'w') as f:
+        f.write(version)
+    os.replace(latest + '.tmp', latest)
+    _prune(symbol, version)
+
+def _prune(symbol, keep):
+    versions = [
+        entry for entry in os.scandir(_symbol_dir(symbol))
+        if entry.is_dir() and '.tmp-' not in entry.name and entry.name != keep
+    ]
+    versions.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    # Processes still mapping a removed version keep their pages until they reload
+    for entry in versions[KEEP_VERSIONS - 1:]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+def load_model(symbol, version=None):
+    """(scaler, ModelArtifact, features, state) for a published model, or None.
+
+    version defaults to the symbol's LATEST pointer.
+    """
+    if artifact_dir() is None:
+        return None
+    try:
+        if version is None:
+            with open(os.path.join(_symbol_dir(symbol), LATEST_FILE)) as f:
+                version = f.read().strip()
+        directory = os.path.join(_symbol_dir(symbol), version)
+        with open(os.path.join(directory, 'meta.json')) as f:
+            meta = json.load(f)
+        with open(os.path.join(directory, 'scaler.pkl'), 'rb') as f:
+            scaler = pickle.load(f)
+        model = ModelArtifact.load(directory)
+    except (OSError, ValueError):
+        return None
+    model.directory = directory
+    model.version = meta['version']
+    state = {**meta['state'], 'last_bar': pd.Timestamp(meta['state']['last_bar'])}
+    return scaler, model, meta['features'], state
@@ -0,0 +1,149 @@
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from model import SIGNAL_COLUMNS, create_features, recommendation_signals
+from sources import get_source
+
+TRADING_DAYS = 252
+# Default one-way transaction cost per unit of turnover, in basis points
+DEFAULT_COST_BPS = 5.0
+
+def feature_panel(bars_by_symbol, workers=None):
+    """Close plus signal indicators for every symbol, as date x symbol matrices.
+
+    create_features runs per symbol on a thread pool; symbols trading on
+    different days are aligned on the union of dates with NaN gaps.
+    """
+    symbols = sorted(bars_by_symbol)
+
+    def features_for(symbol):
+        bars = bars_by_symbol[symbol]
+        if 'Date' in bars.columns:
+            bars = bars.set_index('Date')
+        frame = create_features(bars)
+        index = pd.DatetimeIndex(frame.index)
+        frame.index = index.tz_localize(None) if index.tz is not None else index
+        return frame[['Close', *SIGNAL_COLUMNS]]
+
+    with ThreadPoolExecutor(workers or min(8, max(1, len(symbols)))) as pool:
+        frames = dict(zip(symbols, pool.map(features_for, symbols)))
+    panel = pd.concat(frames, axis=1).sort_index()
+    return {
+        column: panel.xs(column, axis=1, level=1).reindex(columns=symbols).to_numpy(dtype=np.float64)
+        for column in ('Close', *SIGNAL_COLUMNS)
+    }, panel.index, symbols
+
+def hold_positions(signal, allow_short=False):
+    """Position after each bar: buy -> long, sell -> flat (or short), hold -> unchanged.
+
+    The last non-hold signal is carried forward with a running maximum over
+    row numbers, so there is no Python loop over bars.
+    """
+    target = np.where(signal > 0, 1.0, -1.0 if allow_short else 0.0)
+    rows = np.arange(len(signal))[:, None]
+    last = np.maximum.accumulate(np.where(signal != 0, rows, -1), axis=0)
+    positions = np.take_along_axis(target, np.maximum(last, 0), axis=0)
+    positions[last < 0] = 0.0
+    return positions
+
+def simulate(close, positions, cost_bps=DEFAULT_COST_BPS):
+    """Daily strategy returns for positions taken at each close.
+
+    A position decided on bar t earns bar t+1's return, so signals never
+    trade on the close they were computed from; every change in position
+    pays cost_bps on the traded notional.
+    """
+    returns = np.zeros_like(close)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        returns[1:] = close[1:] / close[:-1] - 1.0
+    returns = np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0)
+
+    held = np.vstack([np.zeros((1, close.shape[1])), positions[:-1]])
+    turnover = np.abs(np.diff(positions, axis=0, prepend=0.0))
+    strategy = held * returns - turnover * cost_bps / 10_000
+    return strategy, returns, turnover
+
+def max_drawdown(equity):
+    peaks = np.maximum.accumulate(equity, axis=0)
+    return (equity / peaks - 1.0).min(axis=0)
+
+def summarize(strategy, returns, turnover, positions, periods):
+    """Per-column performance statistics of daily return matrices"""
+    equity = np.cumprod(1.0 + strategy, axis=0)
+    years = max(periods / TRADING_DAYS, 1e-9)
+    mean = strategy.mean(axis=0)
+    std = strategy.std(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sharpe = np.where(std > 0, mean / std * np.sqrt(TRADING_DAYS), 0.0)
+    return {
+        'total_return': equity[-1] - 1.0,
+        'cagr': equity[-1] ** (1.0 / years) - 1.0,
+        'sharpe': sharpe,
+        'max_drawdown': max_drawdown(equity),
+        'trades': (turnover > 0).sum(axis=0),
+        'exposure': (positions != 0).mean(axis=0),
+        'buy_and_hold_return': np.prod(1.0 + returns, axis=0) - 1.0,
+    }
+
+def backtest_signals(bars_by_symbol, cost_bps=DEFAULT_COST_BPS, allow_short=False, workers=None):
+    """Backtest the get_recommendation rules over every symbol at once.
+
+    Returns {'symbols': {symbol: stats}, 'portfolio': stats, 'equity':
+    DataFrame}, where the portfolio is an equal-weight daily-rebalanced mix
+    of the per-symbol strategies.
+    """
+    columns, dates, symbols = feature_panel(bars_by_symbol, workers)
+    signal, _ = recommendation_signals(
+        columns['RSI'], columns['MACD'], columns['MACD_Signal'], columns['Stoch_K'], columns['Stoch_D']
+    )
+    # Warm-up rows (any indicator missing) never trade
+    warming_up = np.any([np.isnan(columns[name]) for name in SIGNAL_COLUMNS], axis=0)
+    signal = np.where(warming_up, 0, signal)
+
+    positions = hold_positions(signal, allow_short)
+    strategy, returns, turnover = simulate(columns['Close'], positions, cost_bps)
+
+    per_symbol = summarize(strategy, returns, turnover, positions, len(dates))
+    listed = ~np.isnan(columns['Close'])
+    weights = listed / np.maximum(listed.sum(axis=1, keepdims=True), 1)
+    portfolio = summarize(
+        (strategy * weights).sum(axis=1, keepdims=True),
+        (returns * weights).sum(axis=1, keepdims=True),
+        (turnover * weights).sum(axis=1, keepdims=True),
+        (positions * weights).sum(axis=1, keepdims=True),
+        len(dates)
+    )
+
+    def row(stats, i):
+        return {name: float(values[i]) for name, values in stats.items()}
+
+    return {
+        'symbols': {symbol: row(per_symbol, i) for i, symbol in enumerate(symbols)},
+        'portfolio': row(portfolio, 0),
+        'equity': pd.DataFrame(np.cumprod(1.0 + strategy, axis=0), index=dates, columns=symbols),
+    }
+
+def run_backtest(symbols, period='max', source=None, **kwargs):
+    """Load daily bars from a market data source and backtest them"""
+    source = source or get_source()
+    bars = {symbol: source.daily_bars(symbol, period) for symbol in symbols}
+    return backtest_signals({s: b for s, b in bars.items() if not b.empty}, **kwargs)
+
+if __name__ == '__main__':
+    import argparse
+    import time
+    from config import STOCKS
+
+    parser = argparse.ArgumentParser(description='Backtest the recommendation rules')
+    parser.add_argument('symbols', nargs='*', default=list(STOCKS))
+    parser.add_argument('--period', default='max')
+    parser.add_argument('--cost-bps', type=float, default=DEFAULT_COST_BPS)
+    parser.add_argument('--short', action='store_true', help='go short on sell signals instead of flat')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    result = run_backtest(args.symbols, args.period, cost_bps=args.cost_bps, allow_short=args.short)
+    elapsed = time.perf_counter() - started
+    report = pd.DataFrame({**result['symbols'], 'PORTFOLIO': result['portfolio']}).T
+    print(report.round(4).to_string())
+    print(f"\nBacktested {len(result['symbols'])} symbols x {len(result['equity'])} bars in {elapsed:.3f}s")
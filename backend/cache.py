@@ -0,0 +1,46 @@
+import threading
+import time
+
+class TTLCache:
+    """Small thread-safe key/value cache whose entries expire after `ttl` seconds"""
+
+    def __init__(self, ttl, max_entries=1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            if len(self._entries) >= self.max_entries and key not in self._entries:
+                # Drop the entry closest to expiry to make room
+                oldest = min(self._entries, key=lambda k: self._entries[k][1])
+                del self._entries[oldest]
+            self._entries[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+
+    def invalidate(self, match):
+        """Remove one key, or every key for which `match(key)` is true"""
+        with self._lock:
+            if callable(match):
+                for key in [k for k in self._entries if match(k)]:
+                    del self._entries[key]
+            else:
+                self._entries.pop(match, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
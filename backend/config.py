@@ -42,4 +42,58 @@ ALPACA_BASE_URL = os.getenv('APCA_API_BASE_URL', 'https://paper-api.alpaca.marke
 
 # Flask Configuration
 FLASK_ENV = os.getenv('FLASK_ENV', 'development')
-DEBUG = os.getenv('DEBUG', 'True').lower() == 'true' 
\ No newline at end of file
+DEBUG = os.getenv('DEBUG', 'True').lower() == 'true'
+
+# Stock configuration
+STOCKS = {
+    'NVDA': {'name': 'NVIDIA', 'symbol': 'NVDA'},
+    'AMD': {'name': 'Advanced Micro Devices', 'symbol': 'AMD'},
+    'AAPL': {'name': 'Apple Inc.', 'symbol': 'AAPL'},
+    'GOOGL': {'name': 'Alphabet Inc.', 'symbol': 'GOOGL'},
+    'MSFT': {'name': 'Microsoft Corporation', 'symbol': 'MSFT'},
+    'TSLA': {'name': 'Tesla Inc.', 'symbol': 'TSLA'},
+    'META': {'name': 'Meta Platforms', 'symbol': 'META'},
+    'AMZN': {'name': 'Amazon.com Inc.', 'symbol': 'AMZN'}
+}
+
+# Price model: 'per_symbol' trains one model per ticker, 'pooled' one model
+# across every symbol in STOCKS
+MODEL_MODE = os.getenv('MODEL_MODE', 'per_symbol')
+# Prediction backend: 'xgboost' calls model.predict, 'numpy' evaluates the
+# trees as flat arrays (fast_inference.py), which is faster for a few rows
+INFERENCE_BACKEND = os.getenv('INFERENCE_BACKEND', 'xgboost')
+
+# Per-symbol model cache in each worker: at most this many symbols, and at
+# most this many MB of models and feature rows (0 for no memory limit)
+SYMBOL_CACHE_SIZE = int(os.getenv('SYMBOL_CACHE_SIZE', '256'))
+SYMBOL_CACHE_MB = int(os.getenv('SYMBOL_CACHE_MB', '512'))
+
+# Market Data Configuration
+# 'yfinance' downloads bars; 'csv' replays local files from MARKET_DATA_DIR
+MARKET_DATA_SOURCE = os.getenv('MARKET_DATA_SOURCE', 'yfinance')
+MARKET_DATA_DIR = os.getenv('MARKET_DATA_DIR', os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Feature store: matrices kept in memory, and where built ones are spilled as
+# memory-mappable .npy files (set FEATURE_STORE_DIR empty to keep memory only)
+FEATURE_STORE_RESIDENT = int(os.getenv('FEATURE_STORE_RESIDENT', '64'))
+FEATURE_STORE_DIR = os.getenv('FEATURE_STORE_DIR', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.feature_store'))
+
+# Published per-symbol models, memory-mapped by every worker process
+# (set empty to keep each worker's models private)
+MODEL_ARTIFACT_DIR = os.getenv('MODEL_ARTIFACT_DIR', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.model_artifacts'))
+
+# Symbol master: os.pathsep-separated listing files (NASDAQ Trader pipe files
+# or Symbol,Name,Exchange CSV) of every tradable ticker; STOCKS is always listed
+SYMBOL_LISTING_FILES = os.getenv('SYMBOL_LISTING_FILES', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'symbols.csv'))
+
+# Benchmark /portfolio/risk measures beta against
+RISK_BENCHMARK = os.getenv('RISK_BENCHMARK', 'SPY')
+
+# Market replay (simulated time) control endpoints, for load testing only
+REPLAY_ENABLED = os.getenv('REPLAY_ENABLED', 'False').lower() == 'true'
+# Where a running replay's bars and clock are published so every worker
+# process serves the same simulated market (empty keeps it per process)
+REPLAY_DIR = os.getenv('REPLAY_DIR', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.replay'))
+# Accounts, orders and fills created while a replay runs; emptied when a new
+# replay starts and never mixed with DATABASE_URL
+REPLAY_DATABASE_URL = os.getenv('REPLAY_DATABASE_URL', 'sqlite:///' + os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.replay_accounts.db'))
@@ -0,0 +1,77 @@
+import numpy as np
+
+DOWNSAMPLE_METHODS = ('lttb', 'minmax')
+# Smallest max_points both methods can honour: minmax needs the two
+# endpoints plus one min/max bucket
+MIN_POINTS = 4
+
+def _bucket_edges(n, buckets):
+    """Start offsets of `buckets` contiguous buckets covering points 1..n-2"""
+    return np.linspace(1, n - 1, buckets + 1).astype(np.int64)
+
+def lttb_indices(y, threshold, x=None):
+    """Indices of the points kept by largest-triangle-three-buckets.
+
+    The first and last points are always kept; every interior bucket keeps
+    the point forming the largest triangle with the previously kept point
+    and the mean of the next bucket. Bucket means are computed up front with
+    a single reduceat, leaving only the argmax per bucket in the loop.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.arange(n, dtype=np.float64) if x is None else np.asarray(x, dtype=np.float64)
+
+    buckets = threshold - 2
+    edges = _bucket_edges(n, buckets)
+    widths = np.diff(edges)
+    mean_x = np.add.reduceat(x[:-1], edges[:-1]) / widths
+    mean_y = np.add.reduceat(y[:-1], edges[:-1]) / widths
+    # The "next bucket" of the last interior bucket is the final point
+    next_x = np.append(mean_x[1:], x[-1])
+    next_y = np.append(mean_y[1:], y[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(buckets):
+        start, end = edges[i], edges[i + 1]
+        area = np.abs(
+            (x[a] - next_x[i]) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (next_y[i] - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+def minmax_indices(y, threshold):
+    """Indices keeping the minimum and maximum of each bucket (fully vectorized)"""
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if threshold >= n or threshold < 4:
+        return np.arange(n)
+
+    buckets = (threshold - 2) // 2
+    edges = _bucket_edges(n, buckets)
+    interior = np.arange(1, n - 1)
+    bucket_id = np.searchsorted(edges, interior, side='right') - 1
+    # Sort by (bucket, value): the first/last entry of each bucket is its min/max
+    order = interior[np.lexsort((y[1:-1], bucket_id))]
+    starts = edges[:-1] - 1
+    ends = edges[1:] - 2
+    keep = np.concatenate(([0], order[starts], order[ends], [n - 1]))
+    return np.unique(keep)
+
+def downsample_indices(values, max_points, method='lttb'):
+    """Indices to keep so `values` has at most `max_points` points, or None if no reduction is needed"""
+    if max_points is None:
+        return None
+    if max_points < MIN_POINTS:
+        raise ValueError(f"max_points must be at least {MIN_POINTS}")
+    if len(values) <= max_points:
+        return None
+    if method == 'minmax':
+        return minmax_indices(values, max_points)
+    return lttb_indices(values, max_points)
@@ -0,0 +1,134 @@
+import json
+import os
+import threading
+import weakref
+import numpy as np
+import config
+
+class TreeEnsemble:
+    """A trained XGBoost regressor flattened into NumPy arrays.
+
+    Every node of every tree lives in one set of flat arrays; evaluation
+    walks all trees for all rows at once, one tree level per step, so a
+    prediction is max_depth vectorized gathers instead of building a
+    DMatrix. Leaves point at themselves, which lets every walk run the same
+    fixed number of steps. Comparisons and the leaf sum are done in float32
+    in tree order, like XGBoost's CPU predictor, so outputs match exactly.
+    """
+
+    ARRAYS = ('roots', 'left', 'right', 'feature', 'threshold', 'default_left')
+
+    def __init__(self, booster):
+        learner = json.loads(booster.save_raw('json'))['learner']
+        self.base_score = np.float32(float(learner['learner_model_param']['base_score']))
+        trees = learner['gradient_booster']['model']['trees']
+
+        offsets = np.cumsum([0] + [len(tree['left_children']) for tree in trees])
+        self.roots = offsets[:-1].astype(np.int64)
+        left, right, feature, threshold, default_left = [], [], [], [], []
+        for offset, tree in zip(offsets, trees):
+            children_left = np.asarray(tree['left_children'], dtype=np.int64)
+            children_right = np.asarray(tree['right_children'], dtype=np.int64)
+            nodes = np.arange(len(children_left)) + offset
+            leaf = children_left < 0
+            left.append(np.where(leaf, nodes, children_left + offset))
+            right.append(np.where(leaf, nodes, children_right + offset))
+            feature.append(np.where(leaf, 0, tree['split_indices']))
+            # Leaves keep their value in split_conditions
+            threshold.append(np.asarray(tree['split_conditions'], dtype=np.float32))
+            default_left.append(np.asarray(tree['default_left'], dtype=bool))
+
+        self.left = np.concatenate(left)
+        self.right = np.concatenate(right)
+        self.feature = np.concatenate(feature).astype(np.int64)
+        self.threshold = np.concatenate(threshold)
+        self.default_left = np.concatenate(default_left)
+        self.depth = self._max_depth()
+
+    def _max_depth(self):
+        is_leaf = self.left == np.arange(len(self.left))
+        node = self.roots.copy()
+        depth = 0
+        while not is_leaf[node].all():
+            # Following left and right children in turn covers the longest path
+            node = np.concatenate([self.left[node], self.right[node]])
+            node = np.unique(node)
+            depth += 1
+        return depth
+
+    def save(self, directory):
+        """Write the node arrays as .npy files that load() can memory-map"""
+        os.makedirs(directory, exist_ok=True)
+        for name in self.ARRAYS:
+            np.save(os.path.join(directory, name + '.npy'), getattr(self, name))
+        np.save(os.path.join(directory, 'params.npy'), np.array([self.base_score, self.depth], dtype=np.float64))
+
+    @classmethod
+    def load(cls, directory, mmap_mode='r'):
+        """A saved ensemble whose node arrays are read-only maps of the files.
+
+        Every process loading the same directory shares one copy of the
+        arrays in the page cache.
+        """
+        ensemble = cls.__new__(cls)
+        for name in cls.ARRAYS:
+            setattr(ensemble, name, np.load(os.path.join(directory, name + '.npy'), mmap_mode=mmap_mode))
+        base_score, depth = np.load(os.path.join(directory, 'params.npy'))
+        ensemble.base_score = np.float32(base_score)
+        ensemble.depth = int(depth)
+        return ensemble
+
+    def leaves(self, X):
+        """Leaf index reached in every tree for every row, shape (rows, trees)"""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        rows = np.arange(len(X))[:, None]
+        node = np.broadcast_to(self.roots, (len(X), len(self.roots))).copy()
+        for _ in range(self.depth):
+            value = X[rows, self.feature[node]]
+            go_left = np.where(np.isnan(value), self.default_left[node], value < self.threshold[node])
+            node = np.where(go_left, self.left[node], self.right[node])
+        return node
+
+    def predict(self, X):
+        values = self.threshold[self.leaves(X)]
+        # cumsum adds strictly left to right (np.sum would add pairwise),
+        # reproducing XGBoost's float32 accumulation order tree by tree
+        values = np.hstack([np.full((len(values), 1), self.base_score, dtype=np.float32), values])
+        return np.cumsum(values, axis=1, dtype=np.float32)[:, -1]
+
+_compiled = weakref.WeakKeyDictionary()
+
+def compile_model(model):
+    """The TreeEnsemble for a fitted XGBRegressor, built once per model"""
+    ensemble = _compiled.get(model)
+    if ensemble is None:
+        ensemble = _compiled[model] = TreeEnsemble(model.get_booster())
+    return ensemble
+
+def predictor(model):
+    """model.predict, or the NumPy tree walker when INFERENCE_BACKEND=numpy"""
+    if isinstance(model, TreeEnsemble):
+        return model.predict
+    if config.INFERENCE_BACKEND == 'numpy':
+        return compile_model(model).predict
+    return model.predict
+
+_inputs = threading.local()
+
+def input_matrix(rows):
+    """rows copied into this thread's preallocated float32 input buffer.
+
+    XGBoost converts whatever it is given to float32 anyway; filling a
+    reused C-contiguous float32 block avoids that conversion and any
+    per-request allocation. The returned view is only valid until the
+    thread's next call.
+    """
+    width = len(rows[0])
+    buffer = getattr(_inputs, 'buffer', None)
+    if buffer is None or buffer.shape[1] != width or len(buffer) < len(rows):
+        buffer = _inputs.buffer = np.empty((max(len(rows), 64), width), dtype=np.float32)
+    for i, row in enumerate(rows):
+        buffer[i] = row
+    return buffer[:len(rows)]
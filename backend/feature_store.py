@@ -0,0 +1,212 @@
+import hashlib
+import os
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import config
+from model import MODEL_FEATURES, MODEL_VERSION, create_features
+from market_data import get_bars
+from replay import active_replay
+from sources import OHLCV_COLUMNS, apply_period, get_source
+
+COLUMNS = tuple(OHLCV_COLUMNS) + MODEL_FEATURES
+
+def feature_set_hash(columns=COLUMNS):
+    """Short hash identifying the columns create_features produces.
+
+    MODEL_VERSION is bumped whenever the feature definitions change, so it
+    is part of the hash; spilled matrices from another feature set are
+    never read back.
+    """
+    return hashlib.sha1('|'.join((MODEL_VERSION, *columns)).encode('utf-8')).hexdigest()[:12]
+
+FEATURE_SET = feature_set_hash()
+
+def bar_dates(bars):
+    """A bars index as naive datetime64[ns] values"""
+    index = pd.DatetimeIndex(bars['Date'] if 'Date' in bars.columns else bars.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.to_numpy(dtype='datetime64[ns]')
+
+class FeatureMatrix:
+    """OHLCV plus every model feature for one symbol's daily bars.
+
+    values is a rows x COLUMNS float64 array (NaN during indicator warm-up)
+    and may be a read-only memory map of a spilled matrix. Treat both as
+    immutable: every reader shares the same arrays.
+    """
+
+    def __init__(self, dates, values, feature_set=FEATURE_SET):
+        self.dates = dates
+        self.values = values
+        self.feature_set = feature_set
+        self.position = {column: i for i, column in enumerate(COLUMNS)}
+
+    @classmethod
+    def build(cls, bars):
+        if bars.empty:
+            return cls(np.empty(0, dtype='datetime64[ns]'), np.empty((0, len(COLUMNS))))
+        frame = bars[OHLCV_COLUMNS].astype(np.float64).set_axis(bar_dates(bars))
+        frame = create_features(frame.sort_index())
+        return cls(frame.index.to_numpy(dtype='datetime64[ns]'), frame[list(COLUMNS)].to_numpy(dtype=np.float64))
+
+    def __len__(self):
+        return len(self.dates)
+
+    def matches(self, bars):
+        """True if the matrix was built from these bars (same length and last bar).
+
+        The last bar's OHLCV is compared too: during the session the daily
+        series ends with today's bar, whose close and volume keep moving.
+        """
+        if len(bars) != len(self):
+            return False
+        if len(self) == 0:
+            return True
+        last = bars[OHLCV_COLUMNS].iloc[-1].to_numpy(dtype=np.float64)
+        return (bar_dates(bars.iloc[-1:])[0] == self.dates[-1]
+                and np.array_equal(last, self.values[-1, :len(OHLCV_COLUMNS)], equal_nan=True))
+
+    def column(self, name):
+        return self.values[:, self.position[name]]
+
+    def frame(self, columns=COLUMNS):
+        """Date-indexed DataFrame of the requested columns"""
+        index = pd.DatetimeIndex(self.dates, name='Date')
+        return pd.DataFrame(self.values[:, [self.position[c] for c in columns]], index=index, columns=list(columns))
+
+    def prepared(self, period=None):
+        """Complete rows shaped like model.prepare_data's output, optionally trimmed to a period"""
+        frame = apply_period(self.frame(), period).dropna()
+        return frame.reset_index()
+
+class FeatureStore:
+    """Per-symbol FeatureMatrix cache, rebuilt only when the bars change.
+
+    Up to `resident` matrices are held in memory (least recently used are
+    dropped first). With a spill_dir each built matrix is also written as
+    .npy files and read back with mmap_mode='r', so a dropped matrix or a
+    restarted process pages it in from disk instead of recomputing it.
+    """
+
+    def __init__(self, spill_dir=None, resident=64):
+        self.spill_dir = spill_dir
+        self.resident = resident
+        self._matrices = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'spill_loads': 0, 'builds': 0}
+
+    def _spill_root(self, key):
+        return os.path.join(self.spill_dir, '-'.join((*key, FEATURE_SET)))
+
+    def spill_paths(self, key):
+        """(dates, values) .npy paths of the matrix currently spilled under key, or None"""
+        root = self._spill_root(key)
+        try:
+            with open(os.path.join(root, 'CURRENT')) as f:
+                version = f.read().strip()
+        except OSError:
+            return None
+        return (os.path.join(root, version, 'dates.npy'),
+                os.path.join(root, version, 'values.npy'))
+
+    def _spill(self, key, matrix):
+        """Write dates and values as one new version, then point CURRENT at it.
+
+        Every writer uses its own version directory and temporary pointer, so
+        workers spilling the same symbol at once never collide, and a reader
+        always sees a dates/values pair written together.
+        """
+        root = self._spill_root(key)
+        version = uuid.uuid4().hex
+        directory = os.path.join(root, version)
+        os.makedirs(directory)
+        np.save(os.path.join(directory, 'dates.npy'), matrix.dates)
+        np.save(os.path.join(directory, 'values.npy'), matrix.values)
+        pointer = os.path.join(root, 'CURRENT')
+        with open(f"{pointer}.tmp-{version}", 'w') as f:
+            f.write(version)
+        os.replace(f"{pointer}.tmp-{version}", pointer)
+        # Keep the previous version for a writer whose pointer may still land;
+        # readers mapping a removed version keep their pages until they drop it
+        versions = [entry for entry in os.scandir(root) if entry.is_dir() and entry.name != version]
+        versions.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+        for entry in versions[1:]:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+    def _load_spilled(self, key, bars):
+        paths = self.spill_paths(key)
+        if paths is None:
+            return None
+        try:
+            dates = np.load(paths[0])
+            values = np.load(paths[1], mmap_mode='r')
+        except (OSError, ValueError):
+            # Missing, pruned by a concurrent spill, or partially written
+            return None
+        if values.ndim != 2 or len(values) != len(dates) or values.shape[1] != len(COLUMNS):
+            return None
+        matrix = FeatureMatrix(dates, values)
+        return matrix if matrix.matches(bars) else None
+
+    def _remember(self, key, matrix):
+        with self._lock:
+            self._matrices[key] = matrix
+            self._matrices.move_to_end(key)
+            while len(self._matrices) > self.resident:
+                self._matrices.popitem(last=False)
+
+    def get(self, key, bars, spill=True):
+        """The FeatureMatrix for `bars`, stored under `key` (a tuple of strings).
+
+        With spill=False the matrix is neither read from nor written to disk.
+        """
+        with self._lock:
+            matrix = self._matrices.get(key)
+            if matrix is not None and matrix.matches(bars):
+                self._matrices.move_to_end(key)
+                self.stats['hits'] += 1
+                return matrix
+
+        spill = spill and self.spill_dir
+        matrix = self._load_spilled(key, bars) if spill else None
+        if matrix is not None:
+            self.stats['spill_loads'] += 1
+        else:
+            matrix = FeatureMatrix.build(bars)
+            self.stats['builds'] += 1
+            if spill and len(matrix):
+                try:
+                    self._spill(key, matrix)
+                except OSError as e:
+                    print(f"Feature matrix {key} not spilled: {e}")
+        self._remember(key, matrix)
+        return matrix
+
+    def clear(self):
+        with self._lock:
+            self._matrices.clear()
+
+_store = FeatureStore(config.FEATURE_STORE_DIR or None, config.FEATURE_STORE_RESIDENT)
+
+def get_store():
+    return _store
+
+def daily_features(symbol, bars=None):
+    """The shared FeatureMatrix over the symbol's daily bars.
+
+    bars defaults to market_data.get_bars(symbol, '1d'); callers that
+    already hold that series can pass it to skip the lookup.
+    """
+    if bars is None:
+        bars = get_bars(symbol, '1d')
+    # Replayed bars are a simulated market; keep them out of the shared spill directory
+    return _store.get((get_source().name, symbol.upper()), bars, spill=active_replay() is None)
+
+def training_data(symbol, period='2y'):
+    """Feature rows for the most recent `period` of daily bars, for fitting a model"""
+    return daily_features(symbol).prepared(period)
@@ -0,0 +1,158 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import func
+from model import Fill, PositionSnapshot, Order
+from money import cash, price as to_price, quantity as to_quantity
+
+# Write a materialized snapshot after this many fills, so reconstructing
+# holdings at any time never replays more than this many rows.
+SNAPSHOT_INTERVAL = 500
+
+def empty_state():
+    return {'cash_flow': Decimal('0.00'), 'positions': {}}
+
+def apply_fill(state, side, symbol, qty, fill_price):
+    """Apply one fill to a holdings state, mirroring the Portfolio update in create_order"""
+    qty = to_quantity(qty)
+    fill_price = to_price(fill_price)
+    positions = state['positions']
+    position = positions.get(symbol)
+    value = cash(qty * fill_price)
+
+    if side == 'buy':
+        state['cash_flow'] -= value
+        if position:
+            total_cost = position['qty'] * position['avg_price'] + qty * fill_price
+            position['qty'] += qty
+            position['avg_price'] = to_price(total_cost / position['qty'])
+        else:
+            positions[symbol] = {'qty': qty, 'avg_price': fill_price}
+    else:
+        state['cash_flow'] += value
+        if position:
+            position['qty'] -= qty
+            if position['qty'] <= 0:
+                del positions[symbol]
+    return state
+
+def dump_state(state):
+    return json.dumps({
+        'cash_flow': str(state['cash_flow']),
+        'positions': {
+            symbol: {'qty': str(p['qty']), 'avg_price': str(p['avg_price'])}
+            for symbol, p in state['positions'].items()
+        }
+    })
+
+def load_state(text):
+    raw = json.loads(text)
+    return {
+        'cash_flow': Decimal(raw['cash_flow']),
+        'positions': {
+            symbol: {'qty': Decimal(p['qty']), 'avg_price': Decimal(p['avg_price'])}
+            for symbol, p in raw['positions'].items()
+        }
+    }
+
+def latest_snapshot(db, user_id, at=None):
+    query = db.query(PositionSnapshot).filter(PositionSnapshot.user_id == user_id)
+    if at is not None:
+        query = query.filter(PositionSnapshot.as_of <= at)
+    return query.order_by(PositionSnapshot.last_fill_id.desc()).first()
+
+def fills_after(db, user_id, after_fill_id=0, at=None):
+    """Fills for a user with id > after_fill_id, optionally only those up to `at`"""
+    query = db.query(Fill).filter(Fill.user_id == user_id, Fill.id > after_fill_id)
+    if at is not None:
+        query = query.filter(Fill.filled_at <= at)
+    return query.order_by(Fill.id).all()
+
+def latest_fill_id(db, user_id):
+    """Id of the user's newest fill (0 before the first), for keying caches on fills"""
+    return db.query(func.max(Fill.id)).filter(Fill.user_id == user_id).scalar() or 0
+
+def fills_between(db, user_id, start, end=None):
+    """Fills for a user with start < filled_at <= end, in execution order"""
+    query = db.query(Fill).filter(Fill.user_id == user_id, Fill.filled_at > start)
+    if end is not None:
+        query = query.filter(Fill.filled_at <= end)
+    return query.order_by(Fill.id).all()
+
+def holdings_at(db, user_id, at=None):
+    """Reconstruct a user's holdings at time `at` (default: now).
+
+    Starts from the newest snapshot taken at or before `at` and replays only
+    the fills recorded after it.
+    """
+    snapshot = latest_snapshot(db, user_id, at)
+    state = load_state(snapshot.state) if snapshot else empty_state()
+    last_fill_id = snapshot.last_fill_id if snapshot else 0
+    for fill in fills_after(db, user_id, last_fill_id, at):
+        apply_fill(state, fill.side, fill.symbol, fill.qty, fill.price)
+    return state
+
+def take_snapshot(db, user_id):
+    """Materialize the current holdings for a user"""
+    snapshot = latest_snapshot(db, user_id)
+    state = load_state(snapshot.state) if snapshot else empty_state()
+    fills = fills_after(db, user_id, snapshot.last_fill_id if snapshot else 0)
+    if not fills:
+        return snapshot
+    for fill in fills:
+        apply_fill(state, fill.side, fill.symbol, fill.qty, fill.price)
+    snapshot = PositionSnapshot(
+        user_id=user_id,
+        last_fill_id=fills[-1].id,
+        as_of=fills[-1].filled_at,
+        state=dump_state(state)
+    )
+    db.add(snapshot)
+    return snapshot
+
+def record_fill(db, order, filled_at=None):
+    """Append a fill for an executed order, snapshotting every SNAPSHOT_INTERVAL fills"""
+    fill = Fill(
+        user_id=order.user_id,
+        order_id=order.id,
+        symbol=order.symbol,
+        side=order.side,
+        qty=order.qty,
+        price=order.price,
+        filled_at=filled_at or datetime.utcnow()
+    )
+    db.add(fill)
+    db.flush()
+
+    snapshot = latest_snapshot(db, order.user_id)
+    pending = db.query(func.count(Fill.id)).filter(
+        Fill.user_id == order.user_id,
+        Fill.id > (snapshot.last_fill_id if snapshot else 0)
+    ).scalar()
+    if pending >= SNAPSHOT_INTERVAL:
+        take_snapshot(db, order.user_id)
+    return fill
+
+def backfill_from_orders(db):
+    """Seed the ledger from filled orders placed before the ledger existed"""
+    users_with_fills = {row[0] for row in db.query(Fill.user_id).distinct()}
+    orders = db.query(Order).filter(Order.status == 'filled').order_by(Order.timestamp, Order.id).all()
+    created = 0
+    for order in orders:
+        if order.user_id in users_with_fills:
+            continue
+        record_fill(db, order, filled_at=order.timestamp)
+        created += 1
+    db.commit()
+    return created
+
+if __name__ == '__main__':
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from config import DATABASE_URL
+    from model import Base
+
+    engine = create_engine(DATABASE_URL)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    print(f"Backfilled {backfill_from_orders(db)} fills from existing orders")
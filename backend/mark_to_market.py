@@ -0,0 +1,126 @@
+import sys
+import numpy as np
+import pandas as pd
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from sqlalchemy import insert
+from ledger import holdings_at
+from market_data import get_daily_closes
+from model import User, Portfolio, DailyValuation
+from money import (
+    CASH_SCALE, PRICE_SCALE, QTY_SCALE,
+    to_units, float_to_units, position_value_cents, unrealized_pnl_cents
+)
+
+def closing_prices(symbols, as_of):
+    """Last close at or before `as_of` for every symbol, from one batched download"""
+    if not symbols:
+        return {}
+    closes = get_daily_closes(symbols, pd.Timestamp(as_of) - timedelta(days=7))
+    closes = closes[closes.index <= pd.Timestamp(as_of)].ffill()
+    if closes.empty:
+        return {}
+    last = closes.iloc[-1]
+    return {symbol: float(last[symbol]) for symbol in last.index if pd.notna(last[symbol])}
+
+def value_accounts(user_ids, balances, position_users, qty_units, avg_units, price_units):
+    """Per-user cash, market value, unrealized P&L and equity in cents, in one vectorized pass"""
+    index = {user_id: i for i, user_id in enumerate(user_ids)}
+    rows = np.array([index[u] for u in position_users], dtype=np.int64)
+    n_users = len(user_ids)
+
+    market_value = np.zeros(n_users, dtype=np.int64)
+    unrealized = np.zeros(n_users, dtype=np.int64)
+    np.add.at(market_value, rows, position_value_cents(qty_units, price_units))
+    np.add.at(unrealized, rows, unrealized_pnl_cents(qty_units, avg_units, price_units))
+
+    cash = to_units(balances, CASH_SCALE)
+    return cash, market_value, unrealized, cash + market_value
+
+def current_holdings(db):
+    """(user_id, cash) and open (user_id, symbol, qty, avg_price) rows from the live tables"""
+    users = db.query(User.id, User.balance).all()
+    positions = db.query(
+        Portfolio.user_id, Portfolio.symbol, Portfolio.quantity, Portfolio.avg_price
+    ).filter(Portfolio.quantity > 0).all()
+    return [(u.id, u.balance or 0) for u in users], [tuple(p) for p in positions]
+
+def ledger_holdings(db, as_of):
+    """The same rows as current_holdings, reconstructed from the fill ledger at the end of `as_of`"""
+    end_of_day = datetime.combine(as_of, time.max)
+    accounts, positions = [], []
+    for user_id, balance in db.query(User.id, User.balance).all():
+        current = holdings_at(db, user_id)
+        past = holdings_at(db, user_id, at=end_of_day)
+        # Cash moves only through fills, so undo the ones recorded since
+        accounts.append((user_id, (balance or 0) - current['cash_flow'] + past['cash_flow']))
+        positions.extend(
+            (user_id, symbol, p['qty'], p['avg_price'])
+            for symbol, p in past['positions'].items() if p['qty'] > 0
+        )
+    return accounts, positions
+
+def run_mark_to_market(db, as_of=None):
+    """Value every account at the close of `as_of` and store a DailyValuation per user.
+
+    Today is valued from the Portfolio table and balances; earlier days are
+    reconstructed from the fill ledger, so backfills store what the accounts
+    held then.
+    """
+    today = date.today()
+    as_of = as_of or today
+    if as_of > today:
+        raise ValueError(f"Cannot value accounts at a future date: {as_of}")
+    accounts, positions = current_holdings(db) if as_of == today else ledger_holdings(db, as_of)
+    if not accounts:
+        return 0
+
+    symbols = sorted({p[1] for p in positions})
+    prices = closing_prices(symbols, as_of)
+    symbol_close = np.array([prices.get(s, np.nan) for s in symbols], dtype=np.float64)
+    close = symbol_close[np.searchsorted(symbols, [p[1] for p in positions])]
+    avg_units = to_units([p[3] for p in positions], PRICE_SCALE)
+    # Positions without a published close are carried at cost
+    price_units = np.where(np.isnan(close), avg_units, float_to_units(np.nan_to_num(close), PRICE_SCALE))
+
+    user_ids = [a[0] for a in accounts]
+    cash, market_value, unrealized, equity = value_accounts(
+        user_ids,
+        [a[1] for a in accounts],
+        [p[0] for p in positions],
+        to_units([p[2] for p in positions], QTY_SCALE),
+        avg_units,
+        price_units
+    )
+
+    def dollars(cents):
+        return Decimal(int(cents)).scaleb(-CASH_SCALE)
+
+    rows = [{
+        'user_id': user_id,
+        'as_of': as_of,
+        'cash': dollars(cash[i]),
+        'market_value': dollars(market_value[i]),
+        'unrealized_pnl': dollars(unrealized[i]),
+        'equity': dollars(equity[i]),
+    } for i, user_id in enumerate(user_ids)]
+
+    # Re-running for the same day replaces that day's snapshot
+    db.query(DailyValuation).filter(DailyValuation.as_of == as_of).delete(synchronize_session=False)
+    db.execute(insert(DailyValuation), rows)
+    db.commit()
+    return len(rows)
+
+if __name__ == '__main__':
+    # Intended to run from cron after the market close, e.g.
+    #   30 21 * * 1-5  cd backend && python mark_to_market.py
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from config import DATABASE_URL
+    from model import Base
+
+    as_of = datetime.strptime(sys.argv[1], '%Y-%m-%d').date() if len(sys.argv) > 1 else date.today()
+    engine = create_engine(DATABASE_URL)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    print(f"Stored {run_mark_to_market(db, as_of)} valuations for {as_of}")
@@ -0,0 +1,173 @@
+import threading
+import time
+from collections import OrderedDict
+import pandas as pd
+import yfinance as yf
+from datetime import timedelta
+from cache import TTLCache
+from resample import MinuteBarStore
+from sources import get_source
+from replay import active_replay
+
+# Daily closes only change once per session, so an hour is plenty fresh
+DAILY_CLOSE_TTL = 60 * 60
+# Latest trade prices shared by every account valuation
+QUOTE_TTL = 15
+
+# Bar series kept per symbol: interval -> (upstream period, cache TTL in seconds).
+# Together with the minute store these are the only upstream downloads;
+# every chart timeframe is served by slicing or resampling one of them.
+BAR_SERIES = {
+    '5m': ('1mo', 5 * 60),
+    '1d': ('max', 60 * 60),
+}
+
+# Minute bars are polled incrementally; the first load covers a trading week
+MINUTE_REFRESH_SECONDS = 60
+MINUTE_BACKFILL_PERIOD = '5d'
+# Stores whose last minute is older than this backfill again instead of
+# topping up from that minute
+MINUTE_BACKFILL_AGE = 5 * 24 * 60 * 60
+# Minute stores kept in memory; the least recently charted symbol is dropped first
+MAX_MINUTE_STORES = 512
+
+_daily_closes = TTLCache(ttl=DAILY_CLOSE_TTL)
+_quotes = TTLCache(ttl=QUOTE_TTL, max_entries=4096)
+_bars = TTLCache(ttl=60, max_entries=4096)
+_minute_stores = OrderedDict()
+_minute_refreshed = TTLCache(ttl=MINUTE_REFRESH_SECONDS, max_entries=4096)
+_minute_lock = threading.Lock()
+
+def _download_closes(symbols, start):
+    """Fetch daily closes for several symbols in a single upstream request"""
+    frame = yf.download(
+        list(symbols),
+        start=start.strftime('%Y-%m-%d'),
+        interval='1d',
+        progress=False,
+        group_by='column',
+        auto_adjust=False
+    )
+    if frame.empty:
+        return {symbol: pd.Series(dtype=float) for symbol in symbols}
+    closes = frame['Close']
+    if isinstance(closes, pd.Series):
+        closes = closes.to_frame(symbols[0])
+    closes.index = pd.to_datetime(closes.index).tz_localize(None).normalize()
+    return {symbol: closes[symbol].dropna() if symbol in closes else pd.Series(dtype=float) for symbol in symbols}
+
+def get_daily_closes(symbols, start):
+    """Return a date x symbol DataFrame of daily closes from `start` onwards.
+
+    Symbols already cached far enough back are served from memory; the rest
+    are fetched together in one download.
+    """
+    replay = active_replay()
+    if replay is not None:
+        return replay.daily_closes(sorted(set(symbols)), start)
+    symbols = sorted(set(symbols))
+    start = pd.Timestamp(start).tz_localize(None).normalize()
+    series = {}
+    missing = []
+    for symbol in symbols:
+        cached = _daily_closes.get(symbol)
+        if cached is not None and cached[0] <= start:
+            series[symbol] = cached[1]
+        else:
+            missing.append(symbol)
+
+    if missing:
+        # Pad the window so the first requested day can be forward-filled
+        fetch_start = start - timedelta(days=7)
+        for symbol, closes in _download_closes(missing, fetch_start).items():
+            _daily_closes.set(symbol, (fetch_start, closes))
+            series[symbol] = closes
+
+    if not series:
+        return pd.DataFrame()
+    frame = pd.DataFrame(series)
+    return frame[frame.index >= start - timedelta(days=7)]
+
+def _download_last_prices(symbols):
+    """Latest 1-minute close for several symbols in a single upstream request"""
+    frame = yf.download(list(symbols), period='1d', interval='1m', progress=False, group_by='column')
+    if frame.empty:
+        return {}
+    closes = frame['Close']
+    if isinstance(closes, pd.Series):
+        closes = closes.to_frame(symbols[0])
+    last = closes.ffill().iloc[-1]
+    return {symbol: float(last[symbol]) for symbol in last.index if pd.notna(last[symbol])}
+
+def get_quotes(symbols):
+    """Map of symbol -> latest price, refreshing only the symbols whose quote expired"""
+    replay = active_replay()
+    if replay is not None:
+        prices = {symbol: replay.last_price(symbol) for symbol in set(symbols)}
+        return {symbol: price for symbol, price in prices.items() if price is not None}
+    quotes = {}
+    missing = []
+    for symbol in sorted(set(symbols)):
+        cached = _quotes.get(symbol)
+        if cached is None:
+            missing.append(symbol)
+        else:
+            quotes[symbol] = cached
+    if missing:
+        try:
+            fetched = _download_last_prices(missing)
+        except Exception as e:
+            print(f"Error fetching quotes for {missing}: {e}")
+            fetched = {}
+        for symbol, price in fetched.items():
+            _quotes.set(symbol, price)
+        quotes.update(fetched)
+    return quotes
+
+def get_bars(symbol, interval):
+    """OHLCV bars for one of the BAR_SERIES intervals, downloaded at most once per TTL"""
+    replay = active_replay()
+    if replay is not None:
+        return replay.bars(symbol, interval)
+    period, ttl = BAR_SERIES[interval]
+    # Switching market data source must not serve the previous source's bars
+    key = (symbol, interval, get_source().name)
+    bars = _bars.get(key)
+    if bars is None:
+        if interval == '1d':
+            bars = get_source().daily_bars(symbol, period)
+        else:
+            bars = yf.Ticker(symbol).history(period=period, interval=interval)
+        _bars.set(key, bars, ttl=ttl)
+    return bars
+
+def get_minute_store(symbol):
+    """The symbol's MinuteBarStore, topped up with any newly closed minute bars.
+
+    After the initial backfill, minutes are requested from the last stored
+    minute onwards (so a gap spanning the previous session's close is filled),
+    and only bars newer than it are folded into the 5m/15m/30m/1h aggregates.
+    The still-forming minute is skipped so stored bars are final.
+    """
+    # The global lock only guards the registry; downloads run under the store's own lock
+    with _minute_lock:
+        store = _minute_stores.get(symbol)
+        if store is None:
+            store = _minute_stores[symbol] = MinuteBarStore()
+            # A store dropped earlier must backfill again, not wait for the refresh TTL
+            _minute_refreshed.invalidate(symbol)
+            while len(_minute_stores) > MAX_MINUTE_STORES:
+                _minute_stores.popitem(last=False)
+        _minute_stores.move_to_end(symbol)
+    with store.lock:
+        if _minute_refreshed.get(symbol) is None:
+            ticker = yf.Ticker(symbol)
+            if store.last_epoch is None or store.last_epoch < time.time() - MINUTE_BACKFILL_AGE:
+                bars = ticker.history(period=MINUTE_BACKFILL_PERIOD, interval='1m')
+            else:
+                bars = ticker.history(start=pd.Timestamp(store.last_epoch, unit='s', tz='UTC'), interval='1m')
+            if not bars.empty:
+                bars = bars[bars.index.asi8 // 10 ** 9 + 60 <= time.time()]
+            store.extend(bars)
+            _minute_refreshed.set(symbol, True)
+    return store
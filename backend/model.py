@@ -8,8 +8,20 @@ from ta.momentum import RSIIndicator, StochasticOscillator
 from ta.volatility import BollingerBands
 from ta.volume import VolumeWeightedAveragePrice
 import yfinance as yf
+from fast_inference import predictor, input_matrix
 from datetime import datetime, timedelta
 
+# Bump whenever features or hyperparameters change so cached predictions
+# (and their ETags) from the old model are never reused.
+MODEL_VERSION = 'xgb-200-6-0.05-f31'
+
+def model_version(data):
+    """Identifier for a model trained on `data`; training is deterministic, so
+    every worker that trains on the same bars derives the same version"""
+    if data is None or len(data) == 0:
+        return MODEL_VERSION
+    return f"{MODEL_VERSION}-{pd.Timestamp(data['Date'].iloc[-1]):%Y%m%d}"
+
 def create_features(df):
     df = df.copy()
     
@@ -67,16 +79,38 @@ def create_features(df):
     
     return df
 
-def load_and_train(symbol='NVDA'):
-    # Fetch data from yfinance instead of CSV
-    ticker = yf.Ticker(symbol)
-    data = ticker.history(period='2y', interval='1d')
-    
-    if data.empty:
-        raise ValueError(f"No data available for {symbol}")
-    
+MODEL_FEATURES = (
+    'MA5', 'MA20', 'MA50', 'EMA12', 'EMA26',
+    'MACD', 'MACD_Signal', 'MACD_Hist',
+    'RSI', 'BB_Upper', 'BB_Lower', 'BB_Middle',
+    'Stoch_K', 'Stoch_D',
+    'Volume_MA5', 'Volume_Change', 'VWAP',
+    'Price_Change', 'Price_Change_5d',
+    'Close_lag1', 'Close_lag2', 'Close_lag3', 'Close_lag4', 'Close_lag5',
+    'Return_lag1', 'Return_lag2', 'Return_lag3', 'Return_lag4', 'Return_lag5',
+    'Volatility_5d', 'Volatility_10d'
+)
+
+MODEL_PARAMS = {'n_estimators': 200, 'max_depth': 6, 'learning_rate': 0.05, 'random_state': 42}
+
+def training_matrix(data, features):
+    """Feature rows and their next-day close; the last row has no target yet"""
+    X = data[features]
+    y = data['Close'].shift(-1)
+    return X[:-1], y[:-1]
+
+def fit_model(X, y, params=None):
+    """Fit the scaler and regressor; params override MODEL_PARAMS"""
+    scaler = MinMaxScaler()
+    X_scaled = scaler.fit_transform(X)
+    model = XGBRegressor(**{**MODEL_PARAMS, **(params or {})})
+    model.fit(X_scaled, y)
+    return scaler, model
+
+def prepare_data(bars):
+    """Daily bars (Date index or column) as a sorted frame with every model feature"""
     # Reset index to get Date as a column
-    data = data.reset_index()
+    data = bars.copy() if 'Date' in bars.columns else bars.reset_index()
     data = data.rename(columns={'Date': 'Date'})
     
     # Ensure we have the required columns
@@ -98,39 +132,45 @@ def load_and_train(symbol='NVDA'):
 
     data = create_features(data)
     data = data.dropna()
-    features = [
-        'MA5', 'MA20', 'MA50', 'EMA12', 'EMA26',
-        'MACD', 'MACD_Signal', 'MACD_Hist',
-        'RSI', 'BB_Upper', 'BB_Lower', 'BB_Middle',
-        'Stoch_K', 'Stoch_D',
-        'Volume_MA5', 'Volume_Change', 'VWAP',
-        'Price_Change', 'Price_Change_5d',
-        'Close_lag1', 'Close_lag2', 'Close_lag3', 'Close_lag4', 'Close_lag5',
-        'Return_lag1', 'Return_lag2', 'Return_lag3', 'Return_lag4', 'Return_lag5',
-        'Volatility_5d', 'Volatility_10d'
-    ]
+    return data
+
+def load_training_data(symbol='NVDA'):
+    """Prepared feature data for a symbol and the model features it provides"""
+    # Imported here: the feature store itself builds on create_features
+    from feature_store import training_data
+    
+    # Two years of rows from the symbol's shared feature matrix
+    data = training_data(symbol, period='2y')
+    
+    if data.empty:
+        raise ValueError(f"No data available for {symbol}")
+    
+    features = list(MODEL_FEATURES)
     
     # Ensure all features exist
     available_features = [f for f in features if f in data.columns]
     if len(available_features) < len(features):
         print(f"Warning: Some features missing for {symbol}. Available: {available_features}")
         features = available_features
-    
-    X = data[features]
-    y = data['Close'].shift(-1)
-    X = X[:-1]
-    y = y[:-1]
+    return data, features
+
+def load_and_train(symbol='NVDA'):
+    data, features = load_training_data(symbol)
+    X, y = training_matrix(data, features)
     
     if X.empty or y.empty:
         raise ValueError(f"Insufficient data for {symbol}")
     
-    scaler = MinMaxScaler()
-    X_scaled = scaler.fit_transform(X)
-    model = XGBRegressor(n_estimators=200, max_depth=6, learning_rate=0.05, random_state=42)
-    model.fit(X_scaled, y)
+    scaler, model = fit_model(X, y)
     return data, scaler, model, features
 
 def get_prediction(data, scaler, model, features):
+    if set(features).issubset(data.columns):
+        # load_and_train's data already carries the features: no rebuild needed
+        row = scaled_feature_row(data, features, scaler)
+        if row is None:
+            return None
+        return round(float(predictor(model)(input_matrix([row]))[0]), 2)
     latest_data = create_features(data.tail(50))
     latest_data = latest_data.dropna()
     if latest_data.empty:
@@ -141,11 +181,95 @@ def get_prediction(data, scaler, model, features):
     else:
         latest_features = latest_data[features].iloc[[-1]]
     latest_features_scaled = scaler.transform(latest_features)
-    predicted_price = model.predict(latest_features_scaled)[0]
+    predicted_price = predictor(model)(latest_features_scaled)[0]
     return float(round(predicted_price, 2))
 
+def latest_feature_row(data, features):
+    """The newest complete feature row as a float64 vector.
+
+    load_and_train's data already carries every feature computed over the
+    full history, so this is a lookup rather than a create_features rebuild.
+    """
+    rows = data[features].dropna()
+    if rows.empty:
+        return None
+    return rows.iloc[-1].to_numpy(dtype=np.float64)
+
+def scaled_feature_row(data, features, scaler):
+    """latest_feature_row with the fitted MinMaxScaler already applied.
+
+    The affine transform is done once per model refresh in float64 and
+    rounded to float32, exactly what XGBoost does with scaler.transform
+    output, so predicting from it needs no further arithmetic.
+    """
+    row = latest_feature_row(data, features)
+    if row is None:
+        return None
+    return (row * scaler.scale_ + scaler.min_).astype(np.float32)
+
+def predict_latest(batch):
+    """Next-close predictions for many symbols, one predict call per model.
+
+    batch maps symbol -> (model, scaler, feature_row). Symbols sharing a
+    model are copied into one preallocated float32 matrix; MinMaxScaler's
+    transform is applied directly as X * scale_ + min_, or skipped when
+    scaler is None because the row came from scaled_feature_row.
+    """
+    groups = {}
+    for symbol, (model, scaler, row) in batch.items():
+        group = groups.setdefault((id(model), id(scaler)), (model, scaler, [], []))
+        group[2].append(symbol)
+        group[3].append(row)
+    
+    predictions = {}
+    for model, scaler, symbols, rows in groups.values():
+        if hasattr(model, 'predict_symbols'):
+            # Pooled models normalize their own inputs (see pooled_model.py)
+            values = model.predict_symbols(symbols, np.vstack(rows))
+        else:
+            if scaler is not None:
+                rows = [row * scaler.scale_ + scaler.min_ for row in rows]
+            values = predictor(model)(input_matrix(rows))
+        for symbol, value in zip(symbols, values):
+            predictions[symbol] = round(float(value), 2)
+    return predictions
+
+SIGNAL_LABELS = {1: 'buy', 0: 'hold', -1: 'sell'}
+SIGNAL_COLUMNS = ('RSI', 'MACD', 'MACD_Signal', 'Stoch_K', 'Stoch_D')
+CONFIDENCE_LABELS = {2: 'high', 1: 'medium'}
+
+def recommendation_signals(rsi, macd, macd_signal, stoch_k, stoch_d):
+    """The RSI/MACD/Stochastic rules behind get_recommendation, vectorized.
+
+    Works on scalars or aligned arrays and returns (signal, confidence)
+    codes: signal is 1 buy / 0 hold / -1 sell, confidence 2 high / 1 medium
+    (see SIGNAL_LABELS and CONFIDENCE_LABELS). Later rules override earlier
+    ones, exactly as in the original if/elif chain.
+    """
+    rsi, macd, macd_signal, stoch_k, stoch_d = np.broadcast_arrays(
+        *(np.asarray(v, dtype=np.float64) for v in (rsi, macd, macd_signal, stoch_k, stoch_d))
+    )
+    signal = np.zeros(rsi.shape, dtype=np.int8)
+    confidence = np.ones(rsi.shape, dtype=np.int8)
+    
+    rules = (
+        (rsi > 70, -1, 2),
+        (rsi < 30, 1, 2),
+        (macd > macd_signal, 1, 2),
+        (macd < macd_signal, -1, 2),
+        ((stoch_k > 80) & (stoch_d > 80), -1, 1),
+        ((stoch_k < 20) & (stoch_d < 20), 1, 1),
+    )
+    for mask, value, strength in rules:
+        signal[mask] = value
+        confidence[mask] = strength
+    return signal, confidence
+
 def get_recommendation(data, features):
-    fallback_data = create_features(data).dropna()
+    # Prepared data (e.g. from the feature store) already has the indicators
+    if not set(SIGNAL_COLUMNS).issubset(data.columns):
+        data = create_features(data)
+    fallback_data = data.dropna()
     if fallback_data.empty:
         return None, None, {}
     
@@ -156,27 +280,9 @@ def get_recommendation(data, features):
     stoch_k = latest_row['Stoch_K'].iloc[-1]
     stoch_d = latest_row['Stoch_D'].iloc[-1]
     
-    recommendation = 'hold'
-    confidence = 'medium'
-    
-    if rsi > 70:
-        recommendation = 'sell'
-        confidence = 'high'
-    elif rsi < 30:
-        recommendation = 'buy'
-        confidence = 'high'
-    if macd > macd_signal:
-        recommendation = 'buy'
-        confidence = 'high'
-    elif macd < macd_signal:
-        recommendation = 'sell'
-        confidence = 'high'
-    if stoch_k > 80 and stoch_d > 80:
-        recommendation = 'sell'
-        confidence = 'medium'
-    elif stoch_k < 20 and stoch_d < 20:
-        recommendation = 'buy'
-        confidence = 'medium'
+    signal, strength = recommendation_signals(rsi, macd, macd_signal, stoch_k, stoch_d)
+    recommendation = SIGNAL_LABELS[int(signal)]
+    confidence = CONFIDENCE_LABELS[int(strength)]
     
     indicators = {
         'rsi': float(round(rsi, 2)),
@@ -187,9 +293,10 @@ def get_recommendation(data, features):
     
     return recommendation, confidence, indicators 
 
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Date, Text, Index, UniqueConstraint
 from sqlalchemy.orm import relationship, declarative_base
 from sqlalchemy.sql import func
+from money import Money, Price, Quantity, to_float
 
 Base = declarative_base()
 
@@ -199,7 +306,7 @@ class User(Base):
     username = Column(String(50), unique=True, nullable=False)
     email = Column(String(120), unique=True, nullable=False)
     password_hash = Column(String(512), nullable=False)
-    balance = Column(Float, default=100000.0)  # Starting balance for paper trading
+    balance = Column(Money(), default=100000)  # Starting balance for paper trading
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     profile = relationship("Profile", uselist=False, back_populates="user")
@@ -212,8 +319,8 @@ class Order(Base):
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
     symbol = Column(String(10), nullable=False)
     side = Column(String(4), nullable=False)  # 'buy' or 'sell'
-    qty = Column(Float, nullable=False)
-    price = Column(Float, nullable=False)
+    qty = Column(Quantity(), nullable=False)
+    price = Column(Price(), nullable=False)
     status = Column(String(20), nullable=False)
     alpaca_order_id = Column(String(50), nullable=True)  # Store Alpaca order ID
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
@@ -225,22 +332,26 @@ class Portfolio(Base):
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
     symbol = Column(String(10), nullable=False)
-    quantity = Column(Float, nullable=False)
-    avg_price = Column(Float, nullable=False)
+    quantity = Column(Quantity(), nullable=False)
+    avg_price = Column(Price(), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     user = relationship("User", back_populates="portfolio")
+
+    __table_args__ = (
+        Index('idx_portfolio_user_symbol', 'user_id', 'symbol'),
+    )
     
     def to_dict(self):
         return {
             'id': self.id,
             'user_id': self.user_id,
             'symbol': self.symbol,
-            'quantity': self.quantity,
-            'avg_price': self.avg_price,
+            'quantity': to_float(self.quantity),
+            'avg_price': to_float(self.avg_price),
             'current_price': self.get_current_price(),
-            'total_value': self.quantity * self.get_current_price(),
+            'total_value': to_float(self.quantity) * self.get_current_price(),
             'unrealized_pnl': self.get_unrealized_pnl(),
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat()
@@ -249,17 +360,63 @@ class Portfolio(Base):
     def get_current_price(self):
         try:
             stock = yf.Ticker(self.symbol)
-            return stock.info.get('regularMarketPrice', self.avg_price)
+            return stock.info.get('regularMarketPrice', to_float(self.avg_price))
         except:
-            return self.avg_price
+            return to_float(self.avg_price)
     
     def get_unrealized_pnl(self):
         current_price = self.get_current_price()
-        return (current_price - self.avg_price) * self.quantity
+        return (current_price - to_float(self.avg_price)) * to_float(self.quantity)
 
 class Profile(Base):
     __tablename__ = 'profiles'
     user_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
     preferences = Column(Text)
 
-    user = relationship("User", back_populates="profile")
\ No newline at end of file
+    user = relationship("User", back_populates="profile")
+
+class Fill(Base):
+    """Append-only record of every executed trade; never updated in place"""
+    __tablename__ = 'fills'
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    order_id = Column(Integer, ForeignKey('orders.id'), nullable=True)
+    symbol = Column(String(10), nullable=False)
+    side = Column(String(4), nullable=False)  # 'buy' or 'sell'
+    qty = Column(Quantity(), nullable=False)
+    price = Column(Price(), nullable=False)
+    filled_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index('idx_fills_user_time', 'user_id', 'filled_at'),
+    )
+
+class PositionSnapshot(Base):
+    """Materialized holdings for a user after replaying fills up to last_fill_id"""
+    __tablename__ = 'position_snapshots'
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    last_fill_id = Column(Integer, nullable=False)
+    as_of = Column(DateTime(timezone=True), nullable=False)
+    state = Column(Text, nullable=False)  # JSON: cash flow and per-symbol qty/cost
+
+    __table_args__ = (
+        Index('idx_snapshots_user_time', 'user_id', 'as_of'),
+    )
+
+class DailyValuation(Base):
+    """End-of-day mark-to-market of a user's account, written by the nightly batch job"""
+    __tablename__ = 'daily_valuations'
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    as_of = Column(Date, nullable=False)
+    cash = Column(Money(), nullable=False)
+    market_value = Column(Money(), nullable=False)
+    unrealized_pnl = Column(Money(), nullable=False)
+    equity = Column(Money(), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint('user_id', 'as_of', name='uq_valuation_user_day'),
+        Index('idx_valuations_day', 'as_of'),
+    )
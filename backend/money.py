@@ -0,0 +1,98 @@
+from decimal import Decimal, ROUND_HALF_UP
+import numpy as np
+from sqlalchemy import Numeric
+from sqlalchemy.types import TypeDecorator
+
+# Number of decimal places kept for each kind of amount
+CASH_SCALE = 2      # balances and order values, in cents
+PRICE_SCALE = 4     # fill prices and average entry prices
+QTY_SCALE = 4       # share quantities (allows fractional shares)
+
+def to_decimal(value, scale):
+    """Convert a float/int/str/Decimal to a Decimal rounded to `scale` places"""
+    if value is None:
+        return None
+    if not isinstance(value, Decimal):
+        # Go through str() so floats like 0.1 don't drag in binary noise
+        value = Decimal(str(value))
+    return value.quantize(Decimal(1).scaleb(-scale), rounding=ROUND_HALF_UP)
+
+def cash(value):
+    return to_decimal(value, CASH_SCALE)
+
+def price(value):
+    return to_decimal(value, PRICE_SCALE)
+
+def quantity(value):
+    return to_decimal(value, QTY_SCALE)
+
+def to_float(value):
+    """Convert a Decimal back to float at the JSON boundary"""
+    return float(value) if value is not None else None
+
+class FixedPoint(TypeDecorator):
+    """Exact decimal column that always rounds to a fixed number of places.
+
+    Values are stored as DECIMAL(precision, scale) and come back as
+    `Decimal`, so arithmetic done on model attributes never goes through
+    binary floating point.
+    """
+    impl = Numeric
+    cache_ok = True
+
+    def __init__(self, scale, precision=18):
+        super().__init__(precision=precision, scale=scale, asdecimal=True)
+        self.scale = scale
+        self.precision = precision
+
+    def process_bind_param(self, value, dialect):
+        return to_decimal(value, self.scale)
+
+    def process_result_value(self, value, dialect):
+        return to_decimal(value, self.scale)
+
+def Money():
+    return FixedPoint(CASH_SCALE)
+
+def Price():
+    return FixedPoint(PRICE_SCALE)
+
+def Quantity():
+    return FixedPoint(QTY_SCALE)
+
+def to_units(values, scale):
+    """Convert an iterable of amounts to an int64 array of 10**-scale units"""
+    return np.array(
+        [int(to_decimal(v, scale).scaleb(scale)) for v in values],
+        dtype=np.int64
+    )
+
+def float_to_units(values, scale):
+    """Vectorized conversion of a float array (e.g. market closes) to int64 units"""
+    return np.rint(np.asarray(values, dtype=np.float64) * 10 ** scale).astype(np.int64)
+
+def from_units(units, scale):
+    """Convert an int64 array of 10**-scale units back to floats"""
+    return np.asarray(units, dtype=np.int64) / float(10 ** scale)
+
+def _rescale(units, shift):
+    """Divide int64 units by 10**shift, rounding half away from zero"""
+    divisor = np.int64(10 ** shift)
+    half = divisor // 2
+    units = np.asarray(units, dtype=np.int64)
+    return np.where(units >= 0, (units + half) // divisor, -((-units + half) // divisor))
+
+def position_value_cents(qty_units, price_units):
+    """Market value in cents for int64 quantity and price arrays.
+
+    Quantities and prices are both 4-decimal units, so the raw product is in
+    10**-8 dollars. int64 holds that exactly up to roughly 9e10 dollars per
+    position, far above anything a paper account can reach.
+    """
+    product = np.asarray(qty_units, dtype=np.int64) * np.asarray(price_units, dtype=np.int64)
+    return _rescale(product, QTY_SCALE + PRICE_SCALE - CASH_SCALE)
+
+def unrealized_pnl_cents(qty_units, avg_price_units, price_units):
+    """Exact unrealized P&L in cents for whole arrays of positions"""
+    spread = np.asarray(price_units, dtype=np.int64) - np.asarray(avg_price_units, dtype=np.int64)
+    return position_value_cents(qty_units, spread)
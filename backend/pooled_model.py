@@ -0,0 +1,86 @@
+import numpy as np
+from xgboost import XGBRegressor
+from model import MODEL_FEATURES, MODEL_PARAMS
+from fast_inference import predictor
+from feature_store import training_data
+
+# Features quoted in price units; the pooled model sees them relative to the
+# current close so $20 and $900 stocks share one scale. Volume_MA5 is a raw
+# share count and is divided by the symbol's mean volume instead. Oscillators,
+# returns, Volume_Change and volatility are already scale-free.
+PRICE_FEATURES = (
+    'MA5', 'MA20', 'MA50', 'EMA12', 'EMA26',
+    'MACD', 'MACD_Signal', 'MACD_Hist',
+    'BB_Upper', 'BB_Lower', 'BB_Middle', 'VWAP',
+    'Close_lag1', 'Close_lag2', 'Close_lag3', 'Close_lag4', 'Close_lag5',
+)
+
+class PooledModel:
+    """One regressor trained on the stacked feature rows of every symbol.
+
+    Inputs are the per-symbol MODEL_FEATURES plus the current close; price
+    features are divided by the close, Volume_MA5 by the symbol's mean
+    training volume, a one-hot symbol block is appended and the target is the next-day return rather than a price, so rows
+    from differently priced symbols are comparable.
+    """
+
+    def __init__(self, symbols, params=None):
+        self.symbols = sorted(symbols)
+        self.column_of = {symbol: i for i, symbol in enumerate(self.symbols)}
+        # The current close is appended last and only used for normalizing
+        self.input_features = list(MODEL_FEATURES) + ['Close']
+        self._price = [self.input_features.index(f) for f in PRICE_FEATURES]
+        self._volume = self.input_features.index('Volume_MA5')
+        # Mean Volume_MA5 per symbol, set by fit
+        self.volume_scale = {}
+        # Returns centre on zero, not on XGBoost's default base_score of 0.5
+        self.model = XGBRegressor(**{**MODEL_PARAMS, 'base_score': 0.0, **(params or {})})
+
+    def design_matrix(self, symbols, rows):
+        """Normalized features plus symbol one-hot for raw input_features rows"""
+        rows = np.asarray(rows, dtype=np.float64)
+        X = rows[:, :-1].copy()
+        X[:, self._price] = X[:, self._price] / rows[:, -1:] - 1.0
+        X[:, self._volume] /= [self.volume_scale[s] for s in symbols]
+        onehot = np.zeros((len(rows), len(self.symbols)))
+        onehot[np.arange(len(rows)), [self.column_of[s] for s in symbols]] = 1.0
+        return np.hstack([X, onehot])
+
+    def training_rows(self, data_by_symbol):
+        """Stacked (symbols, input rows, next-day returns) over every symbol"""
+        symbols, rows, targets = [], [], []
+        for symbol in self.symbols:
+            data = data_by_symbol[symbol]
+            close = data['Close'].to_numpy(dtype=np.float64)
+            rows.append(data[self.input_features].to_numpy(dtype=np.float64)[:-1])
+            targets.append(close[1:] / close[:-1] - 1.0)
+            symbols.extend([symbol] * (len(close) - 1))
+        return symbols, np.vstack(rows), np.concatenate(targets)
+
+    def fit(self, data_by_symbol):
+        self.volume_scale = {
+            symbol: float(data_by_symbol[symbol]['Volume_MA5'].mean()) for symbol in self.symbols
+        }
+        symbols, rows, targets = self.training_rows(data_by_symbol)
+        self.model.fit(self.design_matrix(symbols, rows), targets)
+        return self
+
+    def predict_symbols(self, symbols, rows):
+        """Next-day closes for raw input_features rows (one per symbol)"""
+        rows = np.asarray(rows, dtype=np.float64)
+        returns = predictor(self.model)(self.design_matrix(symbols, rows))
+        return rows[:, -1] * (1.0 + returns)
+
+def load_and_train_pooled(symbols, period='2y', params=None):
+    """Prepared data per symbol and one PooledModel fitted across all of them"""
+    data_by_symbol = {}
+    for symbol in symbols:
+        data = training_data(symbol, period)
+        if data.empty:
+            print(f"Warning: no data for {symbol}, leaving it out of the pooled model")
+            continue
+        data_by_symbol[symbol] = data
+    if not data_by_symbol:
+        raise ValueError("No data available for any symbol")
+    model = PooledModel(list(data_by_symbol), params).fit(data_by_symbol)
+    return data_by_symbol, model
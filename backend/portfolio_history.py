@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+from datetime import timedelta
+from cache import TTLCache
+from ledger import holdings_at, fills_between, latest_fill_id
+from market_data import get_daily_closes
+from replay import market_now, replay_id
+from model import User, Fill
+from money import (
+    CASH_SCALE, PRICE_SCALE, QTY_SCALE,
+    float_to_units, to_units, position_value_cents
+)
+
+# Look-back window in days for each timeframe the portfolio chart offers
+HISTORY_WINDOWS = {
+    '1D': 1,
+    '1W': 7,
+    '1M': 30,
+    '3M': 90,
+    '1Y': 365,
+    'ALL': None,
+}
+
+# Curves only move when a fill lands or when a new daily close is published.
+# Entries are keyed on the user's latest fill id, so every worker sees a new
+# fill at once, and the TTL picks up new closes. Replays have their own
+# accounts database, so the replay is part of the key too.
+HISTORY_TTL = 15 * 60
+
+_history_cache = TTLCache(ttl=HISTORY_TTL)
+
+def equity_curve_cents(closes_units, initial_qty_units, initial_cash_cents,
+                       fill_days, fill_cols, fill_qty_units, fill_cash_cents):
+    """Equity in cents for every day of a date x symbol close matrix.
+
+    Fills are scattered into a per-day delta matrix and cumulatively summed,
+    so the whole curve costs a handful of array passes regardless of how
+    many fills or days there are.
+    """
+    n_days, n_symbols = closes_units.shape
+    qty_delta = np.zeros((n_days, n_symbols), dtype=np.int64)
+    np.add.at(qty_delta, (fill_days, fill_cols), fill_qty_units)
+    positions = initial_qty_units + np.cumsum(qty_delta, axis=0)
+
+    cash_delta = np.zeros(n_days, dtype=np.int64)
+    np.add.at(cash_delta, fill_days, fill_cash_cents)
+    cash = initial_cash_cents + np.cumsum(cash_delta)
+
+    return cash + position_value_cents(positions, closes_units).sum(axis=1)
+
+def compute_portfolio_history(db, user_id, timeframe, now=None):
+    now = now or market_now()
+    today = pd.Timestamp(now).normalize()
+    days = HISTORY_WINDOWS[timeframe]
+    if days is None:
+        first_fill = db.query(Fill.filled_at).filter(Fill.user_id == user_id).order_by(Fill.id).first()
+        start = pd.Timestamp(first_fill[0]).tz_localize(None).normalize() - timedelta(days=1) if first_fill else today
+    else:
+        start = today - timedelta(days=days)
+
+    user = db.query(User).filter(User.id == user_id).first()
+    current = holdings_at(db, user_id)
+    initial = holdings_at(db, user_id, at=start.to_pydatetime())
+    fills = fills_between(db, user_id, start.to_pydatetime())
+
+    # Cash the account started with, before any recorded trading
+    starting_cash = (user.balance if user else 0) - current['cash_flow']
+    initial_cash = starting_cash + initial['cash_flow']
+
+    symbols = sorted(set(initial['positions']) | {f.symbol for f in fills})
+    dates = pd.bdate_range(start, today)
+    if len(dates) == 0:
+        dates = pd.DatetimeIndex([today])
+
+    if symbols:
+        closes = get_daily_closes(symbols, start).reindex(columns=symbols)
+        closes = closes.reindex(closes.index.union(dates)).ffill().reindex(dates)
+        # Symbols with no market data yet are valued at their last known trade price
+        fallback = {s: float(p['avg_price']) for s, p in initial['positions'].items()}
+        for fill in fills:
+            fallback[fill.symbol] = float(fill.price)
+        closes = closes.fillna(pd.Series(fallback)).bfill()
+    else:
+        closes = pd.DataFrame(index=dates)
+
+    column = {symbol: i for i, symbol in enumerate(symbols)}
+    initial_qty = to_units(
+        [initial['positions'][s]['qty'] if s in initial['positions'] else 0 for s in symbols], QTY_SCALE
+    )
+    fill_dates = pd.DatetimeIndex([pd.Timestamp(f.filled_at).tz_localize(None).normalize() for f in fills])
+    fill_sign = np.array([1 if f.side == 'buy' else -1 for f in fills], dtype=np.int64)
+    fill_qty = to_units([f.qty for f in fills], QTY_SCALE)
+    fill_value = position_value_cents(fill_qty, to_units([f.price for f in fills], PRICE_SCALE))
+
+    equity = equity_curve_cents(
+        float_to_units(closes.to_numpy(dtype=np.float64), PRICE_SCALE).reshape(len(dates), len(symbols)),
+        initial_qty,
+        to_units([initial_cash], CASH_SCALE)[0],
+        np.minimum(dates.searchsorted(fill_dates), len(dates) - 1),
+        np.array([column[f.symbol] for f in fills], dtype=np.int64),
+        fill_qty * fill_sign,
+        -fill_value * fill_sign
+    )
+
+    values = equity / 10 ** CASH_SCALE
+    return {
+        'timeframe': timeframe,
+        'data': [
+            {'date': date, 'value': float(value)}
+            for date, value in zip(dates.strftime('%Y-%m-%dT%H:%M:%S'), values)
+        ]
+    }
+
+def get_portfolio_history(db, user_id, timeframe):
+    key = (replay_id(), int(user_id), timeframe, latest_fill_id(db, int(user_id)))
+    history = _history_cache.get(key)
+    if history is None:
+        history = compute_portfolio_history(db, int(user_id), timeframe)
+        _history_cache.set(key, history)
+    return history
@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+from datetime import timedelta
+from cache import TTLCache
+from market_data import get_daily_closes, DAILY_CLOSE_TTL
+from replay import market_now
+
+TRADING_DAYS = 252
+# Accepted look-back windows, in trading days
+MIN_WINDOW = 20
+MAX_WINDOW = 5 * TRADING_DAYS
+
+_risk_models = TTLCache(ttl=DAILY_CLOSE_TTL, max_entries=256)
+
+class RiskModel:
+    """Aligned daily returns of a symbol set, with its covariance precomputed.
+
+    returns is a days x symbols matrix over the last `window` trading days
+    on which every symbol has a close; benchmark_returns is the benchmark over the same
+    days (NaN where it has no close, all NaN if it could not be loaded).
+    Everything depending only on the symbol set and window is computed here
+    once, so scoring a particular set of weights is O(symbols²) plus one
+    days x symbols product for VaR.
+    """
+
+    def __init__(self, symbols, closes, benchmark_closes, window=None, errors=None):
+        self.symbols = list(symbols)
+        self.errors = dict(errors or {})
+        # Align first, then window, so a gap in one symbol does not shorten the window
+        aligned = closes[self.symbols].dropna()
+        if window is not None:
+            aligned = aligned.iloc[-(window + 1):]
+        if len(aligned) < 3:
+            raise ValueError('Not enough price history for risk metrics')
+        self.dates = aligned.index
+        self.last_closes = aligned.iloc[-1].to_numpy(dtype=np.float64)
+        prices = aligned.to_numpy(dtype=np.float64)
+        self.returns = prices[1:] / prices[:-1] - 1
+        self.covariance = np.atleast_2d(np.cov(self.returns, rowvar=False))
+
+        self.benchmark_returns = np.full(len(self.returns), np.nan)
+        if benchmark_closes is not None:
+            benchmark = benchmark_closes.reindex(aligned.index).ffill().to_numpy(dtype=np.float64)
+            self.benchmark_returns = benchmark[1:] / benchmark[:-1] - 1
+        # Beta only uses the days the benchmark traded too
+        mask = ~np.isnan(self.benchmark_returns)
+        self.benchmark_variance = None
+        self.benchmark_covariance = None
+        if mask.sum() >= 3:
+            centered = self.returns[mask] - self.returns[mask].mean(axis=0)
+            benchmark = self.benchmark_returns[mask] - self.benchmark_returns[mask].mean()
+            self.benchmark_variance = float(benchmark @ benchmark) / (mask.sum() - 1)
+            self.benchmark_covariance = centered.T @ benchmark / (mask.sum() - 1)
+
+        deviations = np.sqrt(np.diag(self.covariance))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.correlation = self.covariance / np.outer(deviations, deviations)
+        # Payload matrices depend only on the symbol set, so they are built once too
+        self.covariance_payload = _matrix_payload(self.covariance * TRADING_DAYS, 8)
+        self.correlation_payload = _matrix_payload(self.correlation, 4)
+
+def _matrix_payload(matrix, digits):
+    """Nested lists of rounded values, None where a value is not finite"""
+    rounded = np.round(matrix, digits).astype(object)
+    rounded[~np.isfinite(matrix)] = None
+    return rounded.tolist()
+
+def risk_model(symbols, window, benchmark):
+    """The cached RiskModel for (symbol set, window, benchmark) as of today's closes"""
+    symbols = sorted(set(symbols))
+    today = pd.Timestamp(market_now()).normalize()
+    key = (tuple(symbols), window, benchmark, today)
+    model = _risk_models.get(key)
+    if model is None:
+        # Calendar days spanning `window` trading days, plus holidays and gaps
+        start = today - timedelta(days=window * 7 // 5 + 30)
+        closes = get_daily_closes(symbols, start).reindex(columns=symbols)
+        # Symbols without usable history are reported instead of failing the portfolio
+        counts = closes.notna().sum()
+        errors = {symbol: 'No price history' for symbol in symbols if counts[symbol] < 3}
+        if len(errors) == len(symbols):
+            raise ValueError('No price history for any position')
+        try:
+            benchmark_closes = get_daily_closes([benchmark], start).get(benchmark)
+        except Exception as e:
+            print(f"Benchmark {benchmark} closes not loaded: {e}")
+            benchmark_closes = None
+        held = [symbol for symbol in symbols if symbol not in errors]
+        model = RiskModel(held, closes, benchmark_closes, window, errors)
+        _risk_models.set(key, model)
+    return model
+
+def _round(value, digits=6):
+    return None if value is None or not np.isfinite(value) else round(float(value), digits)
+
+def portfolio_risk(quantities, window=TRADING_DAYS, benchmark='SPY', confidence=0.95):
+    """Volatility, beta, historical VaR and covariance for positions {symbol: qty}.
+
+    Positions are weighted by market value at the latest aligned close;
+    symbols without price history are left out and listed under 'errors'.
+    Volatilities are annualized; VaR is the one-day loss not exceeded with
+    `confidence`, from the portfolio's own return history over the window.
+    """
+    model = risk_model(quantities, window, benchmark)
+    qty = np.array([float(quantities[symbol]) for symbol in model.symbols])
+    values = qty * model.last_closes
+    total = values.sum()
+    if total <= 0:
+        raise ValueError('Portfolio has no market value')
+    weights = values / total
+
+    daily_volatility = float(np.sqrt(max(weights @ model.covariance @ weights, 0.0)))
+    beta = None
+    if model.benchmark_variance:
+        beta = float(weights @ model.benchmark_covariance) / model.benchmark_variance
+    portfolio_returns = model.returns @ weights
+    var_pct = max(-float(np.quantile(portfolio_returns, 1 - confidence)), 0.0)
+
+    return {
+        'as_of': model.dates[-1].strftime('%Y-%m-%d'),
+        'window': window,
+        'observations': len(model.returns),
+        'benchmark': benchmark,
+        'symbols': model.symbols,
+        'weights': np.round(weights, 6).tolist(),
+        'market_value': round(float(total), 2),
+        'volatility': _round(daily_volatility * np.sqrt(TRADING_DAYS)),
+        'daily_volatility': _round(daily_volatility),
+        'beta': _round(beta),
+        'var': {
+            'confidence': confidence,
+            'horizon_days': 1,
+            'pct': _round(var_pct),
+            'amount': round(var_pct * float(total), 2),
+        },
+        'covariance': model.covariance_payload,
+        'correlation': model.correlation_payload,
+        'errors': model.errors,
+    }
@@ -0,0 +1,376 @@
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import config
+from resample import INTERVAL_SECONDS, resample_frame
+from sources import OHLCV_COLUMNS, MarketDataSource, normalize_bars, apply_period, get_source, set_source
+
+DAY = INTERVAL_SECONDS['1d']
+# Replays step through daily bars, or through minute bars on top of a daily history
+REPLAY_INTERVALS = ('1d', '1m')
+
+class ReplayClock:
+    """Simulated market time running `speed` times faster than the wall clock.
+
+    The clock is anchored to epoch seconds rather than a monotonic counter,
+    so worker processes that share its state() agree on the simulated time.
+    speed=0 freezes the clock so it only moves through advance(), which makes
+    load tests and benchmarks fully deterministic.
+    """
+
+    def __init__(self, start, speed=1.0, wall=None):
+        self._lock = threading.Lock()
+        self._origin = pd.Timestamp(start)
+        self._wall = time.time() if wall is None else float(wall)
+        self.speed = float(speed)
+
+    @classmethod
+    def from_state(cls, state):
+        return cls(state['origin'], state['speed'], state['wall'])
+
+    def state(self):
+        """JSON-serializable anchor from which from_state rebuilds this clock"""
+        with self._lock:
+            return {'origin': self._origin.isoformat(), 'wall': self._wall, 'speed': self.speed}
+
+    def now(self):
+        with self._lock:
+            elapsed = (time.time() - self._wall) * self.speed
+            return self._origin + pd.Timedelta(seconds=elapsed)
+
+    def _rebase(self):
+        self._origin = self._origin + pd.Timedelta(seconds=(time.time() - self._wall) * self.speed)
+        self._wall = time.time()
+
+    def advance(self, seconds):
+        with self._lock:
+            self._rebase()
+            self._origin += pd.Timedelta(seconds=seconds)
+
+    def set_speed(self, speed):
+        with self._lock:
+            self._rebase()
+            self.speed = float(speed)
+
+def sessions_from_minutes(minutes, tz):
+    """Daily bars aggregated from minute bars, indexed in the daily series' timezone"""
+    daily = resample_frame(minutes, '1d')
+    index = daily.index
+    if tz is None:
+        index = index.tz_localize(None)
+    else:
+        index = index.tz_convert(tz)
+    return daily.set_axis(index.rename('Date'))
+
+class MarketReplay(MarketDataSource):
+    """Stored bars revealed bar by bar as a ReplayClock moves forward.
+
+    A bar becomes visible once it has closed (its timestamp plus one
+    interval), so quotes, charts, indicators, model training and order fills
+    all see the same simulated market. With minute bars the replay ticks
+    every simulated minute: intraday charts and quotes read the minutes, and
+    the daily series ends with the session so far, built from them. While a
+    replay is running it is also the active MarketDataSource.
+    """
+
+    name = 'replay'
+
+    def __init__(self, bars_by_symbol, clock, minutes_by_symbol=None, replay_id=None):
+        self.id = replay_id or uuid.uuid4().hex
+        self.clock = clock
+        self._daily = {symbol.upper(): normalize_bars(bars) for symbol, bars in bars_by_symbol.items()}
+        self._minutes = {
+            symbol.upper(): normalize_bars(bars) for symbol, bars in (minutes_by_symbol or {}).items() if len(bars)
+        }
+        self.interval = '1m' if self._minutes else '1d'
+        self.seconds = INTERVAL_SECONDS[self.interval]
+        # Sessions covered by minute bars are rebuilt from them as they are revealed
+        self._sessions_seen = {}
+        for symbol, minutes in self._minutes.items():
+            daily = self._daily.get(symbol)
+            if daily is not None:
+                first = sessions_from_minutes(minutes.iloc[:1], daily.index.tz).index[0]
+                self._daily[symbol] = daily[daily.index < first]
+            days = minutes.index.normalize()
+            self._sessions_seen[symbol] = np.cumsum(np.r_[True, days[1:] != days[:-1]])
+        # Epoch (ns) at which each bar has closed and may be shown
+        self._closes_at = {}
+        for interval, frames in (('1d', self._daily), ('1m', self._minutes)):
+            for symbol, bars in frames.items():
+                self._closes_at[symbol, interval] = bars.index.asi8 + INTERVAL_SECONDS[interval] * 10 ** 9
+
+    @property
+    def symbols(self):
+        return sorted(set(self._daily) | set(self._minutes))
+
+    def now(self):
+        return self.clock.now()
+
+    def _count(self, symbol, interval):
+        closes_at = self._closes_at.get((symbol, interval))
+        if closes_at is None:
+            return 0
+        return int(np.searchsorted(closes_at, self.now().value, side='right'))
+
+    def cursor(self, symbol, interval=None):
+        """Number of bars of `symbol` visible at the current simulated time.
+
+        Counts the replay's own bars (minutes for a minute replay), or daily
+        bars including the session in progress with interval='1d'.
+        """
+        symbol = symbol.upper()
+        if symbol in self._minutes and interval != '1d':
+            return self._count(symbol, '1m')
+        count = self._count(symbol, '1d')
+        if symbol in self._minutes:
+            minutes = self._count(symbol, '1m')
+            count += int(self._sessions_seen[symbol][minutes - 1]) if minutes else 0
+        return count
+
+    def bars(self, symbol, interval=None):
+        """Visible bars, aggregated when a coarser interval than the stored one is requested.
+
+        Intraday intervals read the minute bars when the replay has them and
+        fall back to the daily bars otherwise.
+        """
+        symbol = symbol.upper()
+        seconds = INTERVAL_SECONDS.get(interval, self.seconds if interval is None else DAY)
+        if symbol in self._minutes and seconds < DAY:
+            visible = self._minutes[symbol].iloc[:self._count(symbol, '1m')]
+            return resample_frame(visible, interval) if seconds > 60 else visible
+        parts = []
+        daily = self._daily.get(symbol)
+        if daily is not None:
+            parts.append(daily.iloc[:self._count(symbol, '1d')])
+        if symbol in self._minutes:
+            minutes = self._minutes[symbol].iloc[:self._count(symbol, '1m')]
+            if len(minutes):
+                parts.append(sessions_from_minutes(minutes, daily.index.tz if daily is not None else minutes.index.tz))
+        if not parts:
+            return pd.DataFrame(columns=OHLCV_COLUMNS)
+        return parts[0] if len(parts) == 1 else pd.concat(parts)
+
+    def daily_bars(self, symbol, period='max'):
+        return apply_period(self.bars(symbol, '1d'), period).copy()
+
+    def daily_closes(self, symbols, start):
+        """Date x symbol closes like market_data.get_daily_closes, from visible bars"""
+        series = {}
+        for symbol in symbols:
+            closes = self.bars(symbol, '1d')['Close']
+            index = closes.index.tz_localize(None) if closes.index.tz is not None else closes.index
+            series[symbol] = closes.set_axis(index.normalize())
+        frame = pd.DataFrame(series)
+        return frame[frame.index >= pd.Timestamp(start).normalize() - pd.Timedelta(days=7)]
+
+    def last_price(self, symbol):
+        bars = self.bars(symbol)
+        if bars.empty:
+            return None
+        return float(bars['Close'].iat[-1])
+
+    def quote(self, symbol):
+        """The /live_data payload for the current simulated session"""
+        symbol = symbol.upper()
+        interval = '1m' if symbol in self._minutes else '1d'
+        cursor = self._count(symbol, interval)
+        if cursor == 0:
+            return None
+        # Only the current session plus one prior bar matter
+        per_session = max(1, DAY // INTERVAL_SECONDS[interval])
+        frames = self._minutes if interval == '1m' else self._daily
+        recent = frames[symbol].iloc[max(0, cursor - per_session - 1):cursor]
+        sessions = recent.index.normalize()
+        today = recent[sessions == sessions[-1]]
+        earlier = recent[sessions != sessions[-1]]
+        if earlier.empty and interval == '1m' and self._count(symbol, '1d'):
+            # The first replayed session follows on from the daily history
+            earlier = self._daily[symbol].iloc[:self._count(symbol, '1d')]
+
+        price = float(today['Close'].iat[-1])
+        prev_close = float(earlier['Close'].iat[-1]) if len(earlier) else None
+        price_change = price - prev_close if prev_close is not None else None
+        return {
+            'price': price,
+            'price_change': price_change,
+            'price_change_pct': price_change / prev_close * 100 if prev_close else None,
+            'volume': int(today['Volume'].sum()),
+            'dayHigh': float(today['High'].max()),
+            'dayLow': round(float(today['Low'].min()), 2),
+            'open': round(float(today['Open'].iat[0]), 2),
+            'simulated_time': self.now().isoformat()
+        }
+
+_replay = None
+_previous_source = None
+# Signature of the published state this process last applied
+_synced = None
+_replay_lock = threading.RLock()
+
+STATE_FILE = 'CURRENT'
+
+def _state_path():
+    return os.path.join(config.REPLAY_DIR, STATE_FILE)
+
+def _signature(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+def _write_state(replay):
+    """Atomically point every worker at `replay` and its current clock"""
+    path = _state_path()
+    tmp_path = f"{path}.tmp-{uuid.uuid4().hex}"
+    with open(tmp_path, 'w') as f:
+        json.dump({'id': replay.id, 'clock': replay.clock.state()}, f)
+    os.replace(tmp_path, path)
+    return _signature(path)
+
+def _publish(replay, bars_by_symbol, minutes_by_symbol):
+    """Write the replay's bars under REPLAY_DIR/<id>/ and make it the current replay"""
+    directory = os.path.join(config.REPLAY_DIR, replay.id)
+    os.makedirs(directory)
+    for interval, frames in (('1d', bars_by_symbol), ('1m', minutes_by_symbol or {})):
+        for symbol, bars in frames.items():
+            bars.to_pickle(os.path.join(directory, f"{symbol.upper()}-{interval}.pkl"))
+    signature = _write_state(replay)
+    for entry in os.scandir(config.REPLAY_DIR):
+        if entry.is_dir() and entry.name != replay.id:
+            shutil.rmtree(entry.path, ignore_errors=True)
+    return signature
+
+def _load_published(state):
+    directory = os.path.join(config.REPLAY_DIR, state['id'])
+    frames = {'1d': {}, '1m': {}}
+    for name in os.listdir(directory):
+        symbol, interval = name[:-len('.pkl')].rsplit('-', 1)
+        frames[interval][symbol] = pd.read_pickle(os.path.join(directory, name))
+    return MarketReplay(frames['1d'], ReplayClock.from_state(state['clock']), frames['1m'], replay_id=state['id'])
+
+def _start_local(replay):
+    global _replay, _previous_source
+    if _replay is None:
+        _previous_source = get_source()
+    _replay = replay
+    set_source(replay)
+
+def _stop_local():
+    global _replay, _previous_source
+    if _replay is not None:
+        set_source(_previous_source)
+    _replay = None
+    _previous_source = None
+
+def _sync():
+    """Follow the replay another worker process started, adjusted or stopped"""
+    global _synced
+    if not config.REPLAY_DIR or _signature(_state_path()) == _synced:
+        return
+    with _replay_lock:
+        signature = _signature(_state_path())
+        if signature == _synced:
+            return
+        try:
+            state = None
+            if signature is not None:
+                with open(_state_path()) as f:
+                    state = json.load(f)
+            if state is None:
+                _stop_local()
+            elif _replay is not None and _replay.id == state['id']:
+                _replay.clock = ReplayClock.from_state(state['clock'])
+            else:
+                _start_local(_load_published(state))
+        except (OSError, ValueError, KeyError) as e:
+            # Replaced or pruned under us; the next call reads the newer state
+            print(f"Replay state not loaded: {e}")
+            return
+        _synced = signature
+
+def active_replay():
+    """The running MarketReplay, or None when serving live data"""
+    _sync()
+    return _replay
+
+def replay_id():
+    """Id of the running replay, or None for the live market"""
+    replay = active_replay()
+    return replay.id if replay is not None else None
+
+def load_replay_bars(symbols, source=None):
+    """Daily bars for `symbols` from a market data source (the configured one by default)"""
+    source = source or get_source()
+    bars = {}
+    for symbol in symbols:
+        try:
+            bars[symbol.upper()] = source.daily_bars(symbol)
+        except Exception as e:
+            print(f"Skipping {symbol} in replay: {e}")
+    return bars
+
+def load_replay_minutes(symbols, source=None):
+    """Minute bars for `symbols`, for the symbols the source has them for"""
+    source = source or get_source()
+    minutes = {}
+    for symbol in symbols:
+        try:
+            bars = source.minute_bars(symbol)
+        except Exception as e:
+            print(f"No minute bars for {symbol} in replay: {e}")
+            continue
+        if bars is not None and len(bars):
+            minutes[symbol.upper()] = bars
+    return minutes
+
+def start_replay(bars_by_symbol, start, speed=1.0, minutes_by_symbol=None):
+    """Begin replaying `bars_by_symbol` (and optional minute bars) from simulated time `start`"""
+    global _synced
+    with _replay_lock:
+        replay = MarketReplay(bars_by_symbol, ReplayClock(start, speed), minutes_by_symbol)
+        if config.REPLAY_DIR:
+            os.makedirs(config.REPLAY_DIR, exist_ok=True)
+            _synced = _publish(replay, bars_by_symbol, minutes_by_symbol)
+        _start_local(replay)
+        return replay
+
+def adjust_replay(speed=None, advance=None):
+    """Change the running replay's speed and/or jump it forward, in every worker"""
+    global _synced
+    replay = active_replay()
+    if replay is None:
+        return None
+    with _replay_lock:
+        if speed is not None:
+            replay.clock.set_speed(speed)
+        if advance:
+            replay.clock.advance(float(advance))
+        if config.REPLAY_DIR:
+            _synced = _write_state(replay)
+    return replay
+
+def stop_replay():
+    global _synced
+    with _replay_lock:
+        if config.REPLAY_DIR:
+            try:
+                os.remove(_state_path())
+            except FileNotFoundError:
+                pass
+            _synced = None
+        _stop_local()
+
+def market_now():
+    """Current market time: simulated during a replay, otherwise UTC wall time"""
+    replay = active_replay()
+    if replay is None:
+        return datetime.utcnow()
+    now = replay.now()
+    return (now.tz_convert('UTC').tz_localize(None) if now.tz is not None else now).to_pydatetime()
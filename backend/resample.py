@@ -0,0 +1,182 @@
+import threading
+import numpy as np
+import pandas as pd
+
+INTERVAL_SECONDS = {
+    '1m': 60,
+    '5m': 5 * 60,
+    '15m': 15 * 60,
+    '30m': 30 * 60,
+    '1h': 60 * 60,
+    '1d': 24 * 60 * 60,
+}
+
+# US sessions open at :30, so hourly bars are anchored there like yfinance's
+INTERVAL_OFFSETS = {
+    '1h': 30 * 60,
+}
+
+OHLCV = ('open', 'high', 'low', 'close', 'volume')
+
+def bucket_ids(epochs, seconds, offset=0, utc_offsets=None):
+    """Bucket number of every epoch; utc_offsets shifts to exchange-local time (for daily bars)"""
+    epochs = np.asarray(epochs, dtype=np.int64)
+    if utc_offsets is not None:
+        epochs = epochs + np.asarray(utc_offsets, dtype=np.int64)
+    return (epochs - offset) // seconds
+
+def resample_ohlcv(epochs, open_, high, low, close, volume, seconds, offset=0, utc_offsets=None):
+    """Aggregate time-sorted bars into `seconds`-wide buckets.
+
+    A bucket's open is its first bar's open, high/low the max/min, close the
+    last bar's close and volume the sum; each reduction is one reduceat over
+    the bucket boundaries. Returns a dict of arrays keyed by 'epoch' and
+    OHLCV names, where 'epoch' is the bucket start.
+    """
+    epochs = np.asarray(epochs, dtype=np.int64)
+    if len(epochs) == 0:
+        empty = {name: np.array([], dtype=np.float64) for name in OHLCV}
+        empty['epoch'] = np.array([], dtype=np.int64)
+        return empty
+
+    buckets = bucket_ids(epochs, seconds, offset, utc_offsets)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(epochs)] - 1
+
+    bucket_start = buckets[starts] * seconds + offset
+    if utc_offsets is not None:
+        bucket_start = bucket_start - np.asarray(utc_offsets, dtype=np.int64)[starts]
+    return {
+        'epoch': bucket_start,
+        'open': np.asarray(open_, dtype=np.float64)[starts],
+        'high': np.maximum.reduceat(np.asarray(high, dtype=np.float64), starts),
+        'low': np.minimum.reduceat(np.asarray(low, dtype=np.float64), starts),
+        'close': np.asarray(close, dtype=np.float64)[ends],
+        'volume': np.add.reduceat(np.asarray(volume, dtype=np.float64), starts),
+    }
+
+def frame_to_arrays(frame):
+    """Epoch seconds plus OHLCV arrays from a yfinance-style DataFrame"""
+    arrays = {name: frame[name.capitalize()].to_numpy(dtype=np.float64) for name in OHLCV}
+    arrays['epoch'] = frame.index.asi8 // 10 ** 9 if len(frame) else np.array([], dtype=np.int64)
+    return arrays
+
+def arrays_to_frame(arrays, tz=None):
+    index = pd.to_datetime(arrays['epoch'], unit='s', utc=True)
+    if tz is not None:
+        index = index.tz_convert(tz)
+    return pd.DataFrame({name.capitalize(): arrays[name] for name in OHLCV}, index=index)
+
+def resample_frame(frame, interval):
+    """Resample a yfinance-style OHLCV DataFrame to one of INTERVAL_SECONDS"""
+    arrays = frame_to_arrays(frame)
+    seconds = INTERVAL_SECONDS[interval]
+    utc_offsets = None
+    if interval == '1d' and frame.index.tz is not None and len(frame):
+        # Daily buckets follow the exchange's calendar day, not UTC midnight
+        local = frame.index.tz_localize(None) - frame.index.tz_convert('UTC').tz_localize(None)
+        utc_offsets = local.asi8 // 10 ** 9
+    bars = resample_ohlcv(
+        arrays['epoch'], arrays['open'], arrays['high'], arrays['low'], arrays['close'], arrays['volume'],
+        seconds, INTERVAL_OFFSETS.get(interval, 0), utc_offsets
+    )
+    return arrays_to_frame(bars, frame.index.tz)
+
+class BarAggregator:
+    """Maintains bars of one interval from a stream of minute bars.
+
+    Completed bars are kept as arrays; the still-open bar is updated in place
+    as new minute bars arrive, so a new minute costs O(1) rather than a full
+    re-aggregation.
+    """
+
+    def __init__(self, interval):
+        self.seconds = INTERVAL_SECONDS[interval]
+        self.offset = INTERVAL_OFFSETS.get(interval, 0)
+        self.closed = {name: np.array([], dtype=np.float64) for name in OHLCV}
+        self.closed['epoch'] = np.array([], dtype=np.int64)
+        self.open_bar = None
+
+    def extend(self, epochs, open_, high, low, close, volume):
+        bars = resample_ohlcv(epochs, open_, high, low, close, volume, self.seconds, self.offset)
+        if len(bars['epoch']) == 0:
+            return
+        if self.open_bar is not None and bars['epoch'][0] == self.open_bar['epoch']:
+            # The first new bucket continues the open bar
+            bars['open'][0] = self.open_bar['open']
+            bars['high'][0] = max(bars['high'][0], self.open_bar['high'])
+            bars['low'][0] = min(bars['low'][0], self.open_bar['low'])
+            bars['volume'][0] += self.open_bar['volume']
+        elif self.open_bar is not None:
+            self._close(self.open_bar)
+        if len(bars['epoch']) > 1:
+            self._close({name: values[:-1] for name, values in bars.items()})
+        self.open_bar = {name: values[-1] for name, values in bars.items()}
+
+    def _close(self, bars):
+        for name, values in bars.items():
+            self.closed[name] = np.append(self.closed[name], values)
+
+    def trim(self, before_epoch):
+        keep = self.closed['epoch'] >= before_epoch
+        self.closed = {name: values[keep] for name, values in self.closed.items()}
+
+    def arrays(self):
+        if self.open_bar is None:
+            return dict(self.closed)
+        return {name: np.append(values, self.open_bar[name]) for name, values in self.closed.items()}
+
+class MinuteBarStore:
+    """One symbol's minute bars plus incrementally maintained higher-interval bars.
+
+    extend() and frame() are serialized on `lock`; callers that must check
+    and refresh the store atomically can hold it too (it is reentrant).
+    """
+
+    AGGREGATES = ('5m', '15m', '30m', '1h')
+
+    def __init__(self, tz=None, max_age=7 * 24 * 60 * 60):
+        self.tz = tz
+        self.max_age = max_age
+        self.minutes = BarAggregator('1m')
+        self.aggregates = {interval: BarAggregator(interval) for interval in self.AGGREGATES}
+        self.lock = threading.RLock()
+
+    @property
+    def last_epoch(self):
+        if self.minutes.open_bar is not None:
+            return int(self.minutes.open_bar['epoch'])
+        return None
+
+    def extend(self, frame):
+        """Add minute bars newer than anything already stored"""
+        if frame.empty:
+            return 0
+        with self.lock:
+            return self._extend(frame)
+
+    def _extend(self, frame):
+        if self.tz is None:
+            self.tz = frame.index.tz
+        arrays = frame_to_arrays(frame)
+        if self.last_epoch is not None:
+            newer = arrays['epoch'] > self.last_epoch
+            arrays = {name: values[newer] for name, values in arrays.items()}
+        if len(arrays['epoch']) == 0:
+            return 0
+        columns = (arrays['epoch'],) + tuple(arrays[name] for name in OHLCV)
+        self.minutes.extend(*columns)
+        for aggregator in self.aggregates.values():
+            aggregator.extend(*columns)
+
+        cutoff = int(arrays['epoch'][-1]) - self.max_age
+        self.minutes.trim(cutoff)
+        for aggregator in self.aggregates.values():
+            aggregator.trim(cutoff)
+        return len(arrays['epoch'])
+
+    def frame(self, interval='1m'):
+        aggregator = self.minutes if interval == '1m' else self.aggregates[interval]
+        with self.lock:
+            arrays = aggregator.arrays()
+        return arrays_to_frame(arrays, self.tz)
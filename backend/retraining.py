@@ -0,0 +1,97 @@
+import numpy as np
+from xgboost import XGBRegressor
+from model import MODEL_PARAMS, training_matrix, fit_model
+
+# Trees added per incremental update, fitted on the most recent rows only
+INCREMENTAL_TREES = 10
+INCREMENTAL_WINDOW = 60
+# Incremental updates allowed before a full rebuild; also caps tree growth
+# at MODEL_PARAMS' n_estimators + FULL_REBUILD_EVERY * INCREMENTAL_TREES
+FULL_REBUILD_EVERY = 20
+# Refit from scratch when out-of-sample error exceeds the naive last-close
+# error by this factor, over the last ERROR_WINDOW rows the model never fit
+# (scored once at least MIN_ERROR_ROWS have accumulated)
+ERROR_DRIFT_RATIO = 1.5
+ERROR_WINDOW = 20
+MIN_ERROR_ROWS = 5
+# ...or when this share of recent scaled feature values leaves the fitted range
+RANGE_DRIFT_SHARE = 0.05
+RANGE_TOLERANCE = 0.1
+
+def last_bar(data):
+    return data['Date'].iloc[-1] if 'Date' in data.columns else data.index[-1]
+
+def full_refit(data, X, y, reason):
+    """Fit from scratch; returns (scaler, model, state)"""
+    scaler, model = fit_model(X, y)
+    state = {
+        'incremental_updates': 0,
+        'last_bar': last_bar(data),
+        'mode': 'full',
+        'reason': reason,
+        'errors': [],
+    }
+    return scaler, model, state
+
+def unseen_errors(scaler, model, state, data, X, y):
+    """[model, naive] absolute errors on rows newer than the model's last fit.
+
+    Fits never include the row of their last bar (its target was unknown),
+    so rows from state['last_bar'] on are out of sample for this model.
+    """
+    dates = data['Date'] if 'Date' in data.columns else data.index.to_series()
+    new = (dates.iloc[:-1] >= state['last_bar']).to_numpy()
+    if not new.any():
+        return []
+    actual = y[new].to_numpy()
+    predicted = model.predict(scaler.transform(X[new]))
+    naive = data['Close'].to_numpy(dtype=np.float64)[:-1][new]
+    return [[float(abs(p - a)), float(abs(n - a))] for p, n, a in zip(predicted, naive, actual)]
+
+def drift_reason(scaler, state, X_recent, errors):
+    """Why the current model should be rebuilt, or None if it can be updated in place"""
+    if state['incremental_updates'] >= FULL_REBUILD_EVERY:
+        return 'scheduled'
+    scaled = scaler.transform(X_recent)
+    outside = (scaled < -RANGE_TOLERANCE) | (scaled > 1 + RANGE_TOLERANCE)
+    if outside.mean() > RANGE_DRIFT_SHARE:
+        return 'feature_range'
+    if len(errors) >= MIN_ERROR_ROWS:
+        model_mae, naive_mae = np.mean(errors, axis=0)
+        if model_mae > ERROR_DRIFT_RATIO * naive_mae:
+            return 'error'
+    return None
+
+def refresh_model(data, features, scaler=None, model=None, state=None):
+    """Bring a model up to date with `data`, as cheaply as drift allows.
+
+    Without a previous model, or when drift_reason finds one, this is a full
+    refit. Otherwise INCREMENTAL_TREES more trees are boosted onto the
+    existing booster (XGBoost's xgb_model warm start) using only the last
+    INCREMENTAL_WINDOW rows, keeping the original scaler. Returns
+    (scaler, model, state); state['mode'] says which path was taken.
+    """
+    X, y = training_matrix(data, features)
+    if X.empty:
+        raise ValueError("Insufficient data")
+    if model is None or state is None:
+        return full_refit(data, X, y, 'initial')
+    if last_bar(data) <= state['last_bar']:
+        return scaler, model, {**state, 'mode': 'unchanged', 'reason': None}
+
+    X_recent, y_recent = X[-INCREMENTAL_WINDOW:], y[-INCREMENTAL_WINDOW:]
+    errors = (state.get('errors', []) + unseen_errors(scaler, model, state, data, X, y))[-ERROR_WINDOW:]
+    reason = drift_reason(scaler, state, X_recent, errors)
+    if reason is not None:
+        return full_refit(data, X, y, reason)
+
+    updated = XGBRegressor(**{**MODEL_PARAMS, 'n_estimators': INCREMENTAL_TREES})
+    updated.fit(scaler.transform(X_recent), y_recent, xgb_model=model.get_booster())
+    return scaler, updated, {
+        **state,
+        'incremental_updates': state['incremental_updates'] + 1,
+        'last_bar': last_bar(data),
+        'mode': 'incremental',
+        'reason': None,
+        'errors': errors,
+    }
@@ -0,0 +1,230 @@
+import ast
+import operator
+import threading
+import numpy as np
+from feature_store import COLUMNS, daily_features
+
+# Upper bound on symbols one /screener request may scan
+MAX_SCREEN_SYMBOLS = 500
+
+COMPARISONS = {
+    ast.Lt: operator.lt, ast.LtE: operator.le,
+    ast.Gt: operator.gt, ast.GtE: operator.ge,
+    ast.Eq: operator.eq, ast.NotEq: operator.ne,
+}
+ARITHMETIC = {
+    ast.Add: operator.add, ast.Sub: operator.sub,
+    ast.Mult: operator.mul, ast.Div: operator.truediv,
+}
+
+class Expression:
+    """A screener filter or sort expression over feature columns.
+
+    Accepts column names (see feature_store.COLUMNS), numbers, + - * /,
+    comparisons (chained too), and/or/not and parentheses, e.g.
+    "RSI < 30 and MACD > MACD_Signal". Anything else raises ValueError.
+    Comparisons and and/or/not take conditions, arithmetic and comparisons
+    take numbers. Evaluating it on a symbols x columns matrix gives one value
+    per symbol; rows with a NaN operand never satisfy a comparison, negated
+    or not.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        try:
+            self.tree = ast.parse(text, mode='eval').body
+        except SyntaxError:
+            raise ValueError(f"Invalid expression: {text}")
+        self.columns = []
+        self.kind = self._check(self.tree)
+
+    def _check(self, node):
+        """Validate node and return its kind: 'number' or 'condition'"""
+        if isinstance(node, ast.Name):
+            if node.id not in COLUMNS:
+                raise ValueError(f"Unknown column: {node.id}")
+            if node.id not in self.columns:
+                self.columns.append(node.id)
+            return 'number'
+        if isinstance(node, ast.Constant):
+            if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+                raise ValueError(f"Unsupported value: {node.value!r}")
+            return 'number'
+        if isinstance(node, ast.BoolOp):
+            self._expect(node.values, 'condition', node)
+            return 'condition'
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            self._expect([node.operand], 'condition', node)
+            return 'condition'
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            self._expect([node.operand], 'number', node)
+            return 'number'
+        if isinstance(node, ast.BinOp) and type(node.op) in ARITHMETIC:
+            self._expect([node.left, node.right], 'number', node)
+            return 'number'
+        if isinstance(node, ast.Compare) and all(type(op) in COMPARISONS for op in node.ops):
+            self._expect([node.left, *node.comparators], 'number', node)
+            return 'condition'
+        raise ValueError(f"Unsupported expression: {ast.unparse(node)}")
+
+    def _expect(self, operands, kind, node):
+        for operand in operands:
+            if self._check(operand) != kind:
+                raise ValueError(f"Expected a {kind} in: {ast.unparse(node)}")
+
+    def is_condition(self):
+        """True if the expression is a comparison, or and/or/not of comparisons"""
+        return self.kind == 'condition'
+
+    def evaluate(self, values, position):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self._evaluate(self.tree, values, position)
+
+    def _evaluate(self, node, values, position):
+        if isinstance(node, ast.Name):
+            return values[:, position[node.id]]
+        if isinstance(node, ast.Constant):
+            return np.full(len(values), float(node.value))
+        if isinstance(node, ast.BoolOp):
+            combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+            result = self._evaluate(node.values[0], values, position).astype(bool)
+            for value in node.values[1:]:
+                result = combine(result, self._evaluate(value, values, position).astype(bool))
+            return result
+        if isinstance(node, ast.UnaryOp):
+            operand = self._evaluate(node.operand, values, position)
+            if isinstance(node.op, ast.USub):
+                return -operand
+            # not (RSI < 30) must not match rows where RSI is unknown either
+            known = np.ones(len(values), dtype=bool)
+            for name in ast.walk(node.operand):
+                if isinstance(name, ast.Name):
+                    known &= ~np.isnan(values[:, position[name.id]])
+            return ~operand & known
+        if isinstance(node, ast.BinOp):
+            return ARITHMETIC[type(node.op)](self._evaluate(node.left, values, position),
+                                             self._evaluate(node.right, values, position))
+        # Compare: a < b < c is (a < b) and (b < c)
+        left = self._evaluate(node.left, values, position)
+        result = np.ones(len(values), dtype=bool)
+        for op, comparator in zip(node.ops, node.comparators):
+            right = self._evaluate(comparator, values, position)
+            result &= COMPARISONS[type(op)](left, right)
+            left = right
+        return result
+
+class LatestFeatures:
+    """The latest feature row of every screened symbol, as one matrix.
+
+    values is a symbols x COLUMNS float64 array; update() rewrites a
+    symbol's row only when the feature store hands back a different
+    FeatureMatrix (a new bar arrived or today's bar moved), so refreshing the universe costs
+    one identity check per unchanged symbol.
+    """
+
+    def __init__(self, capacity=64):
+        self.values = np.full((capacity, len(COLUMNS)), np.nan)
+        self.dates = np.full(capacity, np.datetime64('NaT'), dtype='datetime64[ns]')
+        self.symbols = []
+        self.row = {}
+        self.position = {column: i for i, column in enumerate(COLUMNS)}
+        self._sources = {}
+        # Row index arrays per symbol list; rows never move, so these never go stale
+        self._rows = {}
+        self._lock = threading.Lock()
+        self.updates = 0
+
+    def update(self, symbol, matrix):
+        if self._sources.get(symbol) is matrix:
+            return
+        with self._lock:
+            row = self.row.get(symbol)
+            if row is None:
+                row = self.row[symbol] = len(self.symbols)
+                self.symbols.append(symbol)
+                if row == len(self.values):
+                    self._grow()
+            if len(matrix):
+                self.values[row] = matrix.values[-1]
+                self.dates[row] = matrix.dates[-1]
+            else:
+                self.values[row] = np.nan
+                self.dates[row] = np.datetime64('NaT')
+            self._sources[symbol] = matrix
+            self.updates += 1
+
+    def _grow(self):
+        capacity = len(self.values) * 2
+        values = np.full((capacity, len(COLUMNS)), np.nan)
+        values[:len(self.values)] = self.values
+        dates = np.full(capacity, np.datetime64('NaT'), dtype='datetime64[ns]')
+        dates[:len(self.dates)] = self.dates
+        self.values, self.dates = values, dates
+
+    def snapshot(self, symbols, columns=COLUMNS):
+        """(symbols x columns values, dates) in the given order.
+
+        Only the requested columns are copied out, so a filter over a few
+        features does not gather every feature of every symbol.
+        """
+        key = tuple(symbols)
+        rows = self._rows.get(key)
+        if rows is None:
+            rows = np.fromiter((self.row[symbol] for symbol in symbols), dtype=np.intp, count=len(symbols))
+            if len(self._rows) >= 32:
+                self._rows.clear()
+            self._rows[key] = rows
+        with self._lock:
+            return self.values[np.ix_(rows, [self.position[c] for c in columns])], self.dates[rows]
+
+_latest = LatestFeatures()
+
+def get_latest_features():
+    return _latest
+
+def screen(symbols, where=None, sort=None, descending=True, limit=50):
+    """Symbols whose latest features satisfy `where`, ranked by `sort`.
+
+    Returns (results, errors): results are dicts of symbol, bar date and
+    the columns either expression uses; errors maps symbols whose bars
+    could not be loaded to the reason.
+    """
+    condition = Expression(where) if where else None
+    if condition is not None and not condition.is_condition():
+        raise ValueError(f"Filter must be a comparison: {where}")
+    ranking = Expression(sort) if sort else None
+
+    loaded, errors = [], {}
+    for symbol in symbols:
+        try:
+            _latest.update(symbol, daily_features(symbol))
+            loaded.append(symbol)
+        except Exception as e:
+            errors[symbol] = str(e)
+    if not loaded:
+        return [], errors
+
+    columns = ['Close']
+    for expression in (condition, ranking):
+        if expression is not None:
+            columns += [c for c in expression.columns if c not in columns]
+    position = {column: i for i, column in enumerate(columns)}
+    values, dates = _latest.snapshot(loaded, columns)
+    keep = ~np.isnat(dates)
+    if condition is not None:
+        keep &= condition.evaluate(values, position)
+    selected = np.flatnonzero(keep)
+    if ranking is not None:
+        score = ranking.evaluate(values[selected], position).astype(float)
+        # NaN scores sort last whichever way the ranking goes
+        key = np.where(np.isnan(score), np.inf, -score if descending else score)
+        selected = selected[np.argsort(key, kind='stable')]
+    selected = selected[:limit]
+
+    results = []
+    for i in selected:
+        row = values[i]
+        result = {'symbol': loaded[i], 'date': str(dates[i].astype('datetime64[D]'))}
+        result.update((c, None if np.isnan(v) else round(float(v), 4)) for c, v in zip(columns, row))
+        results.append(result)
+    return results, errors
@@ -0,0 +1,166 @@
+import os
+from abc import ABC, abstractmethod
+import numpy as np
+import pandas as pd
+import yfinance as yf
+import config
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# Files that predate the <SYMBOL>.csv naming convention
+CSV_ALIASES = {
+    'NVDA': 'nvidiastock.csv',
+}
+
+CACHE_DIR_NAME = '.bars_cache'
+
+def normalize_bars(frame):
+    """Daily bars as a 'Date'-indexed, ascending frame of float64 OHLCV columns"""
+    frame = frame[OHLCV_COLUMNS].astype(np.float64)
+    frame.index = pd.DatetimeIndex(frame.index, name='Date')
+    return frame.sort_index()
+
+def apply_period(bars, period):
+    """Trim bars to a yfinance-style period such as '2y', '6mo', '5d' or 'ytd'"""
+    if period in (None, 'max') or bars.empty:
+        return bars
+    if period == 'ytd':
+        return bars[bars.index >= bars.index[-1].to_period('Y').start_time.tz_localize(bars.index.tz)]
+    count, unit = int(period.rstrip('dmoy')), period.lstrip('0123456789')
+    offsets = {'d': pd.DateOffset(days=count), 'mo': pd.DateOffset(months=count), 'y': pd.DateOffset(years=count)}
+    return bars[bars.index > bars.index[-1] - offsets[unit]]
+
+class MarketDataSource(ABC):
+    """Where daily OHLCV bars come from.
+
+    daily_bars returns a frame shaped like yfinance's Ticker.history: a
+    DatetimeIndex named 'Date' and float Open/High/Low/Close/Volume columns,
+    oldest bar first.
+    """
+
+    name = None
+
+    @abstractmethod
+    def daily_bars(self, symbol, period='max'):
+        """Daily bars for symbol over a yfinance-style period"""
+
+    def minute_bars(self, symbol, period='5d'):
+        """Minute bars for symbol, or None if the source has no intraday data"""
+        return None
+
+class YFinanceSource(MarketDataSource):
+    name = 'yfinance'
+
+    def daily_bars(self, symbol, period='max'):
+        bars = yf.Ticker(symbol).history(period=period, interval='1d')
+        if bars.empty:
+            return bars
+        return normalize_bars(bars)
+
+    def minute_bars(self, symbol, period='5d'):
+        bars = yf.Ticker(symbol).history(period=period, interval='1m')
+        if bars.empty:
+            return bars
+        return normalize_bars(bars)
+
+def parse_bars_csv(path):
+    """Parse a Date,Open,High,Low,Close,Volume export like nvidiastock.csv.
+
+    Prices and volumes are quoted with thousands separators and rows may be
+    newest first; both are handled by the C parser and vectorized date
+    conversion rather than per-row Python.
+    """
+    raw = pd.read_csv(path, thousands=',', dtype={'Date': str})
+    dates = pd.to_datetime(raw['Date'], format='%m/%d/%Y')
+    frame = raw[OHLCV_COLUMNS].set_axis(pd.DatetimeIndex(dates, name='Date'))
+    return normalize_bars(frame)
+
+def save_bars_cache(bars, path, source_stat):
+    """Write bars as raw columns (int64 epoch days plus float64 OHLCV) to an .npz"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp.npz'
+    np.savez(
+        tmp_path,
+        days=bars.index.asi8 // (24 * 60 * 60 * 10 ** 9),
+        source_mtime=np.int64(source_stat.st_mtime_ns),
+        source_size=np.int64(source_stat.st_size),
+        **{column: bars[column].to_numpy() for column in OHLCV_COLUMNS}
+    )
+    os.replace(tmp_path, path)
+
+def load_bars_cache(path, source_stat):
+    """Bars from an .npz cache, or None if it's missing or older than its CSV"""
+    try:
+        with np.load(path) as cached:
+            if (int(cached['source_mtime']) != source_stat.st_mtime_ns
+                    or int(cached['source_size']) != source_stat.st_size):
+                return None
+            index = pd.DatetimeIndex(cached['days'].astype('datetime64[D]').astype('datetime64[ns]'), name='Date')
+            return pd.DataFrame({column: cached[column] for column in OHLCV_COLUMNS}, index=index)
+    except (OSError, KeyError, ValueError):
+        return None
+
+class CSVSource(MarketDataSource):
+    """Daily bars replayed from <directory>/<SYMBOL>.csv files.
+
+    The first load of each file is parsed and written to a binary columnar
+    cache next to it; later loads (including from other processes) read the
+    cache until the CSV changes.
+    """
+
+    name = 'csv'
+
+    def __init__(self, directory=None, cache_dir=None):
+        self.directory = directory or config.MARKET_DATA_DIR
+        self.cache_dir = cache_dir or os.path.join(self.directory, CACHE_DIR_NAME)
+        self._frames = {}
+
+    def path_for(self, symbol):
+        symbol = symbol.upper()
+        path = os.path.join(self.directory, f"{symbol}.csv")
+        if not os.path.exists(path) and symbol in CSV_ALIASES:
+            path = os.path.join(self.directory, CSV_ALIASES[symbol])
+        return path
+
+    def symbols(self):
+        """Symbols with a local file"""
+        found = {name[:-4].upper() for name in os.listdir(self.directory) if name.endswith('.csv')}
+        found.update(s for s, name in CSV_ALIASES.items() if os.path.exists(os.path.join(self.directory, name)))
+        return sorted(s for s in found if os.path.exists(self.path_for(s)))
+
+    def daily_bars(self, symbol, period='max'):
+        path = self.path_for(symbol)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            raise ValueError(f"No local data file for {symbol}")
+
+        key = (path, stat.st_mtime_ns, stat.st_size)
+        bars = self._frames.get(key)
+        if bars is None:
+            cache_path = os.path.join(self.cache_dir, os.path.basename(path)[:-4] + '.npz')
+            bars = load_bars_cache(cache_path, stat)
+            if bars is None:
+                bars = parse_bars_csv(path)
+                save_bars_cache(bars, cache_path, stat)
+            self._frames = {key: bars, **{k: v for k, v in self._frames.items() if k[0] != path}}
+        return apply_period(bars, period).copy()
+
+SOURCES = {
+    YFinanceSource.name: YFinanceSource,
+    CSVSource.name: CSVSource,
+}
+
+_source = None
+
+def get_source():
+    """The configured market data source (see MARKET_DATA_SOURCE)"""
+    global _source
+    if _source is None:
+        _source = SOURCES[config.MARKET_DATA_SOURCE]()
+    return _source
+
+def set_source(source):
+    """Swap the market data source, e.g. to replay local files in backtests"""
+    global _source
+    _source = source
@@ -0,0 +1,112 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from fast_inference import TreeEnsemble
+
+class SymbolState:
+    """Everything the API caches for one symbol's current model.
+
+    meta holds 'version', 'trained_at', 'bars', 'latest' and 'retrain';
+    payloads maps an endpoint kind ('price', 'predict', 'recommend') to the
+    payload computed by this model ('predict' holds its serialized body and
+    ETag), so replacing the state drops them.
+    """
+
+    __slots__ = ('data', 'model', 'scaler', 'features', 'meta', 'payloads', 'nbytes')
+
+    def __init__(self, data, model, scaler, features, meta):
+        self.data = data
+        self.model = model
+        self.scaler = scaler
+        self.features = features
+        self.meta = meta
+        self.payloads = {}
+        self.nbytes = estimate_nbytes(self)
+
+def _array_nbytes(array):
+    # Memory-mapped arrays live in the shared page cache, not in this process
+    return 0 if isinstance(array, np.memmap) else array.nbytes
+
+def estimate_nbytes(state):
+    """Approximate private memory held by a SymbolState"""
+    total = 0
+    if isinstance(state.data, pd.DataFrame):
+        total += int(state.data.memory_usage(index=True).sum())
+    if isinstance(state.meta.get('latest'), np.ndarray):
+        total += state.meta['latest'].nbytes
+    model = state.model
+    if isinstance(model, TreeEnsemble):
+        total += sum(_array_nbytes(getattr(model, name)) for name in TreeEnsemble.ARRAYS)
+    elif hasattr(model, 'predict_symbols'):
+        pass  # a pooled model is shared by every symbol
+    elif hasattr(model, 'get_booster'):
+        total += len(model.get_booster().save_raw('ubj'))
+    return total
+
+class SymbolCache:
+    """Thread-safe LRU of SymbolStates bounded by entry count and memory.
+
+    Least recently used symbols are evicted once there are more than
+    max_symbols entries or their estimated size exceeds max_bytes; an
+    evicted symbol is simply retrained (or re-mapped) on its next request.
+    """
+
+    def __init__(self, max_symbols, max_bytes=None):
+        self.max_symbols = max_symbols
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, symbol):
+        with self._lock:
+            state = self._states.get(symbol)
+            if state is None:
+                self.misses += 1
+                return None
+            self._states.move_to_end(symbol)
+            self.hits += 1
+            return state
+
+    def set(self, symbol, state):
+        with self._lock:
+            previous = self._states.pop(symbol, None)
+            if previous is not None:
+                self.nbytes -= previous.nbytes
+            self._states[symbol] = state
+            self.nbytes += state.nbytes
+            # The newest entry always stays, even if it alone is over budget
+            while len(self._states) > 1 and (
+                len(self._states) > self.max_symbols
+                or (self.max_bytes is not None and self.nbytes > self.max_bytes)
+            ):
+                _, evicted = self._states.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._states.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'symbols': len(self._states),
+                'max_symbols': self.max_symbols,
+                'bytes': self.nbytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+    def __contains__(self, symbol):
+        return symbol in self._states
+
+    def __len__(self):
+        return len(self._states)
@@ -0,0 +1,155 @@
+import bisect
+import csv
+import heapq
+import os
+import threading
+import numpy as np
+import config
+
+# Header names accepted for each field: NASDAQ Trader's nasdaqlisted.txt /
+# otherlisted.txt (pipe-delimited) or a plain CSV of Symbol,Name,Exchange
+SYMBOL_HEADERS = ('Symbol', 'ACT Symbol', 'Ticker', 'symbol', 'ticker')
+NAME_HEADERS = ('Security Name', 'Name', 'Company', 'name')
+EXCHANGE_HEADERS = ('Exchange', 'Market Category', 'exchange')
+
+MAX_RESULTS = 50
+
+def _field(row, headers):
+    for header in headers:
+        if row.get(header):
+            return row[header].strip()
+    return ''
+
+def read_listing(path):
+    """(symbol, name, exchange) rows from a listing file; test issues are skipped"""
+    with open(path, newline='', encoding='utf-8') as f:
+        header = f.readline()
+        f.seek(0)
+        reader = csv.DictReader(f, delimiter='|' if '|' in header else ',')
+        for row in reader:
+            symbol = _field(row, SYMBOL_HEADERS).upper()
+            # NASDAQ Trader files end with a "File Creation Time" line
+            if not symbol or symbol.startswith('FILE CREATION TIME') or row.get('Test Issue') == 'Y':
+                continue
+            yield symbol, _field(row, NAME_HEADERS), _field(row, EXCHANGE_HEADERS)
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class SymbolIndex:
+    """The symbol master table with a search index over tickers and names.
+
+    Tickers and name words are kept sorted, so prefix matches are two
+    bisections; substring matches on names intersect per-trigram posting
+    lists. Results rank an exact ticker first, then ticker prefixes
+    (shortest first), then names with a word starting with the query, then
+    names containing it.
+    """
+
+    def __init__(self, listings):
+        entries = {}
+        for symbol, name, exchange in listings:
+            entries.setdefault(symbol, {'symbol': symbol, 'name': name or symbol, 'exchange': exchange})
+        self.entries = entries
+        self.symbols = sorted(entries)
+        self._names = [entries[symbol]['name'].lower() for symbol in self.symbols]
+
+        words = sorted(
+            (word, i) for i, name in enumerate(self._names) for word in set(name.replace(',', ' ').split())
+        )
+        self._word_keys = [word for word, _ in words]
+        self._word_ids = [i for _, i in words]
+
+        postings = {}
+        for i, name in enumerate(self._names):
+            for gram in trigrams(name):
+                postings.setdefault(gram, []).append(i)
+        self._postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def __contains__(self, symbol):
+        return symbol in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, symbol):
+        return self.entries.get(symbol)
+
+    def _prefix_range(self, keys, prefix):
+        return bisect.bisect_left(keys, prefix), bisect.bisect_left(keys, prefix + '￿')
+
+    def search(self, query, limit=10):
+        query = query.strip()
+        limit = max(1, min(limit, MAX_RESULTS))
+        if not query:
+            return []
+        found = []
+        seen = set()
+
+        def add(ids):
+            for i in ids:
+                if i not in seen:
+                    seen.add(i)
+                    found.append(i)
+                    if len(found) >= limit:
+                        return True
+            return False
+
+        lo, hi = self._prefix_range(self.symbols, query.upper())
+        # Range positions double as ids: self.symbols is the id order
+        prefixed = heapq.nsmallest(limit, range(lo, hi), key=lambda i: (len(self.symbols[i]), self.symbols[i]))
+        if add(prefixed):
+            return self._results(found)
+
+        text = query.lower()
+        lo, hi = self._prefix_range(self._word_keys, text)
+        if add(self._word_ids[lo:hi]):
+            return self._results(found)
+
+        grams = trigrams(text)
+        if grams:
+            lists = sorted((self._postings.get(gram) for gram in grams), key=lambda ids: 0 if ids is None else len(ids))
+            if lists[0] is not None:
+                ids = lists[0]
+                for other in lists[1:]:
+                    ids = np.intersect1d(ids, other, assume_unique=True)
+                    if not len(ids):
+                        break
+                add(i for i in ids.tolist() if text in self._names[i])
+        return self._results(found)
+
+    def _results(self, ids):
+        return [self.entries[self.symbols[i]] for i in ids]
+
+_index = None
+_index_lock = threading.Lock()
+
+def listing_paths():
+    return [path for path in config.SYMBOL_LISTING_FILES.split(os.pathsep) if path]
+
+def load_symbol_index(paths=None):
+    """A SymbolIndex over every readable listing file plus config.STOCKS"""
+    listings = []
+    for path in listing_paths() if paths is None else paths:
+        try:
+            listings.extend(read_listing(path))
+        except OSError as e:
+            print(f"Symbol listing {path} not loaded: {e}")
+    # Listing rows come first so their names and exchanges win
+    listings.extend((symbol, info['name'], '') for symbol, info in config.STOCKS.items())
+    return SymbolIndex(listings)
+
+def get_symbol_index():
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = load_symbol_index()
+    return _index
+
+def set_symbol_index(index):
+    global _index
+    _index = index
+
+def is_listed(symbol):
+    return symbol in get_symbol_index()
@@ -0,0 +1,121 @@
+from collections import namedtuple
+import pandas as pd
+import ta
+from cache import TTLCache
+from market_data import get_bars, get_minute_store
+from resample import resample_frame
+from replay import active_replay
+from feature_store import daily_features
+
+# source:      '1m' for the incremental minute store, otherwise one of
+#              market_data.BAR_SERIES
+# resample:    interval (see resample.INTERVAL_SECONDS) to aggregate to, or None
+# lookback:    ('sessions', n), ('offset', DateOffset), ('ytd', None) or ('all', None)
+# date_format: label format for the legacy JSON payload
+# ttl:         seconds a computed chart frame stays cached
+Timeframe = namedtuple('Timeframe', 'source resample lookback date_format ttl')
+
+INTRADAY_FORMAT = '%Y-%m-%d %H:%M'
+DAILY_FORMAT = '%Y-%m-%d'
+
+TIMEFRAMES = {
+    '1D': Timeframe('1m', None, ('sessions', 1), INTRADAY_FORMAT, 60),
+    '1W': Timeframe('1m', '5m', ('sessions', 5), INTRADAY_FORMAT, 60),
+    '1M': Timeframe('5m', '30m', ('offset', pd.DateOffset(months=1)), INTRADAY_FORMAT, 5 * 60),
+    '3M': Timeframe('1d', None, ('offset', pd.DateOffset(months=3)), DAILY_FORMAT, 60 * 60),
+    'YTD': Timeframe('1d', None, ('ytd', None), DAILY_FORMAT, 60 * 60),
+    '1Y': Timeframe('1d', None, ('offset', pd.DateOffset(years=1)), DAILY_FORMAT, 60 * 60),
+    'ALL': Timeframe('1d', None, ('all', None), DAILY_FORMAT, 60 * 60),
+}
+DEFAULT_TIMEFRAME = '1Y'
+
+INDICATOR_COLUMNS = ('rsi', 'macd', 'macd_signal')
+
+_chart_frames = TTLCache(ttl=60, max_entries=4096)
+
+def resolve_timeframe(tf):
+    """Normalize a ?tf= value, falling back to the default for unknown ones"""
+    tf = (tf or DEFAULT_TIMEFRAME).upper()
+    return tf if tf in TIMEFRAMES else DEFAULT_TIMEFRAME
+
+def add_indicators(bars):
+    """Append the chart indicator columns, computed once over the whole stored series"""
+    frame = bars[['Open', 'High', 'Low', 'Close', 'Volume']].copy()
+    if frame.empty:
+        for column in INDICATOR_COLUMNS:
+            frame[column] = pd.Series(dtype=float)
+        return frame
+    close = frame['Close']
+    macd = ta.trend.MACD(close)
+    frame['Close'] = close.ffill()
+    frame['rsi'] = ta.momentum.RSIIndicator(close).rsi().fillna(0)
+    frame['macd'] = macd.macd().fillna(0)
+    frame['macd_signal'] = macd.macd_signal().fillna(0)
+    return frame
+
+def daily_indicators(symbol):
+    """add_indicators for the daily series, read from the shared feature store"""
+    matrix = daily_features(symbol, get_bars(symbol, '1d'))
+    frame = matrix.frame(('Open', 'High', 'Low', 'Close', 'Volume', 'RSI', 'MACD', 'MACD_Signal'))
+    frame = frame.rename(columns={'RSI': 'rsi', 'MACD': 'macd', 'MACD_Signal': 'macd_signal'})
+    frame['Close'] = frame['Close'].ffill()
+    frame[list(INDICATOR_COLUMNS)] = frame[list(INDICATOR_COLUMNS)].fillna(0)
+    return frame
+
+def apply_lookback(frame, lookback):
+    kind, value = lookback
+    if frame.empty or kind == 'all':
+        return frame
+    index = frame.index
+    last = index[-1]
+    if kind == 'sessions':
+        sessions = index.normalize().unique()
+        start = sessions[-value] if len(sessions) >= value else sessions[0]
+    elif kind == 'ytd':
+        start = last.normalize().replace(month=1, day=1)
+    else:
+        start = last - value
+    return frame[index >= start]
+
+def chart_key(symbol, tf):
+    """Cache key for a chart frame; during a replay it also tracks the visible bar count"""
+    replay = active_replay()
+    if replay is not None:
+        return (symbol, tf, 'replay', replay.id, replay.cursor(symbol))
+    return (symbol, tf)
+
+def get_chart_frame(symbol, tf):
+    """Bars plus indicator columns for a symbol and timeframe.
+
+    Indicators are computed on the full stored series (so there is no
+    warm-up gap at the left edge of the chart) and the result is cached for
+    the timeframe's TTL; only the minute stream and BAR_SERIES are ever
+    downloaded.
+    """
+    tf = resolve_timeframe(tf)
+    spec = TIMEFRAMES[tf]
+    key = chart_key(symbol, tf)
+    frame = _chart_frames.get(key)
+    if frame is None:
+        replay = active_replay()
+        if spec.source == '1d' and not spec.resample:
+            # The same feature matrix the price model and recommendations read
+            frame = daily_indicators(symbol)
+        else:
+            if replay is not None:
+                bars = replay.bars(symbol, spec.resample or spec.source)
+            elif spec.source == '1m':
+                # Higher intervals are maintained incrementally by the store
+                bars = get_minute_store(symbol).frame(spec.resample or '1m')
+            else:
+                bars = get_bars(symbol, spec.source)
+                if spec.resample:
+                    bars = resample_frame(bars, spec.resample)
+            frame = add_indicators(bars)
+        frame = apply_lookback(frame, spec.lookback)
+        _chart_frames.set(key, frame, ttl=spec.ttl)
+    return frame
+
+def peek_chart_frame(symbol, tf):
+    """The cached chart frame if there is one, without downloading anything"""
+    return _chart_frames.get(chart_key(symbol, resolve_timeframe(tf)))
@@ -0,0 +1,118 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from model import MODEL_FEATURES, MODEL_PARAMS, prepare_data, training_matrix, fit_model
+from sources import get_source
+
+# Model configurations compared by default: the production model plus
+# cheaper variants. Each fold fits single-threaded; parallelism comes from
+# running folds side by side.
+DEFAULT_CONFIGS = {
+    'production': dict(MODEL_PARAMS),
+    'shallow-100': {**MODEL_PARAMS, 'n_estimators': 100, 'max_depth': 3, 'learning_rate': 0.1},
+    'stumps-50': {**MODEL_PARAMS, 'n_estimators': 50, 'max_depth': 2, 'learning_rate': 0.2},
+}
+
+def walk_forward_splits(n, min_train, test_size, step=None, window=None):
+    """(train, test) index slices over n time-ordered rows.
+
+    Training grows from the first row (expanding) or, with `window`, keeps
+    only the most recent `window` rows (rolling). Test blocks of test_size
+    rows follow the training rows and advance by `step` (default test_size).
+    """
+    step = step or test_size
+    splits = []
+    end = min_train
+    while end + test_size <= n:
+        start = max(0, end - window) if window else 0
+        splits.append((slice(start, end), slice(end, end + test_size)))
+        end += step
+    return splits
+
+def evaluate_fold(task):
+    """Fit one config on one fold and score it; runs in a worker process"""
+    name, params, fold, X, y, last_close, train, test = task
+    params = {'n_jobs': 1, **params}
+
+    started = time.perf_counter()
+    scaler, model = fit_model(X[train], y[train], params)
+    fit_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    predicted = model.predict(scaler.transform(X[test]))
+    predict_seconds = time.perf_counter() - started
+
+    actual = y[test]
+    baseline = last_close[test]
+    return {
+        'config': name,
+        'fold': fold,
+        'train_rows': len(X[train]),
+        'test_rows': len(actual),
+        'mae': float(np.abs(predicted - actual).mean()),
+        'baseline_mae': float(np.abs(baseline - actual).mean()),
+        'directional_accuracy': float((np.sign(predicted - baseline) == np.sign(actual - baseline)).mean()),
+        'fit_seconds': fit_seconds,
+        'predict_seconds': predict_seconds,
+        'predict_us_per_row': predict_seconds / max(len(actual), 1) * 1e6,
+    }
+
+def walk_forward(data, configs=None, min_train=250, test_size=21, step=None, window=None, workers=None):
+    """Walk-forward evaluation of model configs on prepared feature data.
+
+    Returns one row per (config, fold) with MAE, the naive last-close MAE,
+    directional accuracy and fit/predict timings. Folds are fitted on a
+    process pool.
+    """
+    configs = configs or DEFAULT_CONFIGS
+    features = [f for f in MODEL_FEATURES if f in data.columns]
+    X, y = training_matrix(data, features)
+    last_close = data['Close'].to_numpy(dtype=np.float64)[:-1]
+    X = X.to_numpy(dtype=np.float64)
+    y = y.to_numpy(dtype=np.float64)
+
+    splits = walk_forward_splits(len(X), min_train, test_size, step, window)
+    if not splits:
+        raise ValueError(f"Need at least {min_train + test_size} rows, have {len(X)}")
+    tasks = [
+        (name, params, fold, X, y, last_close, train, test)
+        for name, params in configs.items()
+        for fold, (train, test) in enumerate(splits)
+    ]
+    if workers == 1:
+        results = [evaluate_fold(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(evaluate_fold, tasks))
+    return pd.DataFrame(results)
+
+def summarize_folds(folds):
+    """Per-config averages, with MAE also relative to the naive baseline"""
+    summary = folds.groupby('config').agg(
+        folds=('fold', 'count'),
+        mae=('mae', 'mean'),
+        baseline_mae=('baseline_mae', 'mean'),
+        directional_accuracy=('directional_accuracy', 'mean'),
+        fit_seconds=('fit_seconds', 'mean'),
+        predict_us_per_row=('predict_us_per_row', 'mean'),
+    )
+    summary['mae_vs_baseline'] = summary['mae'] / summary['baseline_mae']
+    return summary.sort_values('mae')
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Walk-forward evaluation of the price model')
+    parser.add_argument('symbol', nargs='?', default='NVDA')
+    parser.add_argument('--period', default='max')
+    parser.add_argument('--min-train', type=int, default=250)
+    parser.add_argument('--test-size', type=int, default=21)
+    parser.add_argument('--window', type=int, default=None, help='rolling window length (default: expanding)')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    data = prepare_data(get_source().daily_bars(args.symbol, args.period))
+    folds = walk_forward(data, min_train=args.min_train, test_size=args.test_size,
+                         window=args.window, workers=args.workers)
+    print(summarize_folds(folds).round(4).to_string())
@@ -0,0 +1,96 @@
+import base64
+import gzip
+import json
+import numpy as np
+
+try:
+    import msgpack
+except ImportError:  # MessagePack responses are optional
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:  # Brotli compression is optional, gzip is always available
+    brotli = None
+
+COLUMNAR_JSON = 'application/vnd.minty.columnar+json'
+MSGPACK = 'application/x-msgpack'
+
+# Responses smaller than this aren't worth compressing
+MIN_COMPRESS_SIZE = 1024
+
+def negotiate(accept_header):
+    """Pick 'msgpack', 'columnar' or 'json' from an Accept header"""
+    accept = (accept_header or '').lower()
+    if MSGPACK in accept and msgpack is not None:
+        return 'msgpack'
+    if COLUMNAR_JSON in accept or MSGPACK in accept:
+        return 'columnar'
+    return 'json'
+
+def encode_columns(epochs, columns, binary=False, **meta):
+    """Columnar chart payload: delta-encoded epoch seconds plus float32 columns.
+
+    With binary=False the raw little-endian buffers are base64 encoded so the
+    payload is valid JSON; with binary=True they are left as bytes for
+    MessagePack.
+    """
+    epochs = np.asarray(epochs, dtype=np.int64)
+    deltas = np.diff(epochs)
+    delta_dtype = '<i4' if len(deltas) == 0 or np.abs(deltas).max() < 2 ** 31 else '<i8'
+
+    def pack(array, dtype):
+        raw = np.ascontiguousarray(array, dtype=dtype).tobytes()
+        return raw if binary else base64.b64encode(raw).decode('ascii')
+
+    payload = {
+        'format': 'columnar-v1',
+        'length': int(len(epochs)),
+        'time': {
+            'start': int(epochs[0]) if len(epochs) else None,
+            'delta_dtype': delta_dtype.lstrip('<'),
+            'deltas': pack(deltas, delta_dtype),
+        },
+        'dtype': 'float32',
+        'columns': {name: pack(values, '<f4') for name, values in columns.items()},
+    }
+    payload.update(meta)
+    return payload
+
+def decode_columns(payload):
+    """Inverse of encode_columns, returning (epochs, {name: float32 array})"""
+    def unpack(raw, dtype):
+        if isinstance(raw, str):
+            raw = base64.b64decode(raw)
+        return np.frombuffer(raw, dtype=dtype)
+
+    time = payload['time']
+    if time['start'] is None:
+        epochs = np.array([], dtype=np.int64)
+    else:
+        deltas = unpack(time['deltas'], '<' + time['delta_dtype']).astype(np.int64)
+        epochs = time['start'] + np.concatenate(([0], np.cumsum(deltas)))
+    columns = {name: unpack(raw, '<f4') for name, raw in payload['columns'].items()}
+    return epochs, columns
+
+def serialize(epochs, columns, fmt, **meta):
+    """Return (body, mimetype) for a columnar payload in the negotiated format"""
+    if fmt == 'msgpack':
+        return msgpack.packb(encode_columns(epochs, columns, binary=True, **meta)), MSGPACK
+    body = json.dumps(encode_columns(epochs, columns, **meta), separators=(',', ':'))
+    return body.encode('utf-8'), COLUMNAR_JSON
+
+def compress(body, accept_encoding):
+    """Compress a response body with the best encoding the client accepts.
+
+    Returns (body, content_encoding); content_encoding is None when the body
+    is left as is.
+    """
+    accept = (accept_encoding or '').lower()
+    if len(body) < MIN_COMPRESS_SIZE:
+        return body, None
+    if brotli is not None and 'br' in accept:
+        return brotli.compress(body, quality=5), 'br'
+    if 'gzip' in accept:
+        return gzip.compress(body, compresslevel=6), 'gzip'
+    return body, None
@@ -0,0 +1,74 @@
+"""Per-request allocations on the prediction path, before and after pre-scaling.
+
+    python benchmarks/alloc_bench.py --requests 500
+
+Counts pandas DataFrame/Series constructions and traced Python heap
+allocations for one prediction on a seeded synthetic series, comparing
+the original create_features(data.tail(50)) + scaler.transform path with
+predict_latest on the row scaled once at training time.
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from unittest.mock import patch
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backtest_bench import synthetic_bars
+from model import MODEL_FEATURES, create_features, prepare_data, training_matrix, fit_model, scaled_feature_row, predict_latest
+
+@contextmanager
+def count_constructions():
+    """Counts of DataFrame and Series objects built inside the block"""
+    counts = {'DataFrame': 0, 'Series': 0}
+
+    def counting(cls, name):
+        init = cls.__init__
+
+        def wrapped(self, *args, **kwargs):
+            counts[name] += 1
+            init(self, *args, **kwargs)
+        return patch.object(cls, '__init__', wrapped)
+
+    with counting(pd.DataFrame, 'DataFrame'), counting(pd.Series, 'Series'):
+        yield counts
+
+def original_path(data, scaler, model, features):
+    latest = create_features(data.tail(50)).dropna()[features].iloc[[-1]]
+    return model.predict(scaler.transform(latest))[0]
+
+def measure(predict, requests):
+    predict()
+    with count_constructions() as counts:
+        predict()
+    tracemalloc.start()
+    predict()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    started = time.perf_counter()
+    for _ in range(requests):
+        predict()
+    return counts, peak, (time.perf_counter() - started) / requests * 1e6
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=500)
+    args = parser.parse_args()
+
+    data = prepare_data(synthetic_bars(1, 4)['SYM0'])
+    features = list(MODEL_FEATURES)
+    scaler, model = fit_model(*training_matrix(data, features))
+    row = scaled_feature_row(data, features, scaler)
+
+    paths = {
+        'create_features + transform': lambda: original_path(data, scaler, model, features),
+        'pre-scaled row + buffer': lambda: predict_latest({'SYM0': (model, None, row)}),
+    }
+    print(f"{'path':<30}{'DataFrames':>11}{'Series':>8}{'peak KiB':>10}{'us/request':>12}")
+    for name, predict in paths.items():
+        counts, peak, us = measure(predict, args.requests)
+        print(f"{name:<30}{counts['DataFrame']:>11}{counts['Series']:>8}{peak / 1024:>10.1f}{us:>12.1f}")
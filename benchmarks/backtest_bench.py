@@ -0,0 +1,57 @@
+"""Time the vectorized backtester on synthetic multi-symbol history.
+
+    python benchmarks/backtest_bench.py --years 20 --symbols 8
+
+Bars are a seeded geometric random walk, so runs are reproducible and need
+no network access.
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backtest import backtest_signals, feature_panel
+
+def synthetic_bars(symbols, years, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range('2000-01-03', periods=years * 252, name='Date')
+    bars = {}
+    for i in range(symbols):
+        close = 50 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, len(index))))
+        spread = np.abs(rng.normal(0, 0.01, len(index)))
+        bars[f'SYM{i}'] = pd.DataFrame({
+            'Open': close * (1 + rng.normal(0, 0.005, len(index))),
+            'High': close * (1 + spread),
+            'Low': close * (1 - spread),
+            'Close': close,
+            'Volume': rng.integers(1_000_000, 50_000_000, len(index)).astype(float),
+        }, index=index)
+    return bars
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--years', type=int, default=20)
+    parser.add_argument('--symbols', type=int, default=8)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    bars = synthetic_bars(args.symbols, args.years)
+    backtest_signals(bars)  # warm up imports and thread pool
+
+    features, totals = [], []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        feature_panel(bars)
+        features.append(time.perf_counter() - started)
+        started = time.perf_counter()
+        result = backtest_signals(bars)
+        totals.append(time.perf_counter() - started)
+
+    print(f"{args.symbols} symbols x {args.years * 252} bars")
+    print(f"  features only: {min(features) * 1000:.0f} ms (best of {args.repeat})")
+    print(f"  full backtest: {min(totals) * 1000:.0f} ms (best of {args.repeat})")
+    print(f"  portfolio return {result['portfolio']['total_return']:.2%}, sharpe {result['portfolio']['sharpe']:.2f}")
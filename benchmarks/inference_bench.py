@@ -0,0 +1,70 @@
+"""Single-prediction latency: XGBoost predict versus the NumPy tree walker.
+
+    python benchmarks/inference_bench.py --calls 2000
+
+Fits the production model on a seeded synthetic series (or --live SYMBOL
+from the configured market data source), then times one-row predictions
+through each path and checks every path returns the same values as
+model.predict on the same scaled rows.
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backtest_bench import synthetic_bars
+from model import MODEL_FEATURES, prepare_data, training_matrix, fit_model
+from fast_inference import TreeEnsemble
+
+def per_call_us(predict, calls):
+    predict()
+    started = time.perf_counter()
+    for _ in range(calls):
+        predict()
+    return (time.perf_counter() - started) / calls * 1e6
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=2000)
+    parser.add_argument('--live', help='symbol to load from the configured market data source')
+    args = parser.parse_args()
+
+    if args.live:
+        from sources import get_source
+        bars = get_source().daily_bars(args.live)
+    else:
+        bars = synthetic_bars(1, 4)['SYM0']
+    data = prepare_data(bars)
+    features = list(MODEL_FEATURES)
+    X, y = training_matrix(data, features)
+    scaler, model = fit_model(X, y)
+
+    started = time.perf_counter()
+    ensemble = TreeEnsemble(model.get_booster())
+    compile_ms = (time.perf_counter() - started) * 1000
+
+    frame_row = data[features].iloc[[-1]]
+    row = scaler.transform(frame_row)
+    paths = {
+        'DataFrame -> predict (current)': lambda: model.predict(scaler.transform(frame_row)),
+        'ndarray -> predict': lambda: model.predict(row),
+        'ndarray -> tree walker': lambda: ensemble.predict(row),
+    }
+
+    # Every path must agree with XGBoost, on the latest row and on history
+    scaled = scaler.transform(X)
+    max_diff = float(np.abs(ensemble.predict(scaled) - model.predict(scaled)).max())
+    for name, predict in paths.items():
+        max_diff = max(max_diff, float(np.abs(predict() - model.predict(row)).max()))
+
+    print(f"{len(ensemble.roots)} trees, depth {ensemble.depth}, compiled in {compile_ms:.1f} ms\n")
+    print(f"{'path':<34}{'us/call':>10}")
+    timings = {name: per_call_us(predict, args.calls) for name, predict in paths.items()}
+    for name, us in timings.items():
+        print(f"{name:<34}{us:>10.1f}")
+    current = timings['DataFrame -> predict (current)']
+    print(f"\nspeed-up vs current {current / timings['ndarray -> tree walker']:.1f}x; "
+          f"max |difference| over {len(scaled) + 1} rows: {max_diff}")
@@ -0,0 +1,103 @@
+"""Compare one pooled model against one XGBRegressor per symbol.
+
+    python benchmarks/pooled_vs_per_symbol.py --symbols 8 --years 2
+    python benchmarks/pooled_vs_per_symbol.py --live NVDA AMD AAPL
+
+Each approach is fitted in its own child process so peak resident memory
+(ru_maxrss) is measured separately. Both train on the first 80% of every
+symbol's rows and are scored on the rest: MAE of the predicted next close
+and directional accuracy against the last close.
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backtest_bench import synthetic_bars
+from model import MODEL_FEATURES, prepare_data, training_matrix, fit_model
+from pooled_model import PooledModel
+
+TRAIN_FRACTION = 0.8
+
+def split(data):
+    cut = int(len(data) * TRAIN_FRACTION)
+    return data.iloc[:cut], data.iloc[cut:]
+
+def score(predicted, actual, last_close):
+    return np.abs(predicted - actual), np.sign(predicted - last_close) == np.sign(actual - last_close)
+
+def per_symbol(data_by_symbol):
+    errors, hits = [], []
+    started = time.perf_counter()
+    fitted = {}
+    for symbol, data in data_by_symbol.items():
+        train, _ = split(data)
+        fitted[symbol] = fit_model(*training_matrix(train, list(MODEL_FEATURES)))
+    fit_seconds = time.perf_counter() - started
+    for symbol, data in data_by_symbol.items():
+        _, test = split(data)
+        scaler, model = fitted[symbol]
+        X, y = training_matrix(test, list(MODEL_FEATURES))
+        err, hit = score(model.predict(scaler.transform(X)), y.to_numpy(), test['Close'].to_numpy()[:-1])
+        errors.append(err)
+        hits.append(hit)
+    return fit_seconds, np.concatenate(errors), np.concatenate(hits)
+
+def pooled(data_by_symbol):
+    model = PooledModel(list(data_by_symbol))
+    started = time.perf_counter()
+    model.fit({symbol: split(data)[0] for symbol, data in data_by_symbol.items()})
+    fit_seconds = time.perf_counter() - started
+    errors, hits = [], []
+    for symbol, data in data_by_symbol.items():
+        _, test = split(data)
+        rows = test[model.input_features].to_numpy()[:-1]
+        predicted = model.predict_symbols([symbol] * len(rows), rows)
+        err, hit = score(predicted, test['Close'].to_numpy()[1:], test['Close'].to_numpy()[:-1])
+        errors.append(err)
+        hits.append(hit)
+    return fit_seconds, np.concatenate(errors), np.concatenate(hits)
+
+def run(approach, data_by_symbol, results):
+    fit_seconds, errors, hits = approach(data_by_symbol)
+    results.put({
+        'fit_seconds': fit_seconds,
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'mae': float(errors.mean()),
+        'directional_accuracy': float(hits.mean()),
+    })
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=8, help='synthetic symbol count')
+    parser.add_argument('--years', type=int, default=2)
+    parser.add_argument('--live', nargs='*', help='use these symbols from the configured market data source')
+    args = parser.parse_args()
+
+    if args.live:
+        from sources import get_source
+        bars = {symbol: get_source().daily_bars(symbol, period=f'{args.years}y') for symbol in args.live}
+    else:
+        bars = synthetic_bars(args.symbols, args.years)
+        # Spread price levels so the per-symbol scales genuinely differ
+        for i, symbol in enumerate(bars):
+            bars[symbol][['Open', 'High', 'Low', 'Close']] *= 2 ** i
+    data_by_symbol = {symbol: prepare_data(frame) for symbol, frame in bars.items()}
+    rows = sum(len(data) for data in data_by_symbol.values())
+    print(f"{len(data_by_symbol)} symbols, {rows} feature rows\n")
+
+    context = multiprocessing.get_context('fork')
+    print(f"{'approach':<12}{'fit s':>8}{'peak RSS MB':>14}{'MAE':>10}{'direction':>11}")
+    for name, approach in (('per-symbol', per_symbol), ('pooled', pooled)):
+        results = context.Queue()
+        child = context.Process(target=run, args=(approach, data_by_symbol, results))
+        child.start()
+        result = results.get()
+        child.join()
+        print(f"{name:<12}{result['fit_seconds']:>8.2f}{result['peak_rss_mb']:>14.0f}"
+              f"{result['mae']:>10.3f}{result['directional_accuracy']:>11.1%}")
@@ -0,0 +1,70 @@
+"""Portfolio risk latency: cached returns matrix versus recomputing from closes.
+
+    python benchmarks/portfolio_risk_bench.py --positions 50 --window 252
+
+Builds seeded synthetic closes for the held symbols and a benchmark, then
+times a cold RiskModel build, a warm call that only rescores the current
+weights, and a pandas recomputation of the same metrics from the closes.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import portfolio_risk
+from portfolio_risk import RiskModel, portfolio_risk as compute_risk
+
+def per_call_ms(run, calls):
+    run()
+    started = time.perf_counter()
+    for _ in range(calls):
+        run()
+    return (time.perf_counter() - started) / calls * 1000
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--positions', type=int, default=50)
+    parser.add_argument('--window', type=int, default=252)
+    parser.add_argument('--calls', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    symbols = [f'S{i:03d}' for i in range(args.positions)]
+    dates = pd.bdate_range(end='2026-03-02', periods=args.window + 30)
+    returns = rng.normal(0, 0.01, (len(dates), args.positions + 1))
+    closes = pd.DataFrame(100 * np.cumprod(1 + returns, axis=0), index=dates, columns=symbols + ['SPY'])
+    quantities = {symbol: int(q) for symbol, q in zip(symbols, rng.integers(1, 100, args.positions))}
+
+    def recompute():
+        window = closes.iloc[-(args.window + 1):]
+        daily = window.pct_change().dropna()
+        values = window[symbols].iloc[-1] * pd.Series(quantities)
+        weights = values / values.sum()
+        portfolio = daily[symbols] @ weights
+        covariance = daily[symbols].cov()
+        volatility = np.sqrt(weights @ covariance @ weights)
+        beta = portfolio.cov(daily['SPY']) / daily['SPY'].var()
+        return volatility, beta, -portfolio.quantile(0.05)
+
+    fetch = lambda symbols, start: closes[[s for s in symbols if s in closes]]
+    with patch.object(portfolio_risk, 'get_daily_closes', side_effect=fetch), \
+         patch.object(portfolio_risk, 'market_now', return_value=datetime(2026, 3, 2, 16)):
+        cold = lambda: RiskModel(symbols, closes[symbols], closes['SPY'], args.window)
+        warm = lambda: compute_risk(quantities, args.window)
+        risk = warm()
+        volatility, beta, var = recompute()
+        assert np.isclose(risk['daily_volatility'], volatility, atol=1e-6)
+        assert np.isclose(risk['beta'], beta, atol=1e-6)
+        assert np.isclose(risk['var']['pct'], var, atol=1e-6)
+
+        print(f"{args.positions} positions, {args.window} day window\n")
+        print(f"{'path':<34}{'ms/call':>10}")
+        for name, run in (('pandas recompute from closes', recompute), ('cold RiskModel build', cold),
+                          ('cached (rescore weights)', warm)):
+            print(f"{name:<34}{per_call_ms(run, args.calls):>10.3f}")
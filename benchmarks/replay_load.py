@@ -0,0 +1,118 @@
+"""Load test the market data endpoints against a replayed market.
+
+Start the server with REPLAY_ENABLED=true (and MARKET_DATA_SOURCE=csv to stay
+offline), then run for example:
+
+    python benchmarks/replay_load.py --symbols NVDA --start 2024-06-03 --speed 3600
+
+A replay is started over HTTP, the endpoints are hit from a thread pool for
+--duration seconds, and throughput plus latency percentiles are reported per
+endpoint. --speed 0 with --step advances simulated time by a fixed amount
+between rounds instead, so two runs see exactly the same bars. --interval 1m
+replays minute bars (yfinance source only) so quotes move within each day.
+
+Every client thread registers its own user once the replay has started and
+places alternating buy/sell market orders through POST /orders. Those users,
+orders and fills live in REPLAY_DATABASE_URL, which is reset per replay, never
+in the real accounts database. Run multi-worker servers with a shared
+REPLAY_DIR so every worker follows the same replay.
+"""
+import argparse
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import requests
+
+ENDPOINTS = (
+    '/live_data/{symbol}',
+    '/historical_data/{symbol}?tf=1Y&max_points=500',
+    '/historical_data/{symbol}?tf=3M',
+    '/recommend/{symbol}',
+    'POST /orders',
+)
+
+def timed_request(session, method, url, json=None):
+    started = time.perf_counter()
+    response = session.request(method, url, json=json)
+    return response.status_code, time.perf_counter() - started
+
+def replay_user_session(base):
+    """Session authenticated as a fresh user of the replay's accounts database"""
+    session = requests.Session()
+    name = f'replay-{uuid.uuid4().hex[:12]}'
+    response = session.post(f'{base}/auth/register', json={
+        'username': name, 'email': f'{name}@example.com', 'password': uuid.uuid4().hex
+    })
+    response.raise_for_status()
+    session.headers['Authorization'] = f"Bearer {response.json()['access_token']}"
+    return session
+
+def run(args):
+    base = args.url.rstrip('/')
+    control = requests.Session()
+    status = control.post(f'{base}/replay', json={
+        'symbols': args.symbols, 'start': args.start, 'speed': args.speed, 'interval': args.interval
+    }).json()
+    if 'error' in status:
+        raise SystemExit(f"Replay failed to start: {status['error']}")
+    print(f"Replay started at {status['simulated_time']} ({status['speed']}x)")
+
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    targets = []
+    for symbol in args.symbols:
+        for endpoint in ENDPOINTS:
+            method, _, path = endpoint.rpartition(' ')
+            targets.append((endpoint, method or 'GET', base + path.format(symbol=symbol), symbol))
+    sessions = [replay_user_session(base) for _ in range(args.concurrency)]
+
+    def worker(index):
+        session = sessions[index]
+        deadline = time.perf_counter() + args.duration
+        i = index
+        while time.perf_counter() < deadline:
+            endpoint, method, url, symbol = targets[i % len(targets)]
+            order = None
+            if method == 'POST':
+                # Alternate rounds buy and sell back one share
+                side = 'buy' if (i // len(targets)) % 2 == 0 else 'sell'
+                order = {'symbol': symbol, 'side': side, 'qty': 1}
+            code, elapsed = timed_request(session, method, url, order)
+            latencies[endpoint].append(elapsed)
+            if code >= 400:
+                errors[endpoint] += 1
+            i += 1
+            if args.speed == 0 and args.step and index == 0 and i % len(targets) == 0:
+                control.put(f'{base}/replay', json={'advance': args.step})
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        list(pool.map(worker, range(args.concurrency)))
+    wall = time.perf_counter() - started
+    status = control.get(f'{base}/replay').json()
+    control.delete(f'{base}/replay')
+
+    total = sum(len(v) for v in latencies.values())
+    print(f"Simulated clock reached {status.get('simulated_time')}")
+    print(f"{total} requests in {wall:.1f}s = {total / wall:.0f} req/s\n")
+    print(f"{'endpoint':<50}{'n':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for endpoint in ENDPOINTS:
+        samples = np.array(latencies[endpoint]) * 1000
+        if not len(samples):
+            continue
+        p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+        print(f"{endpoint:<50}{len(samples):>8}{p50:>10.1f}{p95:>10.1f}{p99:>10.1f}{errors[endpoint]:>8}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://localhost:5001')
+    parser.add_argument('--symbols', nargs='+', default=['NVDA'])
+    parser.add_argument('--start', default=None, help='simulated start time (default: first stored bar)')
+    parser.add_argument('--interval', choices=('1d', '1m'), default='1d', help='replay daily or minute bars')
+    parser.add_argument('--speed', type=float, default=3600.0, help='simulated seconds per wall second')
+    parser.add_argument('--step', type=float, default=24 * 60 * 60, help='seconds to advance per round when --speed 0')
+    parser.add_argument('--duration', type=float, default=30.0)
+    parser.add_argument('--concurrency', type=int, default=8)
+    run(parser.parse_args())
@@ -0,0 +1,68 @@
+"""Daily refresh cost: full refits versus warm-start incremental updates.
+
+    python benchmarks/retrain_bench.py --days 60
+
+Replays --days daily refreshes over a seeded synthetic series (or --live
+SYMBOL from the configured market data source). Each day both strategies
+see the same two-year window; CPU time is process time spent refreshing,
+and accuracy is the MAE of each day's prediction for the next close.
+"""
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from backtest_bench import synthetic_bars
+from model import MODEL_FEATURES, prepare_data, training_matrix, fit_model
+from retraining import refresh_model
+
+WINDOW = 504  # two years of daily bars, like load_and_train
+
+def predict_next(scaler, model, data, features):
+    return float(model.predict(scaler.transform(data[features].iloc[[-1]]))[0])
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--days', type=int, default=60)
+    parser.add_argument('--live', help='symbol to load from the configured market data source')
+    args = parser.parse_args()
+
+    if args.live:
+        from sources import get_source
+        bars = get_source().daily_bars(args.live)
+    else:
+        bars = synthetic_bars(1, 4)['SYM0']
+    data = prepare_data(bars)
+    features = list(MODEL_FEATURES)
+    first = len(data) - args.days - 1
+    if first < 100:
+        raise SystemExit(f"Need more history: {len(data)} prepared rows for {args.days} days")
+
+    cpu = {'full': 0.0, 'incremental': 0.0}
+    errors = {'full': [], 'incremental': []}
+    modes = Counter()
+    scaler = model = state = None
+    for day in range(first, first + args.days):
+        window = data.iloc[max(0, day - WINDOW):day + 1]
+        actual = data['Close'].iloc[day + 1]
+
+        started = time.process_time()
+        full_scaler, full_model = fit_model(*training_matrix(window, features))
+        cpu['full'] += time.process_time() - started
+        errors['full'].append(abs(predict_next(full_scaler, full_model, window, features) - actual))
+
+        started = time.process_time()
+        scaler, model, state = refresh_model(window, features, scaler, model, state)
+        cpu['incremental'] += time.process_time() - started
+        modes[state['mode'] if state['reason'] is None else f"{state['mode']} ({state['reason']})"] += 1
+        errors['incremental'].append(abs(predict_next(scaler, model, window, features) - actual))
+
+    print(f"{args.days} daily refreshes over {len(window)}-row windows\n")
+    print(f"{'strategy':<14}{'CPU s':>8}{'per day ms':>12}{'next-day MAE':>14}")
+    for name in ('full', 'incremental'):
+        print(f"{name:<14}{cpu[name]:>8.2f}{cpu[name] / args.days * 1000:>12.1f}{np.mean(errors[name]):>14.3f}")
+    print(f"\nspeed-up {cpu['full'] / cpu['incremental']:.1f}x; refresh paths: {dict(modes)}")
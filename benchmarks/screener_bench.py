@@ -0,0 +1,69 @@
+"""Screener latency: vectorized expression versus a per-symbol loop.
+
+    python benchmarks/screener_bench.py --symbols 5000
+
+Fills LatestFeatures with seeded random feature rows, then times one
+filter-and-rank pass over the whole matrix, a refresh where no new bar
+arrived, and the same filter as a Python loop over per-symbol rows.
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from feature_store import COLUMNS, FeatureMatrix
+from screener import Expression, LatestFeatures
+
+WHERE = 'RSI < 30 and MACD > MACD_Signal'
+
+def per_call_ms(run, calls):
+    run()
+    started = time.perf_counter()
+    for _ in range(calls):
+        run()
+    return (time.perf_counter() - started) / calls * 1000
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=5000)
+    parser.add_argument('--calls', type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    symbols = [f'S{i:05d}' for i in range(args.symbols)]
+    matrices = {}
+    for symbol in symbols:
+        values = rng.normal(50, 20, size=(1, len(COLUMNS)))
+        matrices[symbol] = FeatureMatrix(np.array(['2026-01-02'], dtype='datetime64[ns]'), values)
+    latest = LatestFeatures()
+    for symbol in symbols:
+        latest.update(symbol, matrices[symbol])
+
+    where, sort = Expression(WHERE), Expression('Volume')
+    columns = ['RSI', 'MACD', 'MACD_Signal', 'Volume']
+    position = {column: i for i, column in enumerate(columns)}
+
+    def vectorized():
+        values, _ = latest.snapshot(symbols, columns)
+        selected = np.flatnonzero(where.evaluate(values, position))
+        return selected[np.argsort(-sort.evaluate(values[selected], position))]
+
+    rows = {symbol: dict(zip(COLUMNS, matrices[symbol].values[-1])) for symbol in symbols}
+
+    def looped():
+        matches = [s for s, row in rows.items() if row['RSI'] < 30 and row['MACD'] > row['MACD_Signal']]
+        return sorted(matches, key=lambda s: -rows[s]['Volume'])
+
+    def refresh():
+        for symbol in symbols:
+            latest.update(symbol, matrices[symbol])
+
+    assert [symbols[i] for i in vectorized()] == looped()
+    print(f"{args.symbols} symbols, filter: {WHERE}, {len(looped())} matches\n")
+    print(f"{'pass':<34}{'ms/call':>10}")
+    for name, run in (('vectorized filter + rank', vectorized), ('per-symbol loop', looped),
+                      ('refresh, no new bars', refresh)):
+        print(f"{name:<34}{per_call_ms(run, args.calls):>10.2f}")
@@ -0,0 +1,97 @@
+"""Worker memory with private versus memory-mapped model and feature artifacts.
+
+    python benchmarks/shared_artifacts_bench.py --symbols 16 --workers 1 2 4 8
+
+Publishes a feature matrix and a model per synthetic symbol, then starts
+N independent (spawned) worker processes that each load every symbol and
+predict once. 'private' reads the arrays and boosters into process memory,
+like per-worker globals; 'mapped' maps the same files read-only. Memory is
+what loading added to each worker, from /proc/self/smaps_rollup: PSS
+charges shared pages fractionally, so the PSS total over all workers is
+the real footprint.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import config
+from backtest_bench import synthetic_bars
+from model import MODEL_FEATURES, training_matrix, fit_model
+from feature_store import FeatureStore, COLUMNS
+from artifacts import publish_model, load_model
+
+def memory_kib():
+    fields = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    return {'pss': fields['Pss'], 'private': fields['Private_Clean'] + fields['Private_Dirty']}
+
+def worker(mode, directory, matrices, barrier, results):
+    import xgboost as xgb
+    config.MODEL_ARTIFACT_DIR = os.path.join(directory, 'models')
+    before = memory_kib()
+    held = []
+    for symbol, path in matrices.items():
+        values = np.load(path, mmap_mode='r' if mode == 'mapped' else None)
+        row = values[-1, len(COLUMNS) - len(MODEL_FEATURES):].astype(np.float32)[None, :]
+        float(values.sum())  # touch every page, as training and charts would
+        if mode == 'mapped':
+            scaler, model, _, _ = load_model(symbol)
+            model.predict(row)
+        else:
+            model = xgb.Booster(model_file=os.path.join(config.MODEL_ARTIFACT_DIR, symbol, 'v1', 'booster.ubj'))
+            model.inplace_predict(row)
+        held.append((values, model))
+    barrier.wait()  # every worker is alive, so shared pages are split between them
+    after = memory_kib()
+    results.put({key: after[key] - before[key] for key in after})
+    barrier.wait()
+
+def run(mode, directory, matrices, workers):
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(workers)
+    results = context.Queue()
+    processes = [context.Process(target=worker, args=(mode, directory, matrices, barrier, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    measured = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return measured
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=16)
+    parser.add_argument('--years', type=int, default=20)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        config.MODEL_ARTIFACT_DIR = os.path.join(directory, 'models')
+        store = FeatureStore(os.path.join(directory, 'features'))
+        bars = synthetic_bars(args.symbols, args.years)
+        matrices = {}
+        for symbol, frame in bars.items():
+            matrix = store.get(('bench', symbol), frame)
+            matrices[symbol] = store.spill_paths(('bench', symbol))[1]
+            data = matrix.prepared()
+            scaler, model = fit_model(*training_matrix(data, list(MODEL_FEATURES)))
+            publish_model(symbol, 'v1', scaler, model, MODEL_FEATURES, {'last_bar': data['Date'].iloc[-1]})
+        size = sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(directory) for name in names)
+        print(f"{args.symbols} symbols x {args.years}y: {size / 2 ** 20:.1f} MiB of artifacts on disk\n")
+
+        print(f"{'mode':<9}{'workers':>8}{'private MiB/worker':>20}{'PSS MiB total':>15}")
+        for mode in ('private', 'mapped'):
+            for workers in args.workers:
+                measured = run(mode, directory, matrices, workers)
+                private = np.mean([m['private'] for m in measured]) / 1024
+                pss = sum(m['pss'] for m in measured) / 1024
+                print(f"{mode:<9}{workers:>8}{private:>20.1f}{pss:>15.1f}")
@@ -0,0 +1,75 @@
+"""Symbol search latency over a large synthetic listing.
+
+    python benchmarks/symbol_search_bench.py --symbols 30000
+
+Builds a SymbolIndex from seeded random tickers and company names (or
+--listing FILE, a NASDAQ Trader or CSV listing), then times ticker
+prefixes, name-word prefixes and mid-name substrings, and compares them
+with a linear scan of the same listing.
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from symbols import SymbolIndex, read_listing
+
+WORDS = ('global', 'micro', 'systems', 'energy', 'holdings', 'capital', 'bio', 'therapeutics',
+         'networks', 'financial', 'industries', 'pharma', 'semiconductor', 'realty', 'digital')
+
+def synthetic_listing(count, seed=0):
+    rng = random.Random(seed)
+    seen = set()
+    while len(seen) < count:
+        symbol = ''.join(rng.choices(string.ascii_uppercase, k=rng.randint(1, 5)))
+        if symbol in seen:
+            continue
+        seen.add(symbol)
+        name = ' '.join([symbol.capitalize() + rng.choice(('ex', 'on', 'ia', 'co'))]
+                        + rng.sample(WORDS, 2) + [rng.choice(('Inc.', 'Corp.', 'Ltd.'))])
+        yield symbol, name, rng.choice('QNAP')
+
+def latencies_us(search, queries):
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        search(query)
+        timings.append((time.perf_counter() - started) * 1e6)
+    timings.sort()
+    return timings[len(timings) // 2], timings[int(len(timings) * 0.99)]
+
+def linear_search(listings, query, limit=10):
+    upper, lower = query.upper(), query.lower()
+    return [s for s, name, _ in listings if s.startswith(upper) or lower in name.lower()][:limit]
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=30000)
+    parser.add_argument('--listing', help='listing file to index instead of synthetic symbols')
+    parser.add_argument('--queries', type=int, default=2000)
+    args = parser.parse_args()
+
+    listings = list(read_listing(args.listing) if args.listing else synthetic_listing(args.symbols))
+    started = time.perf_counter()
+    index = SymbolIndex(listings)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    rng = random.Random(1)
+    names = [name.lower() for _, name, _ in listings]
+    kinds = {
+        'ticker prefix': [s[:rng.randint(1, len(s))] for s, _, _ in rng.choices(listings, k=args.queries)],
+        'name word prefix': [rng.choice(name.split())[:4] for name in rng.choices(names, k=args.queries)],
+        'name substring': [name[i:i + 5] for name in rng.choices(names, k=args.queries)
+                           for i in [rng.randint(1, max(1, len(name) - 6))]],
+    }
+
+    print(f"{len(index)} symbols indexed in {build_ms:.0f} ms\n")
+    print(f"{'query':<20}{'p50 us':>10}{'p99 us':>10}{'scan p50 us':>14}")
+    for kind, queries in kinds.items():
+        p50, p99 = latencies_us(index.search, queries)
+        scan_p50, _ = latencies_us(lambda q: linear_search(listings, q), queries[:200])
+        print(f"{kind:<20}{p50:>10.1f}{p99:>10.1f}{scan_p50:>14.1f}")
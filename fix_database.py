@@ -45,7 +45,7 @@ def fix_database():
                     username VARCHAR(50) UNIQUE NOT NULL,
                     email VARCHAR(120) UNIQUE NOT NULL,
                     password_hash VARCHAR(512) NOT NULL,
-                    balance FLOAT DEFAULT 100000.0,
+                    balance DECIMAL(18,2) DEFAULT 100000.00,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             """)
@@ -54,7 +54,7 @@ def fix_database():
             cursor.execute("SHOW COLUMNS FROM users LIKE 'balance'")
             if not cursor.fetchone():
                 print("Adding balance column to users table...")
-                cursor.execute("ALTER TABLE users ADD COLUMN balance FLOAT DEFAULT 100000.0")
+                cursor.execute("ALTER TABLE users ADD COLUMN balance DECIMAL(18,2) DEFAULT 100000.00")
                 # Update existing users to have the default balance
                 cursor.execute("UPDATE users SET balance = 100000.0 WHERE balance IS NULL")
         
@@ -67,8 +67,8 @@ def fix_database():
                     id INT AUTO_INCREMENT PRIMARY KEY,
                     user_id INT NOT NULL,
                     symbol VARCHAR(10) NOT NULL,
-                    quantity FLOAT NOT NULL,
-                    avg_price FLOAT NOT NULL,
+                    quantity DECIMAL(18,4) NOT NULL,
+                    avg_price DECIMAL(18,4) NOT NULL,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
                     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
@@ -86,8 +86,8 @@ def fix_database():
                     user_id INT NOT NULL,
                     symbol VARCHAR(10) NOT NULL,
                     side VARCHAR(4) NOT NULL,
-                    qty FLOAT NOT NULL,
-                    price FLOAT NOT NULL,
+                    qty DECIMAL(18,4) NOT NULL,
+                    price DECIMAL(18,4) NOT NULL,
                     status VARCHAR(20) NOT NULL,
                     alpaca_order_id VARCHAR(50) NULL,
                     timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -107,9 +107,24 @@ def fix_database():
                 )
             """)
         
+        # Convert legacy FLOAT money columns to exact DECIMAL columns
+        money_columns = [
+            ('users', 'balance', 'DECIMAL(18,2) DEFAULT 100000.00'),
+            ('orders', 'qty', 'DECIMAL(18,4) NOT NULL'),
+            ('orders', 'price', 'DECIMAL(18,4) NOT NULL'),
+            ('portfolio', 'quantity', 'DECIMAL(18,4) NOT NULL'),
+            ('portfolio', 'avg_price', 'DECIMAL(18,4) NOT NULL'),
+        ]
+        for table, column, definition in money_columns:
+            cursor.execute(f"SHOW COLUMNS FROM {table} LIKE '{column}'")
+            row = cursor.fetchone()
+            if row and row[1].lower().startswith(('float', 'double')):
+                print(f"Converting {table}.{column} to {definition.split()[0]}...")
+                cursor.execute(f"ALTER TABLE {table} MODIFY COLUMN {column} {definition}")
+
         # Commit changes
         connection.commit()
-        
+
         print("✅ Database schema fixed successfully!")
         print(f"Database: {MYSQL_DATABASE}")
         
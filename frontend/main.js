@@ -105,8 +105,11 @@ async function fetchLiveData() {
     }
 }
 
+// Upper bound on points per chart; the server downsamples longer series
+const MAX_CHART_POINTS = 1000;
+
 async function fetchHistoricalData(tf = '1Y') {
-    const res = await fetch(`/historical_data/${selectedSymbol}?tf=${tf}`);
+    const res = await fetch(`/historical_data/${selectedSymbol}?tf=${tf}&max_points=${MAX_CHART_POINTS}`);
     return await res.json();
 }
 
@@ -58,8 +58,8 @@ def create_database():
                 user_id INT NOT NULL,
                 symbol VARCHAR(10) NOT NULL,
                 side VARCHAR(4) NOT NULL,
-                qty FLOAT NOT NULL,
-                price FLOAT NOT NULL,
+                qty DECIMAL(18,4) NOT NULL,
+                price DECIMAL(18,4) NOT NULL,
                 status VARCHAR(20) NOT NULL,
                 alpaca_order_id VARCHAR(50) NULL,
                 timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -8,6 +8,14 @@ from unittest.mock import patch, MagicMock
 # Add the backend directory to the Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
 
+# Keep the feature store and models in memory; spilling is tested against tmp_path
+os.environ.setdefault('FEATURE_STORE_DIR', '')
+os.environ.setdefault('MODEL_ARTIFACT_DIR', '')
+# Only config.STOCKS is listed unless a test builds its own symbol master
+os.environ.setdefault('SYMBOL_LISTING_FILES', '')
+# Replays stay in this process unless a test publishes one to tmp_path
+os.environ.setdefault('REPLAY_DIR', '')
+
 # Test configuration
 pytest_plugins = []
 
@@ -21,6 +29,26 @@ def test_config():
         'FINNHUB_API_KEY': 'test-api-key'
     }
 
+@pytest.fixture(scope="function")
+def db(request):
+    """In-memory SQLite session with user 1 in it.
+
+    The user's starting balance defaults to 100000; parametrize `db`
+    indirectly to use another one.
+    """
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from model import Base, User
+    
+    engine = create_engine('sqlite:///:memory:')
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add(User(id=1, username='u', email='u@example.com', password_hash='x',
+                     balance=getattr(request, 'param', 100000)))
+    session.commit()
+    yield session
+    session.close()
+
 @pytest.fixture(scope="session")
 def temp_data_dir():
     """Create a temporary directory for test data"""
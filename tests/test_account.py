@@ -0,0 +1,66 @@
+import pytest
+from datetime import date, datetime
+from unittest.mock import patch
+from sqlalchemy import event
+from model import Portfolio, Fill, DailyValuation
+import account
+
+pytestmark = pytest.mark.parametrize('db', [8500], indirect=True)
+
+@pytest.fixture(autouse=True)
+def positions(db):
+    db.add(Portfolio(user_id=1, symbol='NVDA', quantity=10, avg_price=100))
+    db.add(Portfolio(user_id=1, symbol='AMD', quantity=4, avg_price=125))
+    db.commit()
+    account._account_cache.clear()
+
+class TestAccountSummary:
+    """Test per-user account summaries"""
+    
+    def test_summary_values(self, db):
+        """Test cash, equity and exposure use live quotes with cost fallback"""
+        with patch.object(account, 'get_quotes', return_value={'NVDA': 110.0}):
+            summary = account.compute_account_summary(db, 1)
+        
+        assert summary['cash'] == 8500.0
+        assert summary['long_market_value'] == 1600.0  # AMD has no quote, valued at cost
+        assert summary['cost_basis'] == 1500.0
+        assert summary['unrealized_pl'] == 100.0
+        assert summary['equity'] == 10100.0
+        assert summary['exposure'] == round(1600 / 10100, 4)
+        assert summary['positions_count'] == 2
+        assert summary['last_equity'] is None
+    
+    def test_last_equity_reads_latest_valuation(self, db):
+        """Test last_equity is the newest nightly valuation, in the same single query"""
+        for day, equity in ((date(2024, 1, 4), 9900), (date(2024, 1, 5), 10050)):
+            db.add(DailyValuation(user_id=1, as_of=day, cash=8500, market_value=equity - 8500,
+                                  unrealized_pnl=0, equity=equity))
+        db.commit()
+        with patch.object(account, 'get_quotes', return_value={}):
+            summary = account.compute_account_summary(db, 1)
+        assert summary['last_equity'] == 10050.0
+        assert summary['positions_count'] == 2
+    
+    def test_single_query(self, db):
+        """Test the account path issues one SQL statement"""
+        statements = []
+        event.listen(db.get_bind(), 'before_cursor_execute', lambda *args: statements.append(args[2]))
+        with patch.object(account, 'get_quotes', return_value={}):
+            account.compute_account_summary(db, 1)
+        assert len(statements) == 1
+    
+    def test_unknown_user(self, db):
+        """Test a missing user returns None"""
+        assert account.compute_account_summary(db, 99) is None
+    
+    def test_cache_keyed_on_latest_fill(self, db):
+        """Test summaries are cached per user until the user has a new fill"""
+        with patch.object(account, 'compute_account_summary', return_value={'cash': 1.0}) as compute:
+            account.get_account_summary(db, 1)
+            account.get_account_summary(db, '1')
+            assert compute.call_count == 1
+            db.add(Fill(user_id=1, symbol='NVDA', side='buy', qty=1, price=110, filled_at=datetime(2024, 1, 5, 15)))
+            db.commit()
+            account.get_account_summary(db, 1)
+            assert compute.call_count == 2
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import patch
+import artifacts
+from artifacts import publish_model, load_model, is_available, ModelArtifact
+from model import fit_model
+from retraining import refresh_model, INCREMENTAL_TREES
+
+def make_model(seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.uniform(0, 100, (80, 3)), columns=['f0', 'f1', 'f2'])
+    scaler, model = fit_model(X, X['f0'] * 2, {'n_estimators': 10})
+    return X, scaler, model
+
+class TestModelArtifacts:
+    """Test publishing models and mapping them back read-only"""
+    
+    @pytest.fixture(autouse=True)
+    def artifact_dir(self, tmp_path):
+        with patch.object(artifacts.config, 'MODEL_ARTIFACT_DIR', str(tmp_path)):
+            yield tmp_path
+    
+    def test_round_trip_is_mapped_and_exact(self):
+        """Test a published model predicts identically from memory-mapped arrays"""
+        X, scaler, model = make_model()
+        state = {'last_bar': pd.Timestamp('2024-01-05'), 'incremental_updates': 0, 'mode': 'full', 'reason': 'initial'}
+        publish_model('aaa', 'v1', scaler, model, ['f0', 'f1', 'f2'], state)
+        
+        loaded_scaler, loaded, features, loaded_state = load_model('AAA')
+        assert isinstance(loaded, ModelArtifact)
+        assert isinstance(loaded.threshold, np.memmap) and not loaded.threshold.flags.writeable
+        assert features == ['f0', 'f1', 'f2']
+        assert loaded_state == state
+        scaled = scaler.transform(X)
+        assert np.array_equal(loaded.predict(loaded_scaler.transform(X)), model.predict(scaled))
+    
+    def test_latest_pointer_and_pruning(self, artifact_dir):
+        """Test LATEST follows the newest version and old versions are removed"""
+        _, scaler, model = make_model()
+        for version in ('v1', 'v2', 'v3'):
+            publish_model('AAA', version, scaler, model, ['f0'], {'last_bar': '2024-01-05'})
+        first = load_model('AAA')[1]
+        assert first.version == 'v3'
+        for version in ('v4', 'v5'):
+            publish_model('AAA', version, scaler, model, ['f0'], {'last_bar': '2024-01-05'})
+        assert sorted(p.name for p in (artifact_dir / 'AAA').iterdir() if p.is_dir()) == ['v4', 'v5']
+        assert load_model('BBB') is None
+        # A worker still holding the pruned v3 must not warm-start from it
+        assert not is_available(first)
+        assert is_available(load_model('AAA')[1]) and is_available(model)
+    
+    def test_mapped_model_warm_starts(self):
+        """Test incremental retraining can boost onto a mapped model's booster"""
+        data = pd.DataFrame({
+            'Date': pd.bdate_range('2023-01-02', periods=120),
+            'Close': np.linspace(100, 130, 120),
+            'f0': np.linspace(0, 1, 120),
+        })
+        scaler, model, state = refresh_model(data.iloc[:-1], ['f0'])
+        publish_model('AAA', 'v1', scaler, model, ['f0'], state)
+        scaler, mapped, _, state = load_model('AAA')
+        
+        _, updated, new_state = refresh_model(data, ['f0'], scaler, mapped, state)
+        assert new_state['mode'] == 'incremental'
+        assert updated.get_booster().num_boosted_rounds() == model.get_booster().num_boosted_rounds() + INCREMENTAL_TREES
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+from model import create_features, get_recommendation, recommendation_signals, SIGNAL_LABELS
+from backtest import hold_positions, simulate, backtest_signals
+
+def make_bars(n=300, seed=1):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range('2020-01-01', periods=n, name='Date')
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({
+        'Open': close, 'High': close * 1.01, 'Low': close * 0.99, 'Close': close, 'Volume': 1e6
+    }, index=index)
+
+class TestRecommendationSignals:
+    """Test the vectorized rules match get_recommendation"""
+    
+    def test_matches_scalar_rules_row_by_row(self):
+        """Test every row's vectorized signal equals get_recommendation on the data up to it"""
+        bars = make_bars().reset_index()
+        features = create_features(bars)
+        signal, _ = recommendation_signals(
+            features['RSI'], features['MACD'], features['MACD_Signal'], features['Stoch_K'], features['Stoch_D']
+        )
+        for end in range(200, 300, 7):
+            recommendation, _, _ = get_recommendation(bars.iloc[:end], [])
+            assert recommendation == SIGNAL_LABELS[int(signal[end - 1])]
+    
+    def test_rule_precedence(self):
+        """Test later rules override earlier ones"""
+        signal, confidence = recommendation_signals(
+            [75, 25, 50], [1, 1, -1], [0, 0, 0], [90, 50, 10], [90, 50, 10]
+        )
+        assert signal.tolist() == [-1, 1, 1]
+        assert confidence.tolist() == [1, 2, 1]
+
+class TestBacktest:
+    """Test position simulation and P&L"""
+    
+    def test_hold_positions(self):
+        """Test buy goes long, sell goes flat or short and hold carries forward"""
+        signal = np.array([[0], [1], [0], [-1], [0], [1]])
+        assert hold_positions(signal)[:, 0].tolist() == [0, 1, 1, 0, 0, 1]
+        assert hold_positions(signal, allow_short=True)[:, 0].tolist() == [0, 1, 1, -1, -1, 1]
+    
+    def test_next_bar_returns_and_costs(self):
+        """Test positions earn the following bar's return net of transaction costs"""
+        close = np.array([[100.0], [110.0], [121.0], [121.0]])
+        positions = np.array([[1.0], [1.0], [0.0], [0.0]])
+        strategy, returns, turnover = simulate(close, positions, cost_bps=10)
+        assert turnover[:, 0].tolist() == [1, 0, 1, 0]
+        assert np.allclose(strategy[:, 0], [-0.001, 0.1, 0.1 - 0.001, 0.0])
+    
+    def test_multi_symbol_backtest(self):
+        """Test several symbols with different histories are backtested together"""
+        bars = {'AAA': make_bars(400, seed=2), 'BBB': make_bars(250, seed=3)}
+        result = backtest_signals(bars, cost_bps=0)
+        assert set(result['symbols']) == {'AAA', 'BBB'}
+        assert len(result['equity']) == 400
+        stats = result['symbols']['AAA']
+        assert 0 < stats['exposure'] < 1
+        assert stats['trades'] > 0
+        assert np.isclose(result['equity']['AAA'].iloc[-1] - 1, stats['total_return'])
+        assert -1 <= result['portfolio']['max_drawdown'] <= 0
@@ -0,0 +1,265 @@
+import gzip
+import json
+import threading
+import pytest
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+import market_data
+import timeframes
+import wire
+from resample import MinuteBarStore, resample_frame
+from timeframes import resolve_timeframe
+from downsample import lttb_indices, minmax_indices, downsample_indices, MIN_POINTS
+
+class TestLTTB:
+    """Test largest-triangle-three-buckets downsampling"""
+    
+    def test_keeps_endpoints_and_size(self):
+        """Test output length and that first/last points survive"""
+        y = np.sin(np.linspace(0, 20, 10000))
+        keep = lttb_indices(y, 500)
+        assert len(keep) == 500
+        assert keep[0] == 0 and keep[-1] == 9999
+        assert np.all(np.diff(keep) > 0)
+    
+    def test_keeps_spike(self):
+        """Test a single outlier is preserved"""
+        y = np.zeros(1000)
+        y[637] = 50.0
+        assert 637 in lttb_indices(y, 50)
+    
+    def test_short_series_untouched(self):
+        """Test series already under the threshold are returned whole"""
+        assert lttb_indices([1, 2, 3], 10).tolist() == [0, 1, 2]
+
+class TestMinMax:
+    """Test min/max-preserving downsampling"""
+    
+    def test_preserves_extremes(self):
+        """Test global minimum and maximum are always kept"""
+        rng = np.random.default_rng(0)
+        y = rng.normal(size=5000).cumsum()
+        keep = minmax_indices(y, 200)
+        assert len(keep) <= 200
+        assert np.argmin(y) in keep and np.argmax(y) in keep
+        assert np.all(np.diff(keep) > 0)
+
+class TestDownsampleIndices:
+    """Test the index selection /historical_data applies to every chart series"""
+    
+    def test_method_dispatch(self):
+        """Test lttb is the default and minmax is selectable"""
+        y = np.random.default_rng(0).normal(size=3000).cumsum()
+        assert downsample_indices(y, 300).tolist() == lttb_indices(y, 300).tolist()
+        assert downsample_indices(y, 300, 'minmax').tolist() == minmax_indices(y, 300).tolist()
+    
+    def test_no_reduction_needed(self):
+        """Test None is returned without max_points or for short series"""
+        assert downsample_indices([1.0, 2.0], None) is None
+        assert downsample_indices([1.0, 2.0], 10) is None
+    
+    def test_rejects_tiny_budgets(self):
+        """Test budgets the methods cannot honour are errors, not a silent full series"""
+        y = np.random.default_rng(0).normal(size=10000).cumsum()
+        for max_points in (-5, 0, 1, 3):
+            with pytest.raises(ValueError):
+                downsample_indices(y, max_points, 'minmax')
+        assert len(downsample_indices(y, MIN_POINTS, 'minmax')) <= MIN_POINTS
+        assert len(downsample_indices(y, MIN_POINTS)) == MIN_POINTS
+
+class TestColumnarWireFormat:
+    """Test the compact columnar chart encoding"""
+    
+    def test_round_trip(self):
+        """Test timestamps and float32 columns decode exactly"""
+        epochs = np.array([1700000000, 1700000060, 1700000120, 1700086400], dtype=np.int64)
+        prices = np.array([1.5, 2.25, np.nan, 4.0])
+        payload = wire.encode_columns(epochs, {'prices': prices}, date_format='%Y-%m-%d')
+        
+        decoded_epochs, columns = wire.decode_columns(payload)
+        assert decoded_epochs.tolist() == epochs.tolist()
+        assert payload['time']['delta_dtype'] == 'i4'
+        assert payload['date_format'] == '%Y-%m-%d'
+        np.testing.assert_array_equal(columns['prices'], prices.astype(np.float32))
+    
+    def test_msgpack_and_json_sizes(self):
+        """Test the columnar payloads are much smaller than row JSON"""
+        n = 5000
+        epochs = 1700000000 + 60 * np.arange(n)
+        columns = {'prices': np.random.default_rng(0).uniform(100, 200, n)}
+        legacy = json.dumps({'dates': [str(e) for e in epochs], 'prices': columns['prices'].tolist()})
+        body, mimetype = wire.serialize(epochs, columns, 'columnar')
+        assert mimetype == wire.COLUMNAR_JSON
+        assert len(body) < len(legacy) / 2
+        if wire.msgpack is not None:
+            body, mimetype = wire.serialize(epochs, columns, 'msgpack')
+            assert mimetype == wire.MSGPACK
+            _, decoded = wire.decode_columns(wire.msgpack.unpackb(body))
+            assert len(decoded['prices']) == n
+    
+    def test_negotiate(self):
+        """Test Accept header negotiation falls back to JSON"""
+        assert wire.negotiate(None) == 'json'
+        assert wire.negotiate('application/json') == 'json'
+        assert wire.negotiate(wire.COLUMNAR_JSON) == 'columnar'
+    
+    def test_compress(self):
+        """Test gzip is used when accepted and small bodies are left alone"""
+        body = b'{"x": 1}' * 1000
+        compressed, encoding = wire.compress(body, 'gzip, deflate')
+        assert encoding == 'gzip'
+        assert gzip.decompress(compressed) == body
+        assert wire.compress(b'{}', 'gzip') == (b'{}', None)
+        assert wire.compress(body, '') == (body, None)
+
+def make_bars(n, freq, start='2024-01-02 09:30', tz='America/New_York'):
+    rng = np.random.default_rng(1)
+    index = pd.date_range(start, periods=n, freq=freq, tz=tz)
+    close = 100 + rng.normal(size=n).cumsum()
+    return pd.DataFrame({
+        'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close, 'Volume': rng.uniform(1, 10, n)
+    }, index=index)
+
+class TestTimeframeCatalog:
+    """Test the shared timeframe catalog used by /historical_data"""
+    
+    def setup_method(self):
+        timeframes._chart_frames.clear()
+    
+    def test_resolve_timeframe(self):
+        """Test unknown timeframes fall back to 1Y"""
+        assert resolve_timeframe('1d') == '1D'
+        assert resolve_timeframe('bogus') == '1Y'
+        assert resolve_timeframe(None) == '1Y'
+    
+    def test_daily_timeframes_share_one_series(self):
+        """Test 3M/YTD/1Y/ALL all slice the single stored daily series"""
+        bars = make_bars(800, 'B', start='2021-01-04', tz=None)
+        with patch.object(timeframes, 'get_bars', return_value=bars) as get_bars:
+            frames = {tf: timeframes.get_chart_frame('NVDA', tf) for tf in ('3M', 'YTD', '1Y', 'ALL')}
+        assert {call.args[1] for call in get_bars.call_args_list} == {'1d'}
+        assert len(frames['ALL']) == 800
+        assert len(frames['3M']) < len(frames['1Y']) < len(frames['ALL'])
+        assert frames['YTD'].index[0].year == bars.index[-1].year
+        # Indicators come from the full series, so there is no warm-up gap
+        assert (frames['1Y']['rsi'] != 0).all()
+    
+    def test_month_resampled_from_five_minute_bars(self):
+        """Test 1M is derived from stored 5m bars as 30m OHLCV"""
+        bars = make_bars(12, '5min')
+        with patch.object(timeframes, 'get_bars', return_value=bars):
+            frame = timeframes.get_chart_frame('NVDA', '1M')
+        assert len(frame) == 2
+        first = bars.iloc[:6]
+        assert frame['Open'].iloc[0] == first['Open'].iloc[0]
+        assert frame['High'].iloc[0] == first['High'].max()
+        assert frame['Low'].iloc[0] == first['Low'].min()
+        assert frame['Close'].iloc[0] == first['Close'].iloc[-1]
+        assert np.isclose(frame['Volume'].iloc[0], first['Volume'].sum())
+    
+    def test_peek_never_downloads(self):
+        """Test peek_chart_frame only returns frames that are already cached"""
+        bars = make_bars(300, 'B', start='2022-01-03', tz=None)
+        with patch.object(timeframes, 'get_bars', return_value=bars) as get_bars:
+            assert timeframes.peek_chart_frame('NVDA', '1Y') is None
+            frame = timeframes.get_chart_frame('NVDA', '1Y')
+            assert timeframes.peek_chart_frame('NVDA', '1y') is frame
+        assert get_bars.call_count == 1
+
+class TestResampleEngine:
+    """Test the vectorized OHLCV resampling engine"""
+    
+    def test_matches_pandas_resample(self):
+        """Test first/max/min/last/sum semantics against pandas"""
+        bars = make_bars(390, '1min')
+        for interval, rule in (('5m', '5min'), ('15m', '15min'), ('30m', '30min')):
+            expected = bars.resample(rule).agg({
+                'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'
+            }).dropna()
+            result = resample_frame(bars, interval)
+            assert (result.index == expected.index).all()
+            np.testing.assert_allclose(result.to_numpy(), expected.to_numpy())
+    
+    def test_daily_buckets_follow_exchange_day(self):
+        """Test daily bars split at local midnight, not UTC midnight"""
+        bars = pd.concat([make_bars(390, '1min', start='2024-01-02 09:30'),
+                          make_bars(390, '1min', start='2024-01-03 09:30')])
+        daily = resample_frame(bars, '1d')
+        assert len(daily) == 2
+        assert [d.strftime('%Y-%m-%d %H:%M') for d in daily.index] == ['2024-01-02 00:00', '2024-01-03 00:00']
+        assert np.isclose(daily['Volume'].iloc[0], bars['Volume'].iloc[:390].sum())
+    
+    def test_incremental_matches_batch(self):
+        """Test feeding minute bars one at a time yields the same bars as one batch"""
+        bars = make_bars(200, '1min')
+        store = MinuteBarStore()
+        store.extend(bars.iloc[:7])
+        for i in range(7, len(bars)):
+            store.extend(bars.iloc[:i + 1])  # overlapping refetches only add new minutes
+        for interval in ('5m', '15m', '1h'):
+            np.testing.assert_allclose(
+                store.frame(interval).to_numpy(), resample_frame(bars, interval).to_numpy()
+            )
+        assert len(store.frame('1m')) == 200
+
+class TestMinuteStoreRegistry:
+    """Test minute stores refresh independently of each other"""
+    
+    def test_slow_download_does_not_block_other_symbols(self):
+        """Test one symbol's backfill holds only that symbol's store"""
+        started, release = threading.Event(), threading.Event()
+        
+        class Ticker:
+            def __init__(self, symbol):
+                self.symbol = symbol
+            
+            def history(self, period=None, interval=None):
+                if self.symbol == 'SLOW':
+                    started.set()
+                    release.wait(10)
+                return make_bars(30, '1min', start='2024-01-02 09:30')
+        
+        with patch.object(market_data.yf, 'Ticker', Ticker):
+            slow = threading.Thread(target=market_data.get_minute_store, args=('SLOW',))
+            slow.start()
+            try:
+                assert started.wait(5)
+                fast = {}
+                worker = threading.Thread(target=lambda: fast.update(store=market_data.get_minute_store('FAST')))
+                worker.start()
+                worker.join(2)
+                assert not worker.is_alive()
+                assert len(fast['store'].frame('1m')) == 30
+            finally:
+                release.set()
+                slow.join(5)
+        for symbol in ('SLOW', 'FAST'):
+            market_data._minute_stores.pop(symbol, None)
+            market_data._minute_refreshed.invalidate(symbol)
+    
+    def test_refresh_fills_gap_since_last_minute(self):
+        """Test a top-up starts at the last stored minute, not at today's session"""
+        earlier = pd.Timestamp.now(tz='UTC').floor('min') - pd.Timedelta(hours=20)
+        bars = make_bars(120, '1min', start=earlier, tz=None)
+        requests = []
+        
+        class Ticker:
+            def __init__(self, symbol):
+                pass
+            
+            def history(self, period=None, interval=None, start=None):
+                requests.append({'period': period, 'start': start})
+                return bars.iloc[:60] if start is None else bars[bars.index >= start]
+        
+        try:
+            with patch.object(market_data.yf, 'Ticker', Ticker):
+                market_data.get_minute_store('GAP')
+                market_data._minute_refreshed.invalidate('GAP')
+                store = market_data.get_minute_store('GAP')
+            assert requests[0] == {'period': market_data.MINUTE_BACKFILL_PERIOD, 'start': None}
+            assert requests[1]['start'] == bars.index[59]
+            assert len(store.frame('1m')) == 120
+        finally:
+            market_data._minute_stores.pop('GAP', None)
+            market_data._minute_refreshed.invalidate('GAP')
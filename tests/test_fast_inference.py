@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from unittest.mock import patch
+from xgboost import XGBRegressor
+import fast_inference
+from fast_inference import TreeEnsemble, compile_model, predictor
+
+def make_xy(n=400, seed=3):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 6))
+    y = 2 * X[:, 0] + np.sin(X[:, 1]) + rng.normal(scale=0.1, size=n)
+    return X, y
+
+class TestTreeEnsemble:
+    """Test the NumPy tree walker reproduces XGBoost predictions"""
+    
+    def setup_method(self, method):
+        self.X, self.y = make_xy()
+        self.model = XGBRegressor(n_estimators=50, max_depth=4, learning_rate=0.1).fit(self.X, self.y)
+    
+    def test_matches_xgboost_exactly(self):
+        """Test predictions are bit-identical for batches and single rows"""
+        ensemble = TreeEnsemble(self.model.get_booster())
+        X_test, _ = make_xy(100, seed=9)
+        assert np.array_equal(ensemble.predict(X_test), self.model.predict(X_test))
+        assert np.array_equal(ensemble.predict(X_test[0]), self.model.predict(X_test[:1]))
+    
+    def test_missing_values_follow_default_branch(self):
+        """Test NaN features take each split's default direction"""
+        ensemble = TreeEnsemble(self.model.get_booster())
+        X_test, _ = make_xy(100, seed=11)
+        X_test[::3, 0] = np.nan
+        X_test[1::4, 1] = np.nan
+        assert np.array_equal(ensemble.predict(X_test), self.model.predict(X_test))
+    
+    def test_zero_base_score(self):
+        """Test models trained with an explicit base_score, like the pooled model"""
+        model = XGBRegressor(n_estimators=30, max_depth=3, base_score=0.0).fit(self.X, self.y)
+        ensemble = TreeEnsemble(model.get_booster())
+        assert ensemble.base_score == 0.0
+        assert np.array_equal(ensemble.predict(self.X), model.predict(self.X))
+    
+    def test_backend_switch(self):
+        """Test INFERENCE_BACKEND selects the walker and compiles once per model"""
+        with patch.object(fast_inference.config, 'INFERENCE_BACKEND', 'xgboost'):
+            assert predictor(self.model) == self.model.predict
+        with patch.object(fast_inference.config, 'INFERENCE_BACKEND', 'numpy'):
+            assert predictor(self.model) == compile_model(self.model).predict
+        assert compile_model(self.model) is compile_model(self.model)
@@ -0,0 +1,106 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import patch
+import feature_store
+import timeframes
+from feature_store import FeatureStore, FeatureMatrix, COLUMNS, daily_features
+from model import MODEL_FEATURES, prepare_data
+
+def make_bars(n, seed=2):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range('2021-01-04', periods=n, name='Date')
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame({
+        'Open': close, 'High': close * 1.01, 'Low': close * 0.99, 'Close': close,
+        'Volume': rng.integers(1000, 5000, n).astype(float)
+    }, index=index)
+
+class TestFeatureStore:
+    """Test per-symbol feature matrices, rebuilt once per new bar"""
+    
+    def test_matrix_matches_prepare_data(self):
+        """Test complete rows equal the features prepare_data computes"""
+        bars = make_bars(300)
+        prepared = FeatureMatrix.build(bars).prepared()
+        expected = prepare_data(bars)
+        assert list(prepared.columns) == ['Date', *COLUMNS]
+        np.testing.assert_allclose(prepared[list(MODEL_FEATURES)].to_numpy(), expected[list(MODEL_FEATURES)].to_numpy())
+    
+    def test_rebuilds_only_on_new_bar(self):
+        """Test repeated reads share one matrix until another bar arrives"""
+        store = FeatureStore()
+        bars = make_bars(300)
+        first = store.get(('test', 'AAA'), bars.iloc[:-1])
+        assert store.get(('test', 'AAA'), bars.iloc[:-1]) is first
+        assert store.get(('test', 'AAA'), bars) is not first
+        assert store.stats == {'hits': 1, 'spill_loads': 0, 'builds': 2}
+    
+    def test_rebuilds_when_todays_bar_moves(self):
+        """Test an intraday update to the last bar is not served from the stale matrix"""
+        store = FeatureStore()
+        bars = make_bars(300)
+        first = store.get(('test', 'AAA'), bars)
+        moved = bars.copy()
+        moved.iloc[-1, moved.columns.get_loc('Close')] += 25
+        second = store.get(('test', 'AAA'), moved)
+        assert second is not first
+        assert second.column('Close')[-1] == moved['Close'].iloc[-1]
+    
+    def test_spilled_matrix_is_memory_mapped(self, tmp_path):
+        """Test a new store pages a spilled matrix back in instead of rebuilding it"""
+        bars = make_bars(300)
+        built = FeatureStore(str(tmp_path)).get(('test', 'AAA'), bars)
+        
+        store = FeatureStore(str(tmp_path))
+        loaded = store.get(('test', 'AAA'), bars)
+        assert store.stats['spill_loads'] == 1 and store.stats['builds'] == 0
+        assert isinstance(loaded.values, np.memmap)
+        assert not loaded.values.flags.writeable
+        np.testing.assert_array_equal(loaded.values, built.values)
+    
+    def test_spills_are_versioned(self, tmp_path):
+        """Test respills publish a new dates/values pair and torn pairs are misses"""
+        bars = make_bars(300)
+        store = FeatureStore(str(tmp_path))
+        store.get(('test', 'AAA'), bars.iloc[:-1])
+        first = store.spill_paths(('test', 'AAA'))
+        store.get(('test', 'AAA'), bars)
+        second = store.spill_paths(('test', 'AAA'))
+        assert first[0] != second[0] and os.path.exists(second[1])
+        
+        np.save(second[1], np.zeros((5, len(COLUMNS))))
+        reader = FeatureStore(str(tmp_path))
+        reader.get(('test', 'AAA'), bars)
+        assert reader.stats['spill_loads'] == 0 and reader.stats['builds'] == 1
+    
+    def test_resident_limit_evicts_least_recent(self):
+        """Test only `resident` matrices stay in memory"""
+        store = FeatureStore(resident=2)
+        bars = make_bars(120)
+        for symbol in ('AAA', 'BBB', 'CCC'):
+            store.get(('test', symbol), bars)
+        store.get(('test', 'AAA'), bars)
+        assert store.stats['builds'] == 4
+    
+    def test_replay_is_never_spilled(self, tmp_path):
+        """Test matrices built from replayed bars stay out of the spill directory"""
+        bars = make_bars(120)
+        with patch.object(feature_store, '_store', FeatureStore(str(tmp_path))) as store, \
+             patch.object(feature_store, 'active_replay', return_value=object()):
+            daily_features('AAA', bars)
+        assert store.stats['builds'] == 1 and not any(tmp_path.iterdir())
+    
+    def test_chart_indicators_read_the_store(self):
+        """Test daily chart RSI/MACD are the store's model features"""
+        bars = make_bars(300)
+        timeframes._chart_frames.clear()
+        with patch.object(feature_store, '_store', FeatureStore()) as store, \
+             patch.object(timeframes, 'get_bars', return_value=bars):
+            frame = timeframes.get_chart_frame('ZZZ', 'ALL')
+            matrix = daily_features('ZZZ', bars)
+        timeframes._chart_frames.clear()
+        assert store.stats['builds'] == 1 and store.stats['hits'] == 1
+        np.testing.assert_array_equal(frame['rsi'].to_numpy(), np.nan_to_num(matrix.column('RSI')))
+        np.testing.assert_array_equal(frame['macd'].to_numpy(), np.nan_to_num(matrix.column('MACD')))
@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+from model import Order, Fill, PositionSnapshot
+import ledger
+
+def place(db, side, symbol, qty, price, filled_at):
+    order = Order(user_id=1, symbol=symbol, side=side, qty=qty, price=price, status='filled')
+    db.add(order)
+    db.flush()
+    ledger.record_fill(db, order, filled_at=filled_at)
+    db.commit()
+    return order
+
+class TestApplyFill:
+    """Test replaying fills into a holdings state"""
+    
+    def test_buy_then_sell(self):
+        """Test average price and cash flow follow create_order semantics"""
+        state = ledger.empty_state()
+        ledger.apply_fill(state, 'buy', 'NVDA', 10, 100)
+        ledger.apply_fill(state, 'buy', 'NVDA', 10, 110)
+        ledger.apply_fill(state, 'sell', 'NVDA', 5, 120)
+        
+        assert state['positions']['NVDA']['qty'] == Decimal('15')
+        assert state['positions']['NVDA']['avg_price'] == Decimal('105.0000')
+        assert state['cash_flow'] == Decimal('-1500.00')
+    
+    def test_closed_position_removed(self):
+        """Test selling the whole position drops it"""
+        state = ledger.empty_state()
+        ledger.apply_fill(state, 'buy', 'AMD', 2, 50)
+        ledger.apply_fill(state, 'sell', 'AMD', 2, 55)
+        assert state['positions'] == {}
+    
+    def test_state_serialization_round_trip(self):
+        """Test snapshot state survives JSON encoding exactly"""
+        state = ledger.apply_fill(ledger.empty_state(), 'buy', 'AAPL', 3, 101.123456)
+        assert ledger.load_state(ledger.dump_state(state)) == state
+
+class TestHoldingsAt:
+    """Test point-in-time reconstruction from the ledger"""
+    
+    def test_holdings_at_past_time(self, db):
+        """Test holdings reflect only fills up to the requested time"""
+        t0 = datetime(2024, 1, 1)
+        place(db, 'buy', 'NVDA', 10, 100, t0)
+        place(db, 'buy', 'AMD', 5, 50, t0 + timedelta(days=1))
+        place(db, 'sell', 'NVDA', 4, 120, t0 + timedelta(days=2))
+        
+        state = ledger.holdings_at(db, 1, t0 + timedelta(hours=12))
+        assert set(state['positions']) == {'NVDA'}
+        
+        state = ledger.holdings_at(db, 1)
+        assert state['positions']['NVDA']['qty'] == Decimal('6')
+        assert state['positions']['AMD']['qty'] == Decimal('5')
+    
+    def test_snapshots_bound_replay(self, db):
+        """Test snapshots are written every SNAPSHOT_INTERVAL fills and used for replay"""
+        t0 = datetime(2024, 1, 1)
+        with patch.object(ledger, 'SNAPSHOT_INTERVAL', 3):
+            for i in range(7):
+                place(db, 'buy', 'NVDA', 1, 100 + i, t0 + timedelta(minutes=i))
+        
+        snapshots = db.query(PositionSnapshot).order_by(PositionSnapshot.id).all()
+        assert [s.last_fill_id for s in snapshots] == [3, 6]
+        
+        full = ledger.empty_state()
+        for fill in db.query(Fill).order_by(Fill.id):
+            ledger.apply_fill(full, fill.side, fill.symbol, fill.qty, fill.price)
+        assert ledger.holdings_at(db, 1) == full
+        
+        state = ledger.holdings_at(db, 1, t0 + timedelta(minutes=4))
+        assert state['positions']['NVDA']['qty'] == Decimal('5')
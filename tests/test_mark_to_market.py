@@ -0,0 +1,56 @@
+import pytest
+import pandas as pd
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+from model import User, Portfolio, Fill, DailyValuation
+import mark_to_market
+
+class TestMarkToMarket:
+    """Test the nightly batch valuation job"""
+    
+    def test_run_mark_to_market(self, db):
+        """Test one valuation row per user with positions marked at the close"""
+        db.add(User(id=2, username='v', email='v@example.com', password_hash='x', balance=5000))
+        db.add(Portfolio(user_id=1, symbol='NVDA', quantity=10, avg_price=100))
+        db.add(Portfolio(user_id=1, symbol='AMD', quantity=3, avg_price=50))
+        db.add(Portfolio(user_id=2, symbol='NVDA', quantity=1, avg_price=120))
+        db.commit()
+        
+        today = date.today()
+        closes = pd.DataFrame({'NVDA': [108.5, 110.25]}, index=pd.to_datetime([today - timedelta(days=1), today]))
+        with patch.object(mark_to_market, 'get_daily_closes', return_value=closes):
+            assert mark_to_market.run_mark_to_market(db) == 2
+            # Re-running the same day replaces rather than duplicates
+            assert mark_to_market.run_mark_to_market(db, today) == 2
+        
+        rows = {v.user_id: v for v in db.query(DailyValuation).all()}
+        assert len(rows) == 2
+        assert rows[1].market_value == Decimal('1252.50')  # AMD has no close, carried at cost
+        assert rows[1].unrealized_pnl == Decimal('102.50')
+        assert rows[1].equity == Decimal('101252.50')
+        assert rows[2].unrealized_pnl == Decimal('-9.75')
+        assert rows[2].equity == Decimal('5110.25')
+    
+    def test_past_day_is_valued_from_the_ledger(self, db):
+        """Test a backfill values the holdings and cash the account had on that day"""
+        db.add(Fill(user_id=1, symbol='NVDA', side='buy', qty=10, price=100, filled_at=datetime(2024, 1, 3, 15)))
+        db.add(Fill(user_id=1, symbol='NVDA', side='buy', qty=5, price=105, filled_at=datetime(2024, 1, 8, 15)))
+        # Today's tables reflect both fills; the 5 Jan valuation must not
+        db.add(Portfolio(user_id=1, symbol='NVDA', quantity=15, avg_price=101.67))
+        db.commit()
+        
+        closes = pd.DataFrame({'NVDA': [108.5, 110.25]}, index=pd.to_datetime(['2024-01-04', '2024-01-05']))
+        with patch.object(mark_to_market, 'get_daily_closes', return_value=closes):
+            assert mark_to_market.run_mark_to_market(db, date(2024, 1, 5)) == 1
+        
+        row = db.query(DailyValuation).one()
+        assert row.cash == Decimal('100525.00')
+        assert row.market_value == Decimal('1102.50')
+        assert row.unrealized_pnl == Decimal('102.50')
+        assert row.equity == Decimal('101627.50')
+    
+    def test_future_day_is_refused(self, db):
+        """Test closes that do not exist yet are never stored"""
+        with pytest.raises(ValueError):
+            mark_to_market.run_mark_to_market(db, date.today() + timedelta(days=1))
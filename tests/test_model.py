@@ -7,6 +7,10 @@ from backend.model import (
     load_and_train, 
     get_prediction, 
     get_recommendation,
+    latest_feature_row,
+    scaled_feature_row,
+    predict_latest,
+    fit_model,
     User, Order, Profile
 )
 
@@ -156,6 +160,47 @@ class TestPrediction:
         result = get_prediction(empty_data, mock_scaler, mock_model, mock_features)
         assert result is None
 
+class TestBatchPrediction:
+    """Test batched multi-symbol inference"""
+    
+    def test_batch_matches_single_predictions(self):
+        """Test stacking symbols into one matrix gives the same prices as one-by-one"""
+        rng = np.random.default_rng(0)
+        features = ['f0', 'f1', 'f2']
+        X = pd.DataFrame(rng.uniform(0, 100, (60, 3)), columns=features)
+        y = X['f0'] * 2 + rng.normal(0, 1, 60)
+        scaler, model = fit_model(X, y, {'n_estimators': 10})
+        data = {s: X.sample(5, random_state=i) for i, s in enumerate(['AAA', 'BBB', 'CCC'])}
+        
+        batch = {s: (model, scaler, latest_feature_row(frame, features)) for s, frame in data.items()}
+        with patch.object(model, 'predict', wraps=model.predict) as predict:
+            prices = predict_latest(batch)
+        assert predict.call_count == 1
+        for symbol, frame in data.items():
+            single = model.predict(scaler.transform(frame[features].iloc[[-1]]))[0]
+            assert prices[symbol] == round(float(single), 2)
+    
+    def test_latest_feature_row_skips_incomplete_rows(self):
+        """Test the newest row with every feature present is used"""
+        frame = pd.DataFrame({'a': [1.0, 2.0, np.nan], 'b': [1.0, 2.0, 3.0]})
+        assert latest_feature_row(frame, ['a', 'b']).tolist() == [2.0, 2.0]
+        assert latest_feature_row(frame.iloc[2:], ['a', 'b']) is None
+    
+    def test_prescaled_rows_predict_without_frames(self):
+        """Test rows scaled at training time give the same prices with no DataFrame built"""
+        rng = np.random.default_rng(1)
+        features = ['f0', 'f1', 'f2']
+        X = pd.DataFrame(rng.uniform(0, 100, (60, 3)), columns=features)
+        scaler, model = fit_model(X, X['f0'] * 2, {'n_estimators': 10})
+        row = scaled_feature_row(X, features, scaler)
+        assert row.dtype == np.float32
+        
+        expected = predict_latest({'AAA': (model, scaler, latest_feature_row(X, features))})
+        init = pd.DataFrame.__init__
+        with patch.object(pd.DataFrame, '__init__', autospec=True, side_effect=init) as frames:
+            assert predict_latest({'AAA': (model, None, row)}) == expected
+        assert frames.call_count == 0
+
 class TestRecommendation:
     """Test recommendation functionality"""
     
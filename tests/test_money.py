@@ -0,0 +1,77 @@
+import pytest
+import numpy as np
+from decimal import Decimal
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from backend.money import (
+    cash, price, quantity, to_units, from_units,
+    position_value_cents, unrealized_pnl_cents, PRICE_SCALE, QTY_SCALE
+)
+from backend.model import Base, User, Portfolio
+
+class TestDecimalConversion:
+    """Test conversion of raw amounts to fixed-point decimals"""
+    
+    def test_float_rounding(self):
+        """Test floats are rounded half-up without binary noise"""
+        assert cash(0.1 + 0.2) == Decimal('0.30')
+        assert cash(2.675) == Decimal('2.68')
+        assert price(150.123456) == Decimal('150.1235')
+    
+    def test_none_passthrough(self):
+        """Test None stays None"""
+        assert quantity(None) is None
+    
+    def test_repeated_average_price_is_stable(self):
+        """Test averaging the same fill many times does not drift"""
+        qty = quantity(0)
+        avg = price(0)
+        for _ in range(1000):
+            total_cost = qty * avg + 1 * price(123.45)
+            qty += 1
+            avg = price(total_cost / qty)
+        assert avg == Decimal('123.4500')
+
+class TestInt64Arrays:
+    """Test vectorized int64 money math"""
+    
+    def test_units_round_trip(self):
+        """Test conversion to and from int64 units"""
+        units = to_units([1.5, 2.25, 0.0001], PRICE_SCALE)
+        assert units.dtype == np.int64
+        assert units.tolist() == [15000, 22500, 1]
+        assert from_units(units, PRICE_SCALE).tolist() == [1.5, 2.25, 0.0001]
+    
+    def test_position_value_cents(self):
+        """Test market value is exact in cents"""
+        qty = to_units([10, 3], QTY_SCALE)
+        px = to_units([150.5, 0.3333], PRICE_SCALE)
+        assert position_value_cents(qty, px).tolist() == [150500, 100]
+    
+    def test_unrealized_pnl_cents(self):
+        """Test P&L handles gains and losses symmetrically"""
+        qty = to_units([10, 10], QTY_SCALE)
+        avg = to_units([100, 100], PRICE_SCALE)
+        px = to_units([100.105, 99.895], PRICE_SCALE)
+        assert unrealized_pnl_cents(qty, avg, px).tolist() == [105, -105]
+
+class TestMoneyColumns:
+    """Test ORM columns round-trip exact decimals"""
+    
+    def test_round_trip(self):
+        """Test balances and positions come back as Decimal"""
+        engine = create_engine('sqlite:///:memory:')
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        user = User(username='u', email='u@example.com', password_hash='x', balance=0.1 + 0.2)
+        db.add(user)
+        db.commit()
+        db.add(Portfolio(user_id=user.id, symbol='NVDA', quantity=3, avg_price=101.123456))
+        db.commit()
+        db.expire_all()
+        
+        user = db.query(User).first()
+        position = db.query(Portfolio).first()
+        assert user.balance == Decimal('0.30')
+        assert position.quantity == Decimal('3.0000')
+        assert position.avg_price == Decimal('101.1235')
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+from model import prepare_data, latest_feature_row, predict_latest, MODEL_FEATURES
+from pooled_model import PooledModel, PRICE_FEATURES
+
+def make_bars(n=160, scale=1.0, seed=0, volume=1.0):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range('2022-01-03', periods=n, name='Date')
+    close = scale * 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame({
+        'Open': close, 'High': close * 1.01, 'Low': close * 0.99, 'Close': close,
+        'Volume': volume * rng.integers(1000, 5000, n).astype(float)
+    }, index=index)
+
+class TestPooledModel:
+    """Test the cross-sectional model shared by all symbols"""
+    
+    def setup_method(self, method):
+        self.data = {
+            'CHEAP': prepare_data(make_bars(scale=0.2, seed=1)),
+            'PRICEY': prepare_data(make_bars(scale=10.0, seed=2, volume=1000.0)),
+        }
+        self.model = PooledModel(list(self.data), {'n_estimators': 20})
+    
+    def test_design_matrix_is_scale_free(self):
+        """Test price and volume features are relative to the symbol and symbols are one-hot"""
+        self.model.fit(self.data)
+        rows = np.vstack([latest_feature_row(d, self.model.input_features) for d in self.data.values()])
+        X = self.model.design_matrix(list(self.data), rows)
+        assert X.shape == (2, len(MODEL_FEATURES) + 2)
+        ma5 = MODEL_FEATURES.index('MA5')
+        assert np.abs(X[:, ma5]).max() < 0.2
+        assert X[:, -2:].tolist() == [[1, 0], [0, 1]]
+        volume = MODEL_FEATURES.index('Volume_MA5')
+        assert 0.2 < X[:, volume].min() and X[:, volume].max() < 5
+        rsi = MODEL_FEATURES.index('RSI')
+        assert np.array_equal(X[:, rsi], rows[:, rsi])
+    
+    def test_fit_and_batch_predict(self):
+        """Test one model fits every symbol and predicts prices on each symbol's scale"""
+        self.model.fit(self.data)
+        batch = {
+            symbol: (self.model, None, latest_feature_row(data, self.model.input_features))
+            for symbol, data in self.data.items()
+        }
+        prices = predict_latest(batch)
+        for symbol, data in self.data.items():
+            last_close = data['Close'].iloc[-1]
+            assert abs(prices[symbol] / last_close - 1) < 0.1
+    
+    def test_price_features_exist(self):
+        """Test every normalized feature is a model input"""
+        assert set(PRICE_FEATURES) <= set(MODEL_FEATURES)
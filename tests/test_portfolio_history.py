@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from unittest.mock import patch
+from model import User, Order
+import ledger
+import portfolio_history
+
+def place(db, side, symbol, qty, price, filled_at):
+    user = db.query(User).first()
+    value = qty * price
+    user.balance += -value if side == 'buy' else value
+    order = Order(user_id=1, symbol=symbol, side=side, qty=qty, price=price, status='filled')
+    db.add(order)
+    db.flush()
+    ledger.record_fill(db, order, filled_at=filled_at)
+    db.commit()
+
+class TestEquityCurve:
+    """Test the vectorized equity curve kernel"""
+    
+    def test_fills_apply_from_their_day(self):
+        """Test positions and cash change on the fill day and persist"""
+        closes = np.array([[100_0000], [110_0000], [120_0000]], dtype=np.int64)
+        equity = portfolio_history.equity_curve_cents(
+            closes,
+            np.array([0], dtype=np.int64),
+            1000_00,
+            np.array([1]), np.array([0]),
+            np.array([5_0000], dtype=np.int64),
+            np.array([-500_00], dtype=np.int64)
+        )
+        assert equity.tolist() == [1000_00, 1050_00, 1100_00]
+
+class TestPortfolioHistory:
+    """Test the /portfolio/history computation"""
+    
+    def test_history_from_ledger(self, db):
+        """Test the curve starts from cash and tracks the held position"""
+        place(db, 'buy', 'NVDA', 10, 100, datetime(2024, 1, 3, 15))
+        closes = pd.DataFrame(
+            {'NVDA': [100.0, 101.0, 105.0, 110.0]},
+            index=pd.to_datetime(['2024-01-02', '2024-01-03', '2024-01-04', '2024-01-05'])
+        )
+        with patch.object(portfolio_history, 'get_daily_closes', return_value=closes):
+            history = portfolio_history.compute_portfolio_history(db, 1, '1W', now=datetime(2024, 1, 5, 20))
+        
+        values = [point['value'] for point in history['data']]
+        dates = [point['date'][:10] for point in history['data']]
+        assert dates == ['2023-12-29', '2024-01-01', '2024-01-02', '2024-01-03', '2024-01-04', '2024-01-05']
+        assert values == [100000.0, 100000.0, 100000.0, 100010.0, 100050.0, 100100.0]
+    
+    def test_cache_keyed_on_latest_fill(self, db):
+        """Test a new fill misses the cache without any worker invalidating it"""
+        portfolio_history._history_cache.clear()
+        with patch.object(portfolio_history, 'compute_portfolio_history', return_value={'data': []}) as compute:
+            portfolio_history.get_portfolio_history(db, 1, '1M')
+            portfolio_history.get_portfolio_history(db, '1', '1M')
+            assert compute.call_count == 1
+            place(db, 'buy', 'AAA', 1, 100, datetime(2024, 1, 3, 15))
+            portfolio_history.get_portfolio_history(db, 1, '1M')
+            assert compute.call_count == 2
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+from datetime import datetime
+from unittest.mock import patch
+import portfolio_risk
+from portfolio_risk import RiskModel, portfolio_risk as compute_risk
+
+def make_closes(days=300, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end='2026-03-02', periods=days)
+    market = rng.normal(0, 0.01, days)
+    returns = {
+        'SPY': market,
+        'AAA': 1.5 * market + rng.normal(0, 0.005, days),
+        'BBB': 0.5 * market + rng.normal(0, 0.005, days),
+    }
+    return pd.DataFrame({s: 100 * np.cumprod(1 + r) for s, r in returns.items()}, index=dates)
+
+@pytest.fixture
+def closes():
+    frame = make_closes()
+    calls = []
+    
+    def get_daily_closes(symbols, start):
+        calls.append(tuple(symbols))
+        return frame[[s for s in symbols if s in frame]]
+    
+    with patch.object(portfolio_risk, '_risk_models', portfolio_risk.TTLCache(ttl=60)), \
+         patch.object(portfolio_risk, 'get_daily_closes', side_effect=get_daily_closes), \
+         patch.object(portfolio_risk, 'market_now', return_value=datetime(2026, 3, 2, 16)):
+        yield frame, calls
+
+class TestPortfolioRisk:
+    """Test vectorized portfolio risk metrics"""
+    
+    def test_metrics_match_direct_computation(self, closes):
+        """Test volatility, beta and VaR against the portfolio's own return series"""
+        frame, _ = closes
+        risk = compute_risk({'AAA': 10, 'BBB': 20}, window=100, benchmark='SPY', confidence=0.95)
+        
+        window = frame.iloc[-101:]
+        values = window[['AAA', 'BBB']].iloc[-1].to_numpy() * [10, 20]
+        weights = values / values.sum()
+        returns = window.pct_change().dropna()
+        portfolio = returns[['AAA', 'BBB']].to_numpy() @ weights
+        market = returns['SPY'].to_numpy()
+        
+        assert risk['symbols'] == ['AAA', 'BBB'] and risk['observations'] == 100
+        assert risk['weights'] == pytest.approx(weights, abs=1e-6)
+        assert risk['daily_volatility'] == pytest.approx(portfolio.std(ddof=1), abs=1e-6)
+        assert risk['volatility'] == pytest.approx(portfolio.std(ddof=1) * np.sqrt(252), abs=1e-6)
+        assert risk['beta'] == pytest.approx(np.cov(portfolio, market)[0, 1] / market.var(ddof=1), abs=1e-6)
+        assert risk['var']['pct'] == pytest.approx(-np.quantile(portfolio, 0.05), abs=1e-6)
+        assert risk['correlation'][0][0] == 1.0
+        assert len(risk['covariance']) == 2
+    
+    def test_covariance_cached_per_symbol_set_and_window(self, closes):
+        """Test repeat calls reuse the cached returns matrix whatever the quantities"""
+        _, calls = closes
+        compute_risk({'AAA': 1, 'BBB': 1}, window=60)
+        compute_risk({'BBB': 5, 'AAA': 2}, window=60)
+        assert len(calls) == 2  # holdings and benchmark, fetched once
+        compute_risk({'AAA': 1, 'BBB': 1}, window=120)
+        assert len(calls) == 4
+    
+    def test_gaps_and_symbols_without_history(self, closes):
+        """Test gaps do not shorten the window and unpriced symbols are reported, not fatal"""
+        frame, _ = closes
+        frame.iloc[-10:-5, frame.columns.get_loc('BBB')] = np.nan
+        risk = compute_risk({'AAA': 1, 'BBB': 1, 'CCC': 3}, window=100)
+        assert risk['symbols'] == ['AAA', 'BBB'] and risk['observations'] == 100
+        assert risk['errors'] == {'CCC': 'No price history'}
+        
+        with pytest.raises(ValueError):
+            compute_risk({'CCC': 1}, window=100)
+    
+    def test_missing_benchmark_and_short_history(self, closes):
+        """Test beta is omitted without benchmark data and short histories are rejected"""
+        risk = compute_risk({'AAA': 1}, window=60, benchmark='QQQ')
+        assert risk['beta'] is None and risk['volatility'] > 0
+        
+        short = make_closes(days=2)
+        with pytest.raises(ValueError):
+            RiskModel(['AAA'], short[['AAA']], None)
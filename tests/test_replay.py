@@ -0,0 +1,153 @@
+import os
+import pandas as pd
+import numpy as np
+import pytest
+from unittest.mock import patch
+import replay as replay_module
+from replay import ReplayClock, MarketReplay, start_replay, stop_replay, adjust_replay, active_replay, market_now
+
+def make_daily(n=30, start='2024-01-01'):
+    index = pd.bdate_range(start, periods=n, name='Date')
+    close = 100 + np.arange(n, dtype=float)
+    return pd.DataFrame({
+        'Open': close - 0.5, 'High': close + 1, 'Low': close - 1, 'Close': close, 'Volume': 1000.0
+    }, index=index)
+
+class TestReplayClock:
+    """Test the simulated market clock"""
+    
+    def test_frozen_clock_only_moves_on_advance(self):
+        """Test speed=0 is deterministic"""
+        clock = ReplayClock('2024-01-01', speed=0)
+        assert clock.now() == pd.Timestamp('2024-01-01')
+        clock.advance(90)
+        assert clock.now() == pd.Timestamp('2024-01-01 00:01:30')
+    
+    def test_accelerated_clock(self):
+        """Test the clock runs `speed` times faster than wall time"""
+        with patch('replay.time.time', return_value=100.0):
+            clock = ReplayClock('2024-01-01', speed=3600)
+        with patch('replay.time.time', return_value=102.0):
+            assert clock.now() == pd.Timestamp('2024-01-01 02:00')
+    
+    def test_state_round_trip(self):
+        """Test a clock rebuilt from state() tells the same time"""
+        with patch('replay.time.time', return_value=100.0):
+            clock = ReplayClock('2024-01-01', speed=60)
+            clock.advance(30)
+            copy = ReplayClock.from_state(clock.state())
+        with patch('replay.time.time', return_value=110.0):
+            assert copy.now() == clock.now() == pd.Timestamp('2024-01-01 00:10:30')
+
+class TestMarketReplay:
+    """Test bars are revealed consistently with simulated time"""
+    
+    def setup_method(self, method):
+        self.bars = make_daily()
+        self.replay = MarketReplay({'NVDA': self.bars}, ReplayClock('2024-01-02', speed=0))
+    
+    def test_bars_revealed_after_close(self):
+        """Test a daily bar is only visible once its session has ended"""
+        assert self.replay.cursor('NVDA') == 1
+        assert self.replay.last_price('NVDA') == 100.0
+        self.replay.clock.advance(24 * 60 * 60)
+        assert self.replay.cursor('NVDA') == 2
+        assert self.replay.bars('NVDA').index[-1] == pd.Timestamp('2024-01-02')
+        assert self.replay.last_price('unknown') is None
+    
+    def test_quote(self):
+        """Test the simulated /live_data payload"""
+        self.replay.clock.advance(24 * 60 * 60)
+        quote = self.replay.quote('NVDA')
+        assert quote['price'] == 101.0
+        assert quote['price_change'] == 1.0
+        assert quote['open'] == 100.5
+    
+    def test_finer_interval_uses_replay_bars(self):
+        """Test intraday requests fall back to the replayed bars"""
+        self.replay.clock.advance(10 * 24 * 60 * 60)
+        bars = self.replay.bars('NVDA', '5m')
+        assert len(bars) == self.replay.cursor('NVDA') == 9
+    
+    def test_active_replay_drives_market_data(self):
+        """Test quotes, chart frames and the data source all follow the replay"""
+        import market_data
+        import timeframes
+        from sources import get_source
+        timeframes._chart_frames.clear()
+        replay = start_replay({'NVDA': self.bars}, '2024-01-10', speed=0)
+        try:
+            assert active_replay() is replay
+            assert get_source() is replay
+            assert market_now() == pd.Timestamp('2024-01-10').to_pydatetime()
+            assert market_data.get_quotes(['NVDA']) == {'NVDA': replay.last_price('NVDA')}
+            before = timeframes.get_chart_frame('NVDA', 'ALL')
+            replay.clock.advance(24 * 60 * 60)
+            after = timeframes.get_chart_frame('NVDA', 'ALL')
+            assert len(after) == len(before) + 1
+        finally:
+            stop_replay()
+        assert active_replay() is None
+        assert get_source() is not replay
+
+def make_minutes(day, n=390, first=200.0):
+    index = pd.date_range(f'{day} 09:30', periods=n, freq='1min', tz='America/New_York')
+    close = first + np.arange(n, dtype=float) / 100
+    return pd.DataFrame({
+        'Open': close, 'High': close + 0.05, 'Low': close - 0.05, 'Close': close, 'Volume': 10.0
+    }, index=index)
+
+class TestMinuteReplay:
+    """Test replays that tick through minute bars on top of a daily history"""
+    
+    def setup_method(self, method):
+        daily = make_daily(30, start='2024-01-01').tz_localize('America/New_York')
+        minutes = pd.concat([make_minutes('2024-02-08'), make_minutes('2024-02-09', first=205.0)])
+        # 10:00 ET on the second minute session
+        clock = ReplayClock(pd.Timestamp('2024-02-09 10:00', tz='America/New_York'), speed=0)
+        self.replay = MarketReplay({'NVDA': daily}, clock, {'NVDA': minutes})
+    
+    def test_quotes_move_within_the_session(self):
+        """Test the price ticks every simulated minute and the previous close is yesterday's last minute"""
+        first = self.replay.quote('NVDA')
+        self.replay.clock.advance(60)
+        second = self.replay.quote('NVDA')
+        assert self.replay.interval == '1m'
+        assert first['price'] == 205.29 and second['price'] == 205.30
+        assert first['price_change'] == pytest.approx(205.29 - 203.89)
+        assert first['volume'] == 300
+    
+    def test_daily_series_ends_with_the_session_so_far(self):
+        """Test minute sessions replace their daily bars and today's bar is built from visible minutes"""
+        daily = self.replay.bars('NVDA', '1d')
+        assert list(daily.index[-3:].strftime('%Y-%m-%d')) == ['2024-02-07', '2024-02-08', '2024-02-09']
+        assert daily['Close'].iat[-1] == 205.29 and daily['Open'].iat[-1] == 205.0
+        assert daily['Close'].iat[-2] == 203.89
+        assert self.replay.cursor('NVDA', '1d') == len(daily)
+        assert self.replay.cursor('NVDA') == 390 + 30
+    
+    def test_intraday_intervals_resample_minutes(self):
+        """Test 5m chart bars come from the replayed minutes"""
+        bars = self.replay.bars('NVDA', '5m')
+        assert bars.index[-1] == pd.Timestamp('2024-02-09 09:55', tz='America/New_York')
+        assert len(bars) == 78 + 6
+
+class TestSharedReplay:
+    """Test every worker process follows the same published replay"""
+    
+    def test_other_worker_follows_start_adjust_and_stop(self, tmp_path):
+        """Test a second process loads the published bars and clock, and drops the replay once stopped"""
+        with patch.object(replay_module.config, 'REPLAY_DIR', str(tmp_path)):
+            started = start_replay({'NVDA': make_daily()}, '2024-01-10', speed=0)
+            adjust_replay(advance=24 * 60 * 60)
+            # A fresh worker process: nothing replayed locally yet
+            with patch.object(replay_module, '_replay', None), \
+                 patch.object(replay_module, '_previous_source', None), \
+                 patch.object(replay_module, '_synced', None):
+                other = active_replay()
+                assert other is not started and other.id == started.id
+                assert other.now() == started.now() == pd.Timestamp('2024-01-11')
+                pd.testing.assert_frame_equal(other.bars('NVDA'), started.bars('NVDA'))
+                stop_replay()
+            assert not os.path.exists(tmp_path / 'CURRENT')
+            assert active_replay() is None
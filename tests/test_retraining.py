@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+from model import prepare_data, MODEL_FEATURES, MODEL_PARAMS
+import retraining
+from retraining import refresh_model, INCREMENTAL_TREES
+
+def make_data(n=200, seed=5, drift=0.0):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range('2022-01-03', periods=n, name='Date')
+    close = 100 * np.exp(np.cumsum(rng.normal(drift, 0.01, n)))
+    bars = pd.DataFrame({
+        'Open': close, 'High': close * 1.01, 'Low': close * 0.99, 'Close': close,
+        'Volume': rng.integers(1000, 5000, n).astype(float)
+    }, index=index)
+    return prepare_data(bars)
+
+class TestIncrementalRetraining:
+    """Test warm-start refreshes and the full-rebuild triggers"""
+    
+    def setup_method(self, method):
+        self.data = make_data()
+        self.features = list(MODEL_FEATURES)
+        self.scaler, self.model, self.state = refresh_model(self.data.iloc[:-1], self.features)
+    
+    def test_initial_fit_is_full(self):
+        """Test the first refresh fits from scratch"""
+        assert self.state['mode'] == 'full'
+        assert self.state['reason'] == 'initial'
+        assert self.model.get_booster().num_boosted_rounds() == MODEL_PARAMS['n_estimators']
+    
+    def test_new_bar_boosts_onto_existing_model(self):
+        """Test a new bar adds INCREMENTAL_TREES to the previous booster"""
+        scaler, model, state = refresh_model(self.data, self.features, self.scaler, self.model, self.state)
+        assert state['mode'] == 'incremental'
+        assert scaler is self.scaler
+        assert model.get_booster().num_boosted_rounds() == MODEL_PARAMS['n_estimators'] + INCREMENTAL_TREES
+        assert state['incremental_updates'] == 1
+    
+    def test_no_new_bar_is_a_no_op(self):
+        """Test refreshing on the same bars keeps the model"""
+        scaler, model, state = refresh_model(self.data.iloc[:-1], self.features, self.scaler, self.model, self.state)
+        assert model is self.model
+        assert state['mode'] == 'unchanged'
+    
+    def test_scheduled_rebuild(self):
+        """Test a full refit once FULL_REBUILD_EVERY updates have accumulated"""
+        state = {**self.state, 'incremental_updates': retraining.FULL_REBUILD_EVERY}
+        _, model, state = refresh_model(self.data, self.features, self.scaler, self.model, state)
+        assert (state['mode'], state['reason']) == ('full', 'scheduled')
+        assert model.get_booster().num_boosted_rounds() == MODEL_PARAMS['n_estimators']
+    
+    def test_feature_range_drift_forces_rebuild(self):
+        """Test features far outside the fitted scaler range trigger a full refit"""
+        shifted = self.data.copy()
+        price_columns = [c for c in self.features if c.startswith(('MA', 'EMA', 'BB', 'VWAP', 'Close_lag'))]
+        shifted.loc[shifted.index[-30:], price_columns] *= 3
+        _, _, state = refresh_model(shifted, self.features, self.scaler, self.model, self.state)
+        assert (state['mode'], state['reason']) == ('full', 'feature_range')
+    
+    def test_out_of_sample_error_forces_rebuild(self):
+        """Test error accumulated on unseen rows triggers a full refit"""
+        _, _, state = refresh_model(self.data, self.features, self.scaler, self.model, self.state)
+        assert len(state['errors']) == 1
+        
+        poor = {**self.state, 'errors': [[10.0, 1.0]] * (retraining.MIN_ERROR_ROWS - 1)}
+        _, _, state = refresh_model(self.data, self.features, self.scaler, self.model, poor)
+        assert (state['mode'], state['reason']) == ('full', 'error')
+        assert state['errors'] == []
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+from unittest.mock import patch
+from feature_store import COLUMNS, FeatureMatrix
+import screener
+from screener import Expression, LatestFeatures, screen
+
+def make_matrix(day, **latest):
+    values = np.full((2, len(COLUMNS)), np.nan)
+    for column, value in latest.items():
+        values[-1, COLUMNS.index(column)] = value
+    dates = np.array(['2026-01-01', day], dtype='datetime64[ns]')
+    return FeatureMatrix(dates, values)
+
+class TestScreener:
+    """Test vectorized screening over the latest feature rows"""
+    
+    def test_expression_evaluation(self):
+        """Test comparisons, boolean operators and NaN rows"""
+        values = np.full((3, len(COLUMNS)), np.nan)
+        position = {column: i for i, column in enumerate(COLUMNS)}
+        values[:, position['RSI']] = [25, 45, np.nan]
+        values[:, position['MACD']] = [1.0, 2.0, 3.0]
+        values[:, position['MACD_Signal']] = [0.5, 2.5, 1.0]
+        
+        expression = Expression('RSI < 30 and MACD > MACD_Signal')
+        assert expression.columns == ['RSI', 'MACD', 'MACD_Signal']
+        assert expression.evaluate(values, position).tolist() == [True, False, False]
+        assert Expression('not RSI < 30 or MACD - MACD_Signal > 1').evaluate(values, position).tolist() == [False, True, True]
+        assert Expression('20 < RSI < 30').evaluate(values, position).tolist() == [True, False, False]
+        # A NaN operand fails the comparison whether or not it is negated
+        assert Expression('not RSI < 30').evaluate(values, position).tolist() == [False, True, False]
+    
+    def test_rejects_unsafe_expressions(self):
+        """Test only columns, numbers and operators are accepted"""
+        for text in ('__import__("os")', 'Close.real', 'Foo > 1', 'RSI <', 'Close > "1"', 'Close ** 2',
+                     '-(RSI < 30) < 1', '(RSI < 30) + 1 > 0', 'RSI and MACD', 'not RSI'):
+            with pytest.raises(ValueError):
+                Expression(text)
+    
+    def test_incremental_update(self):
+        """Test a row is rewritten only when a new matrix arrives"""
+        latest = LatestFeatures(capacity=1)
+        first = make_matrix('2026-01-02', Close=10.0)
+        latest.update('AAA', first)
+        latest.update('BBB', make_matrix('2026-01-02', Close=20.0))
+        latest.update('AAA', first)
+        assert latest.updates == 2
+        
+        latest.update('AAA', make_matrix('2026-01-05', Close=11.0))
+        values, dates = latest.snapshot(['BBB', 'AAA'])
+        assert values[:, COLUMNS.index('Close')].tolist() == [20.0, 11.0]
+        assert str(dates[1].astype('datetime64[D]')) == '2026-01-05'
+    
+    def test_screen_ranks_matches(self):
+        """Test screen filters, ranks and reports unavailable symbols"""
+        matrices = {
+            'AAA': make_matrix('2026-01-02', Close=10.0, RSI=25.0, Volume=100.0),
+            'BBB': make_matrix('2026-01-02', Close=20.0, RSI=28.0, Volume=300.0),
+            'CCC': make_matrix('2026-01-02', Close=30.0, RSI=70.0, Volume=200.0),
+        }
+        
+        def daily_features(symbol):
+            if symbol not in matrices:
+                raise ValueError('No data')
+            return matrices[symbol]
+        
+        with patch.object(screener, '_latest', LatestFeatures()), \
+             patch.object(screener, 'daily_features', side_effect=daily_features):
+            results, errors = screen(['AAA', 'BBB', 'CCC', 'ZZZ'], where='RSI < 30', sort='Volume')
+            assert [r['symbol'] for r in results] == ['BBB', 'AAA']
+            assert results[0] == {'symbol': 'BBB', 'date': '2026-01-02', 'Close': 20.0, 'RSI': 28.0, 'Volume': 300.0}
+            assert errors == {'ZZZ': 'No data'}
+            
+            results, _ = screen(['AAA', 'BBB', 'CCC'], sort='RSI', descending=False, limit=2)
+            assert [r['symbol'] for r in results] == ['AAA', 'BBB']
+            
+            with pytest.raises(ValueError):
+                screen(['AAA'], where='RSI')
@@ -0,0 +1,78 @@
+import os
+import shutil
+import pandas as pd
+import numpy as np
+from sources import CSVSource, parse_bars_csv, apply_period, set_source, get_source
+
+REPO_CSV = os.path.join(os.path.dirname(__file__), '..', 'nvidiastock.csv')
+
+class TestCSVSource:
+    """Test replaying daily bars from local CSV files"""
+    
+    def setup_method(self, method):
+        import tempfile
+        self.directory = tempfile.mkdtemp()
+        shutil.copy(REPO_CSV, self.directory)
+    
+    def teardown_method(self, method):
+        shutil.rmtree(self.directory)
+    
+    def test_parse_quoted_thousands(self):
+        """Test quoted prices and comma-grouped volumes parse to floats, oldest first"""
+        bars = parse_bars_csv(os.path.join(self.directory, 'nvidiastock.csv'))
+        assert list(bars.columns) == ['Open', 'High', 'Low', 'Close', 'Volume']
+        assert (bars.dtypes == np.float64).all()
+        assert bars.index.is_monotonic_increasing
+        last = bars.iloc[-1]
+        assert bars.index[-1] == pd.Timestamp('2025-05-06')
+        assert last['Open'] == 111.48
+        assert last['Volume'] == 158525594
+    
+    def test_binary_cache_round_trip(self):
+        """Test the first load writes a columnar cache that later loads read back"""
+        bars = CSVSource(self.directory).daily_bars('NVDA')
+        cache_path = os.path.join(self.directory, '.bars_cache', 'nvidiastock.npz')
+        assert os.path.exists(cache_path)
+        
+        from unittest.mock import patch
+        with patch('sources.parse_bars_csv') as parse:
+            cached = CSVSource(self.directory).daily_bars('NVDA')
+        parse.assert_not_called()
+        pd.testing.assert_frame_equal(cached, bars)
+    
+    def test_cache_invalidated_when_csv_changes(self):
+        """Test editing the CSV forces a re-parse"""
+        source = CSVSource(self.directory)
+        before = source.daily_bars('NVDA')
+        path = os.path.join(self.directory, 'nvidiastock.csv')
+        with open(path) as f:
+            lines = f.readlines()
+        with open(path, 'w') as f:
+            f.writelines(lines[:1] + lines[2:])
+        after = CSVSource(self.directory).daily_bars('NVDA')
+        assert len(after) == len(before) - 1
+    
+    def test_period_and_symbols(self):
+        """Test yfinance-style periods and symbol discovery"""
+        source = CSVSource(self.directory)
+        assert source.symbols() == ['NVDA']
+        bars = source.daily_bars('nvda', period='1mo')
+        assert bars.index[0] > bars.index[-1] - pd.DateOffset(months=1)
+        assert len(apply_period(source.daily_bars('NVDA'), 'max')) == 251
+        ytd = apply_period(source.daily_bars('NVDA'), 'ytd')
+        assert ytd.index[0].year == ytd.index[-1].year == 2025
+        assert ytd.index[0] < pd.Timestamp('2025-01-10')
+    
+    def test_load_and_train_offline(self):
+        """Test training runs from local files when the CSV source is selected"""
+        from unittest.mock import patch
+        from model import load_and_train
+        previous = get_source()
+        set_source(CSVSource(self.directory))
+        try:
+            with patch('yfinance.Ticker', side_effect=AssertionError('network used')):
+                data, scaler, model, features = load_and_train('NVDA')
+        finally:
+            set_source(previous)
+        assert len(data) > 100
+        assert len(features) == 31
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+from symbol_cache import SymbolCache, SymbolState
+
+def make_state(rows=10, version='v1'):
+    data = pd.DataFrame({'Close': np.arange(rows, dtype=float)})
+    return SymbolState(data, None, None, ['Close'], {'version': version, 'latest': None})
+
+class TestSymbolCache:
+    """Test the bounded LRU of per-symbol model state"""
+    
+    def test_evicts_least_recently_used(self):
+        """Test the oldest untouched symbol goes first once over capacity"""
+        cache = SymbolCache(max_symbols=2)
+        cache.set('AAA', make_state())
+        cache.set('BBB', make_state())
+        assert cache.get('AAA') is not None
+        cache.set('CCC', make_state())
+        assert 'AAA' in cache and 'CCC' in cache and 'BBB' not in cache
+        assert cache.get('BBB') is None
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['misses'] == 1
+        assert cache.stats()['evictions'] == 1
+    
+    def test_memory_budget(self):
+        """Test estimated bytes bound the cache, keeping the newest entry"""
+        one = make_state(1000).nbytes
+        cache = SymbolCache(max_symbols=100, max_bytes=int(one * 2.5))
+        for symbol in ('AAA', 'BBB', 'CCC'):
+            cache.set(symbol, make_state(1000))
+        assert len(cache) == 2 and cache.nbytes <= cache.max_bytes
+        
+        cache.set('BIG', make_state(10000))
+        assert len(cache) == 1 and 'BIG' in cache
+    
+    def test_replacing_a_symbol_updates_size(self):
+        """Test a retrained symbol replaces its state and payloads"""
+        cache = SymbolCache(max_symbols=10)
+        first = make_state(1000)
+        first.payloads['price'] = 1.0
+        cache.set('AAA', first)
+        cache.set('AAA', make_state(10, 'v2'))
+        assert cache.nbytes == make_state(10).nbytes
+        assert cache.get('AAA').meta['version'] == 'v2'
+        assert cache.get('AAA').payloads == {}
+    
+    def test_mapped_models_are_not_counted(self, tmp_path):
+        """Test memory-mapped tree arrays do not count against the budget"""
+        from xgboost import XGBRegressor
+        from fast_inference import TreeEnsemble
+        X = np.random.default_rng(0).normal(size=(50, 2))
+        model = XGBRegressor(n_estimators=5).fit(X, X[:, 0])
+        TreeEnsemble(model.get_booster()).save(str(tmp_path))
+        
+        data = pd.DataFrame({'Close': [1.0]})
+        in_memory = SymbolState(data, model, None, ['Close'], {'latest': None})
+        mapped = SymbolState(data, TreeEnsemble.load(str(tmp_path)), None, ['Close'], {'latest': None})
+        assert mapped.nbytes == SymbolState(data, None, None, ['Close'], {'latest': None}).nbytes
+        assert in_memory.nbytes > mapped.nbytes
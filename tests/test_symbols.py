@@ -0,0 +1,58 @@
+import pytest
+from symbols import SymbolIndex, load_symbol_index, read_listing
+
+NASDAQ_LISTED = """Symbol|Security Name|Market Category|Test Issue|Financial Status|Round Lot Size|ETF|NextShares
+AAPL|Apple Inc. - Common Stock|Q|N|N|100|N|N
+AMD|Advanced Micro Devices, Inc. - Common Stock|Q|N|N|100|N|N
+AMZN|Amazon.com, Inc. - Common Stock|Q|N|N|100|N|N
+ZXZZT|NASDAQ TEST STOCK|G|Y|N|100|N|N
+File Creation Time: 1019202608:00|||||||
+"""
+
+OTHER_LISTED = """Symbol,Name,Exchange
+BRK.B,Berkshire Hathaway Inc. Class B,N
+MA,Mastercard Incorporated,N
+"""
+
+@pytest.fixture
+def index(tmp_path):
+    nasdaq = tmp_path / 'nasdaqlisted.txt'
+    nasdaq.write_text(NASDAQ_LISTED)
+    other = tmp_path / 'other.csv'
+    other.write_text(OTHER_LISTED)
+    return load_symbol_index([str(nasdaq), str(other)])
+
+class TestSymbolIndex:
+    """Test the symbol master table and its search index"""
+    
+    def test_read_listing_formats(self, tmp_path):
+        """Test pipe and CSV listings load, skipping test issues and the footer"""
+        path = tmp_path / 'nasdaqlisted.txt'
+        path.write_text(NASDAQ_LISTED)
+        rows = list(read_listing(str(path)))
+        assert [row[0] for row in rows] == ['AAPL', 'AMD', 'AMZN']
+        assert rows[0] == ('AAPL', 'Apple Inc. - Common Stock', 'Q')
+    
+    def test_configured_stocks_always_listed(self, index):
+        """Test STOCKS are listed alongside the listing files"""
+        assert 'NVDA' in index and 'BRK.B' in index and 'MA' in index
+        assert 'ZXZZT' not in index
+        assert index.get('AMD')['exchange'] == 'Q'
+    
+    def test_ranking(self, index):
+        """Test exact tickers rank before prefixes, then name words, then substrings"""
+        results = [r['symbol'] for r in index.search('am', limit=10)]
+        assert results[:2] == ['AMD', 'AMZN']
+        assert [r['symbol'] for r in index.search('ma')][0] == 'MA'
+        assert 'AMZN' in [r['symbol'] for r in index.search('amazon')]
+        # 'hathaway' only appears inside the name
+        assert [r['symbol'] for r in index.search('athaw')] == ['BRK.B']
+        assert index.search('zzzz') == []
+        assert index.search('  ') == []
+    
+    def test_limit(self):
+        """Test results are capped by limit and MAX_RESULTS"""
+        index = SymbolIndex((f'A{i:04d}', f'Company {i}', 'Q') for i in range(500))
+        assert len(index.search('A', limit=5)) == 5
+        assert len(index.search('A', limit=1000)) == 50
+        assert len(index.search('company', limit=20)) == 20
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+from model import prepare_data
+from walk_forward import walk_forward_splits, walk_forward, summarize_folds
+
+def make_bars(n=260, seed=4):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range('2021-01-01', periods=n, name='Date')
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.015, n)))
+    return pd.DataFrame({
+        'Open': close, 'High': close * 1.01, 'Low': close * 0.99, 'Close': close,
+        'Volume': rng.integers(1000, 5000, n).astype(float)
+    }, index=index)
+
+class TestWalkForwardSplits:
+    """Test expanding and rolling fold generation"""
+    
+    def test_expanding(self):
+        """Test training always starts at row 0 and never overlaps the test block"""
+        splits = walk_forward_splits(100, min_train=50, test_size=20)
+        assert [(s.start, s.stop, t.start, t.stop) for s, t in splits] == [(0, 50, 50, 70), (0, 70, 70, 90)]
+    
+    def test_rolling(self):
+        """Test a rolling window keeps only the most recent rows"""
+        splits = walk_forward_splits(100, min_train=50, test_size=10, step=25, window=40)
+        assert [(s.start, s.stop) for s, _ in splits] == [(10, 50), (35, 75)]
+
+class TestWalkForward:
+    """Test fold evaluation metrics and timings"""
+    
+    def test_metrics_per_config_and_fold(self):
+        """Test every config is scored on every fold against the last-close baseline"""
+        data = prepare_data(make_bars())
+        configs = {'tiny': {'n_estimators': 5, 'max_depth': 2}}
+        folds = walk_forward(data, configs, min_train=150, test_size=20, workers=1)
+        assert len(folds) == len(walk_forward_splits(len(data) - 1, 150, 20))
+        assert (folds['fit_seconds'] > 0).all()
+        assert folds['directional_accuracy'].between(0, 1).all()
+        summary = summarize_folds(folds)
+        assert list(summary.index) == ['tiny']
+        assert summary['mae_vs_baseline'].iloc[0] > 0
+    
+    def test_too_little_data(self):
+        """Test a clear error when no fold fits"""
+        data = prepare_data(make_bars())
+        with pytest.raises(ValueError):
+            walk_forward(data, min_train=1000, workers=1)